@@ -1,12 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
 
 import discord
 from redbot.core import Config
 from redbot.core.bot import Red
 from redbot.core.commands import Cog
 
+from .actions import ActionQueue
+from .admission import AdmissionQueue
 from .api import Challenge
+from .deadlines import DeadlineWheel
+from .journal import ChallengeJournal
+from .logsink import LogSink
+from .metrics import GuildMetrics
+from .pool import CaptchaPool
+from .render import CaptchaRenderer
+from .risk import RiskScorer
 
 
 class MixinMeta(ABC):
@@ -15,6 +24,17 @@ class MixinMeta(ABC):
 
         self.data: Config
         self.running: dict
+        self.guild_settings: Dict[int, dict]
+        self.log_sinks: Dict[int, LogSink]
+        self.journal: ChallengeJournal
+        self.deadlines: DeadlineWheel
+        self.waiting: Dict[Tuple[int, int], Challenge]
+        self.renderer: CaptchaRenderer
+        self.pool: CaptchaPool
+        self.admissions: Dict[int, AdmissionQueue]
+        self.action_queues: Dict[int, ActionQueue]
+        self.metrics: Dict[int, GuildMetrics]
+        self.risk_scorers: Dict[int, RiskScorer]
 
         self.version: str
         self.patchnote: str
@@ -25,12 +45,21 @@ class MixinMeta(ABC):
         self,
         guild: discord.Guild,
         message_content: str,
-        message_to_update: Optional[discord.Message] = None,
         *,
+        allowed_tries: tuple = None,
         member: discord.Member = None,
         file: discord.File = None,
         embed: discord.Embed = None,
-    ):
+        ignore_error: bool = True,
+    ) -> Optional[discord.Message]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def get_guild_settings(self, guild: discord.Guild) -> dict:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def invalidate_guild_settings(self, guild: discord.Guild) -> None:
         raise NotImplementedError()
 
     @abstractmethod
@@ -41,6 +70,26 @@ class MixinMeta(ABC):
     async def delete_challenge_for(self, member: Union[discord.Member, int]) -> bool:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_metrics(self, guild: discord.Guild) -> GuildMetrics:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_status(self, guild: discord.Guild) -> dict:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_admission_queue(self, guild: discord.Guild, config: dict) -> AdmissionQueue:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_risk_scorer(self, guild: discord.Guild) -> RiskScorer:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def screen_member(self, challenge: Challenge) -> bool:
+        raise NotImplementedError()
+
     @abstractmethod
     def is_running_challenge(self, member_or_id: Union[discord.Member, int]) -> bool:
         raise NotImplementedError()
@@ -49,6 +98,10 @@ class MixinMeta(ABC):
     def obtain_challenge(self, member_or_id: Union[discord.Member, int]) -> Challenge:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_action_queue(self, guild: discord.Guild) -> ActionQueue:
+        raise NotImplementedError()
+
     @abstractmethod
     async def give_temprole(self, member: discord.Member) -> None:
         raise NotImplementedError()
@@ -77,6 +130,10 @@ class MixinMeta(ABC):
     def _initialize(self, send_patchnote: bool) -> None:
         raise NotImplementedError()
 
+    @abstractmethod
+    async def _restore_challenges(self) -> None:
+        raise NotImplementedError()
+
     @abstractmethod
     async def _send_patchnote(self) -> None:
         raise NotImplementedError()
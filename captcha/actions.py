@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+import discord
+from redbot.core.commands import MissingPermissions
+
+log = logging.getLogger("red.predeactor.captcha")
+
+
+class _Action:
+    __slots__ = ("kind", "member", "add", "remove", "reason", "embed", "future")
+
+    def __init__(self, kind: str, member: discord.Member, reason: str) -> None:
+        self.kind: str = kind  # "roles" or "kick"
+        self.member: discord.Member = member
+        self.add: Dict[int, discord.Role] = {}
+        self.remove: Dict[int, discord.Role] = {}
+        self.reason: str = reason
+        self.embed: Optional[discord.Embed] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class ActionQueue:
+    """Run the REST actions of a guild one after the other, at a pace the API accepts.
+
+    Role changes queued for a member are merged into one action, and dropped if the member
+    gets kicked before they were applied. They are still sent through the per-role endpoints,
+    so roles given by someone else in the meantime are kept. At most ``rate`` actions are sent
+    per ``per`` seconds. When Discord rate limits us, the queue waits for the ``Retry-After``
+    of the route's bucket before sending anything else. Server errors are retried with an
+    exponential backoff. Failed actions are retried at most ``max_retries`` times.
+    """
+
+    def __init__(self, rate: int = 10, per: float = 1.0, max_retries: int = 3) -> None:
+        self.rate: int = rate
+        self.per: float = per
+        self.max_retries: int = max_retries
+
+        self.done: int = 0
+        self.failed: int = 0
+        self.rate_limited: int = 0
+
+        self._queue: Deque[_Action] = deque()
+        self._role_edits: Dict[int, _Action] = {}
+        self._sent: Deque[float] = deque()
+        # Monotonic time until which the bucket we got rate limited on is exhausted.
+        self._blocked_until: float = 0.0
+        self._wake: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "done": self.done,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "rate": self.rate / self.per,
+        }
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while self._queue:
+            action = self._queue.popleft()
+            if not action.future.done():
+                action.future.cancel()
+        self._role_edits.clear()
+
+    async def edit_roles(
+        self,
+        member: discord.Member,
+        *,
+        add: Iterable[Optional[discord.Role]] = (),
+        remove: Iterable[Optional[discord.Role]] = (),
+        reason: str = None,
+    ) -> bool:
+        """Add and remove roles of a member in one queued action.
+
+        Return False if the member left before the edit, raise MissingPermissions if we're
+        not allowed to edit their roles.
+        """
+        action = self._role_edits.get(member.id)
+        if action is None:
+            action = self._role_edits[member.id] = _Action("roles", member, reason)
+            self._push(action)
+        elif reason:
+            action.reason = reason
+        for role in add:
+            if role is not None:
+                action.remove.pop(role.id, None)
+                action.add[role.id] = role
+        for role in remove:
+            if role is not None:
+                action.add.pop(role.id, None)
+                action.remove[role.id] = role
+        return await asyncio.shield(action.future)
+
+    async def kick(
+        self, member: discord.Member, *, reason: str, embed: discord.Embed = None
+    ) -> bool:
+        """DM the member with the given embed if any, then kick them.
+
+        Return False if the member already left, raise MissingPermissions if we're not
+        allowed to kick.
+        """
+        pending_edit = self._role_edits.pop(member.id, None)
+        if pending_edit is not None:
+            # No need to edit roles of someone we're about to kick.
+            self._queue.remove(pending_edit)
+            pending_edit.future.set_result(False)
+        action = _Action("kick", member, reason)
+        action.embed = embed
+        self._push(action)
+        return await asyncio.shield(action.future)
+
+    def _push(self, action: _Action) -> None:
+        self._queue.append(action)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+        self._wake.set()
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._queue:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            await self._wait_for_slot()
+            action = self._queue.popleft()
+            if action.kind == "roles":
+                self._role_edits.pop(action.member.id, None)
+            try:
+                result = await self._run_with_retries(action)
+            except Exception as e:
+                self.failed += 1
+                if not action.future.done():
+                    action.future.set_exception(e)
+            else:
+                self.done += 1
+                if not action.future.done():
+                    action.future.set_result(result)
+
+    async def _wait_for_slot(self) -> None:
+        """Sleep until sending one more request keep us under the current rate."""
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            while self._sent and self._sent[0] <= now - self.per:
+                self._sent.popleft()
+            if len(self._sent) < self.rate:
+                self._sent.append(now)
+                return
+            await asyncio.sleep(self._sent[0] + self.per - now)
+
+    @staticmethod
+    def _retry_after(error: discord.HTTPException) -> Optional[float]:
+        """Get how long the rate limit bucket of a 429 response is exhausted for, if known."""
+        headers = getattr(error.response, "headers", None) or {}
+        for header in ("Retry-After", "X-RateLimit-Reset-After"):
+            try:
+                return float(headers[header])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
+
+    async def _run_with_retries(self, action: _Action) -> bool:
+        if action.kind == "kick" and action.embed is not None:
+            # Sent once, only the kick itself is retried.
+            await self._send_dm(action)
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await self._run(action)
+            except discord.Forbidden:
+                raise MissingPermissions(
+                    'Bot miss the "{permission}" permission.'.format(
+                        permission="kick_members" if action.kind == "kick" else "manage_roles"
+                    )
+                )
+            except discord.NotFound:
+                return False
+            except discord.HTTPException as e:
+                if (e.status != 429 and e.status < 500) or attempt == self.max_retries:
+                    raise
+                delay = None
+                if e.status == 429:
+                    self.rate_limited += 1
+                    delay = self._retry_after(e)
+                if delay is None:
+                    delay = 2**attempt + random.random()
+                else:
+                    # The whole queue shares the bucket, hold every action back.
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+                log.debug(
+                    "Retrying a {kind} action in {delay:.1f}s after an HTTP {status}.".format(
+                        kind=action.kind, delay=delay, status=e.status
+                    )
+                )
+                await asyncio.sleep(delay)
+            else:
+                return result
+
+    @staticmethod
+    async def _send_dm(action: _Action) -> None:
+        try:
+            await action.member.send(embed=action.embed)
+        except (discord.Forbidden, discord.HTTPException):
+            pass
+
+    async def _run(self, action: _Action) -> bool:
+        member = action.member.guild.get_member(action.member.id) or action.member
+        if action.kind == "kick":
+            await member.guild.kick(member, reason=action.reason)
+            return True
+
+        # Adding a role the member has, or removing one they don't, is a no-op for the
+        # API, so a retry after a partial success is safe.
+        held = {role.id for role in member.roles}
+        add = [role for role in action.add.values() if role.id not in held]
+        remove = [role for role in action.remove.values() if role.id in held]
+        if add:
+            await member.add_roles(*add, reason=action.reason)
+        if remove:
+            await member.remove_roles(*remove, reason=action.reason)
+        return True
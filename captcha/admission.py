@@ -0,0 +1,108 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+QUEUE_ORDERS = ("fifo", "age")
+
+
+class AdmissionQueue:
+    """Bound the number of challenges running at the same time in a guild.
+
+    Members above the limit wait in a queue, either in join order ("fifo") or with the oldest
+    accounts first ("age"), since new accounts are the most likely to be part of a raid.
+    """
+
+    def __init__(self, limit: int, order: str = "fifo") -> None:
+        self.limit: int = limit
+        self.order: str = order
+        self.active: int = 0
+
+        self._heap: List[Tuple[float, int, int, asyncio.Future]] = []
+        self._queued: Dict[int, asyncio.Future] = {}
+        self._counter = itertools.count()
+
+        self.admitted: int = 0
+        self.total_wait: float = 0.0
+        self.last_wait: float = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queued)
+
+    def configure(self, limit: int, order: str) -> None:
+        self.limit = limit
+        self.order = order
+        self._wake_up()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "limit": self.limit,
+            "depth": self.depth,
+            "admitted": self.admitted,
+            "mean_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "last_wait": self.last_wait,
+        }
+
+    async def acquire(self, member: discord.Member) -> Optional[float]:
+        """Wait for a free slot.
+
+        Return the time spent in the queue, or None if the member was discarded from the
+        queue before being admitted.
+        """
+        if self.active < self.limit and not self._queued:
+            self.active += 1
+            self._record(0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        priority = member.created_at.timestamp() if self.order == "age" else 0.0
+        heapq.heappush(self._heap, (priority, next(self._counter), member.id, future))
+        self._queued[member.id] = future
+        start = time.monotonic()
+        try:
+            admitted = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.result():
+                # We got the slot but nobody will use it.
+                self.release()
+            else:
+                self._queued.pop(member.id, None)
+            raise
+        if not admitted:
+            return None
+        waited = time.monotonic() - start
+        self._record(waited)
+        return waited
+
+    def release(self) -> None:
+        self.active -= 1
+        self._wake_up()
+
+    def discard(self, member_id: int) -> bool:
+        """Remove a member from the queue, if they are waiting in it."""
+        future = self._queued.pop(member_id, None)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(False)
+        return True
+
+    def _record(self, waited: float) -> None:
+        self.admitted += 1
+        self.total_wait += waited
+        self.last_wait = waited
+
+    def _wake_up(self) -> None:
+        while self.active < self.limit and self._heap:
+            *_, member_id, future = heapq.heappop(self._heap)
+            if future.done():
+                # Discarded while waiting.
+                continue
+            del self._queued[member_id]
+            self.active += 1
+            future.set_result(True)
@@ -1,15 +1,21 @@
 import asyncio
+import hashlib
 import logging
-from typing import Union
+import time
+from typing import Dict, Optional, Tuple, Union
 
 import discapty
 import discord
 from redbot.core.bot import Red
 from redbot.core.commands import MissingPermissions
 from redbot.core.utils import chat_formatting as form
-from redbot.core.utils.predicates import MessagePredicate, ReactionPredicate
 
+from .deadlines import DeadlineWheel
 from .errors import AskedForReload, LeftServerError, MissingRequiredValueError
+from .journal import ChallengeJournal
+from .metrics import GuildMetrics
+from .pool import CaptchaPool
+from .utils import build_captcha_embed
 
 log = logging.getLogger("red.predeactor.captcha")
 
@@ -18,6 +24,10 @@ def ok_check(msg: str):
     return f"✅ {msg}"
 
 
+def hash_code(code: str) -> str:
+    return hashlib.sha256(code.upper().encode("utf-8")).hexdigest()
+
+
 class Challenge:
     """Representation of a challenge an user is doing."""
 
@@ -40,17 +50,45 @@ class Challenge:
 
         self.messages: dict = {}
         # bot_challenge: Message send for the challenge, contain captcha.
-        # logs: The message that has been sent in the logging channel.
         # answer: Member's answer to captcha, may or may not exist.
-        self.log = bot.get_cog("Captcha").send_or_update_log_message
+        cog = bot.get_cog("Captcha")
+        self.log = cog.send_or_update_log_message
+        self.pool: CaptchaPool = cog.pool
+        self.waiting: Dict[Tuple[int, int], "Challenge"] = cog.waiting
+        self.journal: ChallengeJournal = cog.journal
+        self.deadlines: DeadlineWheel = cog.deadlines
+        self.metrics: GuildMetrics = cog.get_metrics(self.guild)
 
         self.running: bool = False
-        self.tasks: list = []
+        self.task: Optional[asyncio.Task] = None  # The task running this challenge.
+        self.suspended: bool = False  # If the cog got unloaded, the journal keeps the state.
+        self.waiter: Optional[asyncio.Future] = None
         self.limit: int = self.config["retry"]
         self.trynum: int = 0
+        self.deadline: Optional[float] = None  # Timestamp when the current attempt ends.
+        self.code_hash: Optional[str] = None
+        self.resumed: bool = False  # If the captcha sent before a restart is still valid.
 
         self.captcha: discapty.Captcha = discapty.Captcha(self.type)
 
+    def escalate(self, captcha_type: str) -> None:
+        """Challenge the member with another type of captcha than the guild's one."""
+        self.type = captcha_type
+        self.captcha = discapty.Captcha(captcha_type)
+
+    def restore(self, entry: dict) -> None:
+        """Restore the state of a challenge saved in the journal.
+
+        If the captcha that was sent can still be used, the member can answer it until the
+        saved deadline, it is verified against the saved hash.
+        """
+        self.trynum = entry["t"]
+        if entry["b"] and entry["h"] and entry["d"] and self.channel is not None:
+            self.messages["bot_challenge"] = self.channel.get_partial_message(entry["b"])
+            self.code_hash = entry["h"]
+            self.deadline = entry["d"]
+            self.resumed = True
+
     async def try_challenging(self) -> bool:
         """Do challenging in one function!
 
@@ -62,24 +100,30 @@ class Challenge:
         if self.running is True:
             raise OverflowError("A Challenge is already running.")
 
-        if self.messages.get("bot_challenge"):
+        if self.resumed:
+            pass  # The member is still answering the captcha sent before the restart.
+        elif self.messages.get("bot_challenge"):
             await self.reload()
         else:
             await self.send_basics()
+        if not self.resumed:
+            self.deadline = time.time() + self.config["timeout"] * 60
+        self.journal.record(self)
 
         self.running = True
-        self.messages["logs"] = logmsg = await self.log(
+        await self.log(
             self.guild,
             form.info("The member started the challenge."),
-            self.messages.get("logs", None),
             allowed_tries=(self.trynum, self.limit),
             member=self.member,
         )
 
         try:
+            waited_since = time.monotonic()
             received = await self.wait_for_action()
             if received is None:
                 raise LeftServerError("User has left guild.")
+            self.metrics.record_answer(time.monotonic() - waited_since)
             if hasattr(received, "content"):
                 # It's a message!
                 self.messages["answer"] = received
@@ -97,7 +141,6 @@ class Challenge:
                     await self.log(
                         self.guild,
                         form.error("User sent an invalid code."),
-                        logmsg,
                         allowed_tries=(self.trynum, self.limit),
                         member=self.member,
                     )
@@ -105,18 +148,17 @@ class Challenge:
                 await self.log(
                     self.guild,
                     "🔁 User reloaded captcha.",
-                    logmsg,
                     allowed_tries=(self.trynum, self.limit),
                     member=self.member,
                 )
                 raise AskedForReload("User want to reload Captcha.")
         finally:
             self.running = False
+            self.resumed = False
         if state:
             await self.log(
                 self.guild,
                 ok_check("User passed captcha."),
-                logmsg,
                 allowed_tries=(self.trynum, self.limit),
                 member=self.member,
             )
@@ -129,23 +171,16 @@ class Challenge:
         if self.messages.get("bot_challenge"):
             raise OverflowError("Use 'Challenge.reload' to create another code.")
 
-        embed_and_file = await self.captcha.generate_embed(
-            guild_name=self.guild.name,
-            author={"name": f"Captcha for {self.member.name}", "url": self.member.avatar_url},
-            footer={"text": f"Tries: {self.trynum} / Limit: {self.limit}"},
-            title=f"{self.guild.name} Verification System",
-            description=(
-                "Please return me the code on the following image. The code is made of 8 "
-                "characters."
-            ),
+        embed, file = await self._obtain_captcha(
+            author={"name": f"Captcha for {self.member.name}", "url": self.member.avatar_url}
         )
 
         try:
             await asyncio.sleep(1)
             bot_message: discord.Message = await self.channel.send(
                 content=self.member.mention,
-                embed=embed_and_file["embed"],
-                file=embed_and_file["image"],
+                embed=embed,
+                file=file,
                 delete_after=900,  # Delete after 15 minutes.
             )
         except discord.Forbidden:
@@ -160,22 +195,32 @@ class Challenge:
         """Wait for an action from the user.
 
         It will return an object of discord.Message or discord.Reaction depending what the user
-        did.
+        did, or None if the user left.
+        The cog's listeners resolve the challenge by looking it up in ``Captcha.waiting``, and
+        the cog's deadline wheel makes it time out.
         """
-        self.cancel_tasks()  # Just in case...
-        self.tasks = self._give_me_tasks()
-        done, pending = await asyncio.wait(
-            self.tasks,
-            timeout=self.config["timeout"] * 60,
-            return_when=asyncio.FIRST_COMPLETED,
-        )
-        self.cancel_tasks()
-        if len(done) == 0:
-            raise TimeoutError("User didn't answer.")
-        try:  # An error is raised if we return the result and when the task got cancelled.
-            return done.pop().result()
-        except asyncio.CancelledError:
-            return None
+        self.resolve(None)  # Just in case...
+        self.waiter = asyncio.get_running_loop().create_future()
+        key = (self.channel.id, self.member.id)
+        self.waiting[key] = self
+        self.deadlines.schedule((self.guild.id, self.member.id), self.deadline, self)
+        try:
+            return await self.waiter
+        finally:
+            if self.waiting.get(key) is self:
+                del self.waiting[key]
+            self.deadlines.cancel((self.guild.id, self.member.id))
+            self.waiter = None
+
+    def resolve(self, action: Union[discord.Reaction, discord.Message, None]) -> None:
+        """Hand an action to the pending ``wait_for_action``, if any."""
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(action)
+
+    def expire(self) -> None:
+        """Make the pending ``wait_for_action`` time out, if any."""
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_exception(TimeoutError("User didn't answer."))
 
     async def reload(self) -> None:
         """
@@ -196,21 +241,12 @@ class Challenge:
                 )
             )
 
-        self.captcha.code = discapty.discapty.random_code()
-        embed_and_file = await self.captcha.generate_embed(
-            guild_name=self.guild.name,
-            title="{guild} Verification System".format(guild=self.guild.name),
-            footer={"text": f"Tries: {self.trynum} / Limit: {self.limit}"},
-            description=(
-                "Please return me the code on the following image. The code is made of 8 "
-                "characters."
-            ),
-        )
+        embed, file = await self._obtain_captcha()
 
         try:
             bot_message: discord.Message = await self.channel.send(
-                embed=embed_and_file["embed"],
-                file=embed_and_file["image"],
+                embed=embed,
+                file=file,
                 delete_after=900,  # Delete after 15 minutes.
             )
         except discord.Forbidden:
@@ -221,17 +257,33 @@ class Challenge:
         except discord.Forbidden:
             raise MissingPermissions("Cannot react in verification channel.")
 
+    async def _obtain_captcha(self, *, author: dict = None):
+        """
+        Take a pre-rendered captcha from the pool and build the embed to send.
+        """
+        code, rendered = await self.pool.get(self.type)
+        self.captcha.code = code
+        self.code_hash = hash_code(code)
+        if isinstance(rendered, str):
+            # Plain captcha, keep the obfuscated code to refuse copy/paste.
+            self.captcha.generated_code = rendered
+        return build_captcha_embed(
+            rendered,
+            title=f"{self.guild.name} Verification System",
+            description=(
+                "Please return me the code on the following image. The code is made of 8 "
+                "characters."
+            ),
+            author=author,
+            footer={"text": f"Tries: {self.trynum} / Limit: {self.limit}"},
+        )
+
     async def verify(self, code_input: str) -> bool:
         """Verify a code."""
+        if self.resumed:
+            return hash_code(code_input) == self.code_hash
         return await self.captcha.verify_code(code_input)
 
-    def cancel_tasks(self) -> None:
-        """Cancel the ongoing tasks."""
-        for task in self.tasks:
-            task: asyncio.Task
-            if not task.done():
-                task.cancel()
-
     async def cleanup_messages(self) -> bool:
         """
         Remove every stocked messages.
@@ -240,11 +292,6 @@ class Challenge:
         """
         errored = False
         for message in self.messages.items():
-            if message[0] == "bot_challenge":
-                self.cancel_tasks()
-            if message[0] == "logs":
-                # We don't want to delete logs.
-                continue
             try:
                 await message[1].delete()
                 del message
@@ -256,31 +303,6 @@ class Challenge:
                 errored = True
         return not errored  # Return if deleted, contrary of erroring, big brain
 
-    def _give_me_tasks(self) -> list:
-        def leave_check(u):
-            return u.id == self.member.id
-
-        return [
-            asyncio.create_task(
-                self.bot.wait_for(
-                    "reaction_add",
-                    check=ReactionPredicate.with_emojis(
-                        "🔁", message=self.messages["bot_challenge"], user=self.member
-                    ),
-                )
-            ),
-            asyncio.create_task(
-                self.bot.wait_for(
-                    "message",
-                    check=MessagePredicate.same_context(
-                        channel=self.channel,
-                        user=self.member,
-                    ),
-                )
-            ),
-            asyncio.create_task(self.bot.wait_for("user_remove", check=leave_check)),
-        ]
-
 
 # class ListenersAPI:
 #     @commands.Cog.listener()
@@ -1,17 +1,23 @@
+import asyncio
 import logging
+import time
 from contextlib import suppress
 from datetime import datetime
-from typing import Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import discord
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 from redbot.core.commands import MissingPermissions
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.chat_formatting import bold, error, humanize_list
 
 from .abc import CompositeMetaClass
+from .actions import ActionQueue
+from .admission import AdmissionQueue
 from .api import Challenge
-from .commands import OwnerCommands, Settings
+from .commands import OwnerCommands, Settings, Status
+from .deadlines import DeadlineWheel
 from .errors import (
     AlreadyHaveCaptchaError,
     AskedForReload,
@@ -21,9 +27,22 @@ from .errors import (
 )
 from .events import Listeners
 from .informations import __author__, __patchnote__, __patchnote_version__, __version__
+from .journal import ChallengeJournal
+from .logsink import LogSink
+from .metrics import GuildMetrics
+from .pool import CaptchaPool
+from .render import CaptchaRenderer
+from .risk import RiskScorer
 from .utils import build_kick_embed
 
-DEFAULT_GLOBAL = {"log_level": 50}
+DEFAULT_GLOBAL = {
+    "log_level": 50,
+    "pool_size": 50,  # Number of pre-rendered captchas kept per type.
+    "pool_low_water": 10,  # Refill the pool when it goes under this number.
+    "render_backend": "thread",  # Where captchas are drawn, "inline", "thread" or "process".
+    "render_workers": 2,  # Number of threads or processes drawing captchas.
+    "render_font": None,  # Font used in captchas, None for a mix of every font.
+}
 DEFAULT_GUILD = {
     "channel": None,  # The channel where the captcha is sent.
     "logschannel": None,  # Where logs are sent.
@@ -33,6 +52,13 @@ DEFAULT_GUILD = {
     "type": "plain",  # Captcha type.
     "timeout": 5,  # Time in minutes before kicking.
     "retry": 3,  # The numnber of retry allowed.
+    "concurrency": 25,  # Number of challenges running at the same time.
+    "queue_order": "fifo",  # How waiting members are admitted, "fifo" or "age".
+    "risk": False,  # If joining members are scored before being challenged.
+    "risk_low": 20,  # Members under this score are let in without challenge.
+    "risk_high": 60,  # Members from this score are escalated or kicked during a surge.
+    "risk_action": "escalate",  # What to do with high risk members, "escalate" or "kick".
+    "surge_joins": 10,  # Number of joins in a minute considered as a surge.
 }
 log = logging.getLogger("red.kreusada.captcha")
 
@@ -40,6 +66,7 @@ log = logging.getLogger("red.kreusada.captcha")
 class Captcha(
     Settings,
     OwnerCommands,
+    Status,
     Listeners,
     commands.Cog,
     name="Captcha",
@@ -61,6 +88,18 @@ class Captcha(
         self.data.register_guild(**DEFAULT_GUILD)
 
         self.running = {}
+        self.guild_settings: Dict[int, dict] = {}
+        # (channel ID, member ID) -> Challenge waiting for an action from the member.
+        self.waiting: Dict[Tuple[int, int], Challenge] = {}
+        self.renderer = CaptchaRenderer()
+        self.pool = CaptchaPool(self.renderer)
+        self.log_sinks: Dict[int, LogSink] = {}
+        self.journal = ChallengeJournal()
+        self.deadlines = DeadlineWheel(self._expire_attempts)
+        self.admissions: Dict[int, AdmissionQueue] = {}
+        self.action_queues: Dict[int, ActionQueue] = {}
+        self.metrics: Dict[int, GuildMetrics] = {}
+        self.risk_scorers: Dict[int, RiskScorer] = {}
 
         self.patchnote = __patchnote__
         self.patchnoteconfig = None
@@ -69,7 +108,6 @@ class Captcha(
         self,
         guild: discord.Guild,
         message_content: str,
-        message_to_update: Optional[discord.Message] = None,
         *,
         allowed_tries: tuple = None,
         member: discord.Member = None,
@@ -78,61 +116,63 @@ class Captcha(
         ignore_error: bool = True,
     ) -> Optional[discord.Message]:
         """
-        Send a message or update one in the log channel.
+        Log an event in the log channel.
+
+        Events are buffered in the guild's log sink and written in batches. A message is only
+        sent right away, and returned, if a file or an embed is given.
         """
         time = datetime.now().strftime("%H:%M - %m/%d/%Y")
-        content = ""
-        if message_to_update:
-            content += message_to_update.content + "\n"
-        content += (
+        content = (
             f"{bold(str(time))}{f' {member.mention}' if member else ''}"
             f"{f' ({allowed_tries[0]}/{allowed_tries[1]})' if allowed_tries else ''}: "
             f"{message_content}"
         )
 
-        log_channel_id: Union[int, None] = await self.data.guild(guild).logschannel()
+        settings = await self.get_guild_settings(guild)
+        log_channel_id: Union[int, None] = settings["logschannel"]
         if not log_channel_id:
             if ignore_error:
                 return None
             raise MissingRequiredValueError("Missing logging channel ID.")
 
         log_channel: discord.TextChannel = self.bot.get_channel(log_channel_id)
-        if log_channel and message_to_update:
-            try:
-                await message_to_update.edit(
-                    content=content,
-                    file=file,
-                    embed=embed,
-                    allowed_mentions=discord.AllowedMentions(users=False),
-                )
-            except discord.HTTPException:
-                if message_to_update.embeds and (
-                    message_to_update.embeds[0].title == "Message reached his maximum capacity!"
-                ):
-                    # To avoid edit spam or something... smh
-                    return message_to_update
-                await message_to_update.edit(
-                    content=message_to_update.content,
-                    file=file,
-                    embed=discord.Embed(
-                        colour=discord.Colour.red().value,
-                        title="Message reached his maximum capacity!",
-                        description=(
-                            "I am unable to log more since the characters limit on this "
-                            "message has been reached."
-                        ),
-                    ),
-                    allowed_mentions=discord.AllowedMentions(users=False),
-                )
-            return message_to_update
-        if log_channel:
+        if not log_channel:
+            raise DeletedValueError("Logging channel may have been deleted.")
+        if file or embed:
             return await log_channel.send(
                 content,
                 file=file,
                 embed=embed,
                 allowed_mentions=discord.AllowedMentions(users=False),
             )
-        raise DeletedValueError("Logging channel may have been deleted.")
+
+        try:
+            sink = self.log_sinks[guild.id]
+        except KeyError:
+            sink = self.log_sinks[guild.id] = LogSink(log_channel)
+        else:
+            sink.set_channel(log_channel)
+        sink.push(content)
+        return None
+
+    async def get_guild_settings(self, guild: discord.Guild) -> dict:
+        """
+        Obtain the settings snapshot of a guild.
+
+        The snapshot is loaded once and kept until a setting command invalidate it. It must
+        not be modified.
+        """
+        try:
+            return self.guild_settings[guild.id]
+        except KeyError:
+            settings = self.guild_settings[guild.id] = await self.data.guild(guild).all()
+            return settings
+
+    def invalidate_guild_settings(self, guild: discord.Guild) -> None:
+        """
+        Forget the settings snapshot of a guild, must be called after each change.
+        """
+        self.guild_settings.pop(guild.id, None)
 
     async def basic_check(self, member: discord.Member) -> bool:
         """
@@ -140,7 +180,7 @@ class Captcha(
         """
         if member.bot:
             return False
-        return await self.data.guild(member.guild).enabled()
+        return (await self.get_guild_settings(member.guild))["enabled"]
 
     async def create_challenge_for(self, member: discord.Member) -> Challenge:
         """
@@ -148,55 +188,184 @@ class Captcha(
         """
         if member.id in self.running:
             raise AlreadyHaveCaptchaError("The user already have a captcha object running.")
-        captcha = Challenge(self.bot, member, await self.data.guild(member.guild).all())
+        captcha = Challenge(self.bot, member, await self.get_guild_settings(member.guild))
         self.running[member.id] = captcha
+        captcha.metrics.started += 1
         return captcha
 
     async def delete_challenge_for(self, member: discord.Member) -> bool:
         try:
-            del self.running[member.id]
-            return True
+            challenge = self.running.pop(member.id)
+        except KeyError:
+            return False
+        self.journal.discard(challenge.guild.id, member.id)
+        return True
+
+    def _expire_attempts(self, challenges: List[Challenge]) -> None:
+        """
+        Time out the attempts whose deadline passed, the members are then kicked.
+        """
+        for challenge in challenges:
+            challenge.expire()
+        log.debug("{count} attempts timed out.".format(count=len(challenges)))
+
+    def get_metrics(self, guild: discord.Guild) -> GuildMetrics:
+        """
+        Obtain the counters of a guild, creating them if needed.
+        """
+        try:
+            metrics = self.metrics[guild.id]
         except KeyError:
+            metrics = self.metrics[guild.id] = GuildMetrics()
+        return metrics
+
+    def get_status(self, guild: discord.Guild) -> dict:
+        """
+        Obtain the live status of Captcha in a guild.
+        """
+        status = self.get_metrics(guild).to_dict()
+        admission = self.admissions.get(guild.id)
+        admission_stats = admission.stats() if admission else {}
+        actions = self.action_queues.get(guild.id)
+        sink = self.log_sinks.get(guild.id)
+        status.update(
+            active=admission_stats.get("active", 0),
+            queued=admission_stats.get("depth", 0),
+            mean_admission_wait=admission_stats.get("mean_wait", 0.0),
+            actions_pending=actions.pending if actions else 0,
+            actions_rate_limited=actions.rate_limited if actions else 0,
+            log_lines_pending=sink.pending if sink else 0,
+            mean_render_time=self.pool.stats()["mean_render_time"],
+        )
+        return status
+
+    def get_admission_queue(self, guild: discord.Guild, config: dict) -> AdmissionQueue:
+        """
+        Obtain the admission queue of a guild, creating it if needed.
+        """
+        try:
+            queue = self.admissions[guild.id]
+        except KeyError:
+            queue = self.admissions[guild.id] = AdmissionQueue(
+                config["concurrency"], config["queue_order"]
+            )
+        return queue
+
+    def get_risk_scorer(self, guild: discord.Guild) -> RiskScorer:
+        """
+        Obtain the risk scorer of a guild, creating it if needed.
+        """
+        try:
+            scorer = self.risk_scorers[guild.id]
+        except KeyError:
+            scorer = self.risk_scorers[guild.id] = RiskScorer()
+        return scorer
+
+    async def screen_member(self, challenge: Challenge) -> bool:
+        """
+        Score the risk of a joining member, if enabled in the guild.
+
+        Low risk members are given their roles right away, high risk members joining during a
+        surge are either given an image captcha or kicked. Return True if the member has been
+        handled and must not be challenged.
+        """
+        config = challenge.config
+        if not config["risk"]:
+            return False
+        score, surge = self.get_risk_scorer(challenge.guild).score(
+            challenge.member, config["surge_joins"]
+        )
+        if not surge and score < config["risk_low"]:
+            roles = [challenge.guild.get_role(role) for role in config["autoroles"]]
+            try:
+                await self.congratulation(challenge, roles)
+            except MissingPermissions:
+                return False  # Let the challenge deal with it.
+            challenge.metrics.trusted += 1
+            await self.send_or_update_log_message(
+                challenge.guild,
+                bold(f"Low risk score ({score}), roles added without challenge."),
+                member=challenge.member,
+            )
+            return True
+        if not surge or score < config["risk_high"]:
             return False
 
+        if config["risk_action"] == "kick":
+            reason = "Considered as part of a raid."
+            try:
+                await self.nicely_kick_user_from_challenge(challenge, reason)
+            except MissingPermissions:
+                await self.send_or_update_log_message(
+                    challenge.guild,
+                    error(bold("Permission missing for kicking member!")),
+                    member=challenge.member,
+                )
+                return False
+            challenge.metrics.risk_kicked += 1
+            await self.send_or_update_log_message(
+                challenge.guild,
+                bold(f"High risk score ({score}) during a surge, user kicked."),
+                member=challenge.member,
+            )
+            return True
+
+        if challenge.type != "image":
+            self.pool.want("image")
+            challenge.escalate("image")
+        challenge.metrics.escalated += 1
+        await self.send_or_update_log_message(
+            challenge.guild,
+            bold(f"High risk score ({score}) during a surge, challenge escalated."),
+            member=challenge.member,
+        )
+        return False
+
     def is_running_challenge(self, member_or_id: Union[discord.Member, int]) -> bool:
-        if isinstance(member_or_id, discord.Member):
+        if not isinstance(member_or_id, int):
             member_or_id = int(member_or_id.id)
         return member_or_id in self.running
 
     def obtain_challenge(self, member_or_id: Union[discord.Member, int]) -> Challenge:
-        if isinstance(member_or_id, discord.Member):
+        if not isinstance(member_or_id, int):
             member_or_id = int(member_or_id.id)
         if not self.is_running_challenge(member_or_id):
             raise KeyError("User is not challenging any Captcha.")
         return self.running[member_or_id]
 
+    def get_action_queue(self, guild: discord.Guild) -> ActionQueue:
+        """
+        Obtain the REST action queue of a guild, creating it if needed.
+        """
+        try:
+            queue = self.action_queues[guild.id]
+        except KeyError:
+            queue = self.action_queues[guild.id] = ActionQueue()
+        return queue
+
     async def give_temprole(self, challenge: Challenge) -> None:
         temprole = challenge.config["temprole"]
         if temprole:
-            try:
-                await challenge.member.add_roles(
-                    challenge.guild.get_role(temprole), reason="Beginning Captcha challenge."
-                )
-            except discord.Forbidden:
-                raise MissingPermissions('Bot miss the "manage_roles" permission.')
+            await self.get_action_queue(challenge.guild).edit_roles(
+                challenge.member,
+                add=[challenge.guild.get_role(temprole)],
+                reason="Beginning Captcha challenge.",
+            )
 
     async def remove_temprole(self, challenge: Challenge) -> None:
         temprole = challenge.config["temprole"]
         if temprole:
-            try:
-                await challenge.member.remove_roles(
-                    challenge.guild.get_role(temprole), reason="Finishing Captcha challenge."
-                )
-            except discord.Forbidden:
-                raise MissingPermissions('Bot miss the "manage_roles" permission.')
+            await self.get_action_queue(challenge.guild).edit_roles(
+                challenge.member,
+                remove=[challenge.guild.get_role(temprole)],
+                reason="Finishing Captcha challenge.",
+            )
 
     async def realize_challenge(self, challenge: Challenge) -> None:
         # Seems to be the last goddamn function I'll be writing...
-        limit = await self.data.guild(challenge.member.guild).retry()
+        limit = challenge.config["retry"]
         is_ok = None
         timeout = False
-        await self.give_temprole(challenge)
         try:
             while is_ok is not True:
                 if challenge.trynum > limit:
@@ -210,6 +379,7 @@ class Captcha(
                     challenge.trynum += 1
                     continue
                 except LeftServerError:
+                    challenge.metrics.left += 1
                     return False
                 except TypeError:
                     # In this error, the user reacted with an invalid (Most probably custom)
@@ -224,7 +394,6 @@ class Captcha(
                         await self.send_or_update_log_message(
                             challenge.guild,
                             error(bold("Unable to delete member's answer.")),
-                            challenge.messages.get("logs"),
                             member=challenge.member,
                         )
                     is_ok = False
@@ -232,9 +401,12 @@ class Captcha(
                     is_ok = True
 
             failed = challenge.trynum > limit
-            logmsg = challenge.messages["logs"]
 
             if failed or timeout:
+                if failed:
+                    challenge.metrics.failed += 1
+                else:
+                    challenge.metrics.timed_out += 1
                 reason = (
                     "Retried the captcha too many time."
                     if failed
@@ -245,29 +417,23 @@ class Captcha(
                     await self.send_or_update_log_message(
                         challenge.guild,
                         bold(f"User kicked for reason: {reason}"),
-                        logmsg,
                         member=challenge.member,
                     )
                 except MissingPermissions:
                     await self.send_or_update_log_message(
                         challenge.guild,
                         error(bold("Permission missing for kicking member!")),
-                        logmsg,
                         member=challenge.member,
                     )
                 return True
 
-            roles = [
-                challenge.guild.get_role(role)
-                for role in await self.data.guild(challenge.guild).autoroles()
-            ]
+            challenge.metrics.passed += 1
+            roles = [challenge.guild.get_role(role) for role in challenge.config["autoroles"]]
             try:
                 await self.congratulation(challenge, roles)
-                await self.remove_temprole(challenge)
                 await self.send_or_update_log_message(
                     challenge.guild,
                     bold("Roles added, Captcha passed."),
-                    logmsg,
                     member=challenge.member,
                 )
             except MissingPermissions:
@@ -292,18 +458,17 @@ class Captcha(
                 await self.send_or_update_log_message(
                     challenge.guild,
                     error(bold("Permission missing for giving roles! Member alerted.")),
-                    logmsg,
                     member=challenge.member,
                 )
 
         finally:
             try:
-                await challenge.cleanup_messages()
+                if not challenge.suspended:
+                    await challenge.cleanup_messages()
             except MissingPermissions:
                 await self.send_or_update_log_message(
                     challenge.guild,
                     error(bold("Missing permissions for deleting all messages for verification!")),
-                    challenge.messages.get("logs"),
                     member=challenge.member,
                 )
         return True
@@ -311,6 +476,8 @@ class Captcha(
     async def congratulation(self, challenge: Challenge, roles: list) -> None:
         """
         Congrats to a member! He finished the captcha!
+
+        The roles are given and the temporary role removed in a single member edit.
         """
         # Admin may have set channel to be DM, checking for manage_roles is useless since
         # it always return False, instead, we're taking a random text channel of the guild
@@ -323,7 +490,13 @@ class Captcha(
         if not channel.permissions_for(self.bot.get_guild(challenge.guild.id).me).manage_roles:
             raise MissingPermissions('Bot miss the "manage_roles" permission.')
 
-        await challenge.member.add_roles(*roles, reason="Passed Captcha successfully.")
+        temprole = challenge.config["temprole"]
+        await self.get_action_queue(challenge.guild).edit_roles(
+            challenge.member,
+            add=roles,
+            remove=[challenge.guild.get_role(temprole)] if temprole else [],
+            reason="Passed Captcha successfully.",
+        )
 
     async def nicely_kick_user_from_challenge(self, challenge: Challenge, reason: str) -> bool:
         # We're gonna check our permission first, to avoid DMing the user for nothing.
@@ -339,13 +512,9 @@ class Captcha(
         if not channel.permissions_for(self.bot.get_guild(challenge.guild.id).me).kick_members:
             raise MissingPermissions('Bot miss the "kick_members" permission.')
 
-        with suppress(discord.Forbidden, discord.HTTPException):
-            await challenge.member.send(embed=build_kick_embed(challenge.guild, reason))
-        try:
-            await challenge.guild.kick(challenge.member, reason=reason)
-        except discord.Forbidden:
-            raise MissingPermissions("Unable to kick member.")
-        return True
+        return await self.get_action_queue(challenge.guild).kick(
+            challenge.member, reason=reason, embed=build_kick_embed(challenge.guild, reason)
+        )
 
     # PLEASE DON'T TOUCH THOSE FUNCTIONS WITH YOUR COG OR EVAL. Thanks. - Pred
     # Those should only be used by the cog - 4 bags of None of your business.
@@ -362,12 +531,47 @@ class Captcha(
             version=self.__version__,
         )
 
+    def cog_unload(self) -> None:
+        # Closing the journal first keep the running challenges on disk, they will be resumed
+        # when the cog is loaded again.
+        self.journal.close()
+        for challenge in self.running.values():
+            if challenge.task:
+                challenge.suspended = True
+                challenge.task.cancel()
+        self.pool.stop()
+        self.renderer.stop()
+        self.deadlines.stop()
+        for queue in self.action_queues.values():
+            queue.stop()
+        for sink in self.log_sinks.values():
+            if sink.pending:
+                asyncio.create_task(sink.flush())
+
     async def _initialize(self, send_patchnote: bool = True) -> None:
         """
         An initializer for the cog.
-        It just set the logging level and send the patchnote if asked.
+        It set the logging level, warm up the captcha pool and send the patchnote if asked.
         """
-        log_level = await self.data.log_level()
+        global_data = await self.data.all()
+        self.renderer.configure(
+            global_data["render_backend"],
+            global_data["render_workers"],
+            global_data["render_font"],
+        )
+        self.pool.size = global_data["pool_size"]
+        self.pool.low_water = global_data["pool_low_water"]
+        self.guild_settings.update(await self.data.all_guilds())
+        for guild_data in self.guild_settings.values():
+            if guild_data["enabled"]:
+                self.pool.want(guild_data["type"])
+                if guild_data["risk"] and guild_data["risk_action"] == "escalate":
+                    self.pool.want("image")
+        self.pool.start()
+        if not self.journal.opened:
+            await self._restore_challenges()
+
+        log_level = global_data["log_level"]
         log.setLevel(log_level)
         log.info("Captcha logging level has been set to: {lev}".format(lev=log_level))
         log.debug(
@@ -378,6 +582,63 @@ class Captcha(
         if send_patchnote:
             await self._send_patchnote()
 
+    async def _restore_challenges(self) -> None:
+        """
+        Resume the challenges that were running before the cog was unloaded, and kick in bulk
+        the members whose challenge expired meanwhile.
+        """
+        entries = await self.journal.open(cog_data_path(self) / "challenges.journal")
+        if not entries:
+            return
+        await self.bot.wait_until_red_ready()
+        now = time.time()
+        expired = []
+        resumed = 0
+        for (guild_id, member_id), entry in entries.items():
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(member_id) if guild else None
+            if (
+                member is None
+                or self.is_running_challenge(member)
+                or not await self.basic_check(member)
+            ):
+                self.journal.discard(guild_id, member_id)
+                continue
+            if entry["d"] and entry["d"] < now:
+                expired.append(self._expire_challenge(member, entry))
+                continue
+            asyncio.create_task(self.runner(member, resume=entry))
+            resumed += 1
+        await asyncio.gather(*expired)
+        log.info(
+            "Resumed {resumed} challenges, {expired} expired while unloaded.".format(
+                resumed=resumed, expired=len(expired)
+            )
+        )
+
+    async def _expire_challenge(self, member: discord.Member, entry: dict) -> None:
+        """
+        Kick a member whose challenge expired while the cog was unloaded.
+        """
+        reason = "Didn't answer to the challenge."
+        challenge = await self.create_challenge_for(member)
+        challenge.restore(entry)
+        try:
+            await self.nicely_kick_user_from_challenge(challenge, reason)
+            await self.send_or_update_log_message(
+                challenge.guild, bold(f"User kicked for reason: {reason}"), member=member
+            )
+        except MissingPermissions:
+            await self.send_or_update_log_message(
+                challenge.guild,
+                error(bold("Permission missing for kicking member!")),
+                member=member,
+            )
+        finally:
+            with suppress(MissingPermissions):
+                await challenge.cleanup_messages()
+            await self.delete_challenge_for(member)
+
     async def _send_patchnote(self) -> None:
         await self.bot.wait_until_red_ready()
         self.patchnoteconfig = notice = Config.get_conf(
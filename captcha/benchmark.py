@@ -0,0 +1,412 @@
+"""
+An offline benchmark of the join-to-verdict pipeline.
+
+A detached instance of the cog is given a fake bot, guild, channels and members and an
+in-memory Config, nothing is sent to Discord. Members join all at once and follow a script,
+answering right, wrong, reloading, never answering or leaving, which let us see how the
+pipeline hold up at raid scale.
+
+It runs in its own process, from the root of the repository::
+
+    python -m captcha.benchmark --joins 1000 --seed 42
+"""
+
+import argparse
+import asyncio
+import copy
+import itertools
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from unittest import mock
+
+SCRIPTS = ("pass", "wrong", "reload", "timeout", "leave")
+DEFAULT_MIX = {"pass": 0.7, "wrong": 0.1, "reload": 0.1, "timeout": 0.05, "leave": 0.05}
+
+_ids = itertools.count(1)
+
+
+class FakeUser:
+    def __init__(self) -> None:
+        self.id: int = next(_ids)
+
+
+class FakeRole:
+    def __init__(self, default: bool = False) -> None:
+        self.id: int = next(_ids)
+        self.default: bool = default
+
+    def is_default(self) -> bool:
+        return self.default
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content: str = "", embed=None) -> None:
+        self.id: int = next(_ids)
+        self.channel = channel
+        self.author = author
+        self.content: str = content
+        self.embeds: list = [embed] if embed else []
+
+    async def delete(self) -> None:
+        pass
+
+    async def add_reaction(self, emoji: str) -> None:
+        pass
+
+    async def edit(self, *, content: str = None, **_kwargs) -> None:
+        if content is not None:
+            self.content = content
+
+
+class FakeReaction:
+    def __init__(self, message: FakeMessage, emoji: str = "🔁") -> None:
+        self.message: FakeMessage = message
+        self.emoji: str = emoji
+
+
+class FakePermissions:
+    def __getattr__(self, name: str) -> bool:
+        return True
+
+
+class FakeChannel:
+    def __init__(self, bot_user) -> None:
+        self.id: int = next(_ids)
+        self.bot_user = bot_user
+        self.sent: int = 0
+
+    async def send(self, content: str = "", *, embed=None, **_kwargs) -> FakeMessage:
+        self.sent += 1
+        return FakeMessage(self, self.bot_user, content or "", embed)
+
+    def permissions_for(self, _member) -> FakePermissions:
+        return FakePermissions()
+
+
+class FakeGuild:
+    def __init__(self, bot_user) -> None:
+        self.id: int = next(_ids)
+        self.name: str = "Benchmark"
+        self.me = bot_user
+        self.text_channels: List[FakeChannel] = []
+        self.verdicts: Dict[int, str] = {}
+        self.default_role = FakeRole(default=True)
+        self.autorole = FakeRole()
+        self.temprole = FakeRole()
+        self.roles: Dict[int, FakeRole] = {
+            role.id: role for role in (self.default_role, self.autorole, self.temprole)
+        }
+
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return self.roles.get(role_id)
+
+    def get_member(self, _member_id: int) -> None:
+        return None
+
+    async def kick(self, member, *, reason: str = None) -> None:
+        self.verdicts.setdefault(member.id, "kicked")
+
+
+class FakeMember:
+    def __init__(self, guild: FakeGuild, script: str, account_age: timedelta) -> None:
+        self.id: int = next(_ids)
+        self.guild: FakeGuild = guild
+        self.script: str = script
+        self.actions: int = 0
+
+        self.name: str = "member{id}".format(id=self.id)
+        self.mention: str = "<@{id}>".format(id=self.id)
+        self.avatar: Optional[str] = None
+        self.avatar_url: str = ""
+        self.bot: bool = False
+        self.created_at: datetime = datetime.utcnow() - account_age
+        self.dm_channel: Optional[FakeChannel] = None
+        self.roles: List[FakeRole] = [guild.default_role]
+
+    async def send(self, *_args, **_kwargs) -> None:
+        pass
+
+    async def add_roles(self, *roles: FakeRole, reason: str = None) -> None:
+        self.roles.extend(role for role in roles if role not in self.roles)
+        if self.guild.autorole in roles:
+            self.guild.verdicts.setdefault(self.id, "passed")
+
+    async def remove_roles(self, *roles: FakeRole, reason: str = None) -> None:
+        self.roles = [role for role in self.roles if role not in roles]
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.user = FakeUser()
+        self.cog = None
+        self.guild = FakeGuild(self.user)
+        self.channels: Dict[int, FakeChannel] = {}
+
+    def add_channel(self) -> FakeChannel:
+        channel = FakeChannel(self.user)
+        self.channels[channel.id] = channel
+        self.guild.text_channels.append(channel)
+        return channel
+
+    def get_cog(self, _name: str):
+        return self.cog
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self.channels.get(channel_id)
+
+    def get_guild(self, _guild_id: int) -> FakeGuild:
+        return self.guild
+
+
+class _StubGroup:
+    def __init__(self, defaults: dict) -> None:
+        self.defaults: dict = defaults
+
+    async def all(self) -> dict:
+        return copy.deepcopy(self.defaults)
+
+
+class StubConfig:
+    """An in-memory stand-in for Red's Config, only holding the registered defaults."""
+
+    def __init__(self) -> None:
+        self.defaults: Dict[str, dict] = {"global": {}, "guild": {}}
+
+    @classmethod
+    def get_conf(cls, *_args, **_kwargs) -> "StubConfig":
+        return cls()
+
+    def register_global(self, **defaults) -> None:
+        self.defaults["global"].update(defaults)
+
+    def register_guild(self, **defaults) -> None:
+        self.defaults["guild"].update(defaults)
+
+    async def all(self) -> dict:
+        return copy.deepcopy(self.defaults["global"])
+
+    async def all_guilds(self) -> dict:
+        return {}
+
+    def guild(self, _guild) -> _StubGroup:
+        return _StubGroup(self.defaults["guild"])
+
+
+class ScriptedWaiting(dict):
+    """The dispatch table of the benchmarked cog, answering for members when they're waited."""
+
+    def __init__(self, think_time: float) -> None:
+        super().__init__()
+        self.cog = None
+        self.think_time: float = think_time
+        self.tasks: List[asyncio.Task] = []
+
+    def __setitem__(self, key, challenge) -> None:
+        super().__setitem__(key, challenge)
+        self.tasks.append(asyncio.create_task(self.act(challenge)))
+
+    async def act(self, challenge) -> None:
+        member: FakeMember = challenge.member
+        member.actions += 1
+        await asyncio.sleep(self.think_time)
+        if member.script == "timeout":
+            return
+        if member.script == "leave":
+            member.guild.verdicts.setdefault(member.id, "left")
+            await self.cog.on_member_remove(member)
+            return
+        if member.script == "reload" and member.actions == 1:
+            reaction = FakeReaction(challenge.messages["bot_challenge"])
+            await self.cog.on_reaction_add(reaction, member)
+            return
+        content = "WRONG" if member.script == "wrong" else challenge.captcha.code
+        await self.cog.on_message(FakeMessage(challenge.channel, member, content))
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def _watch_loop_lag(samples: List[float], interval: float = 0.05) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+async def run_benchmark(
+    cog_class,
+    *,
+    joins: int = 200,
+    captcha_type: str = "plain",
+    mix: Dict[str, float] = None,
+    think_time: float = 0.05,
+    timeout: float = 5.0,
+    concurrency: int = 25,
+    risk: bool = False,
+    seed: Optional[int] = None,
+    trace_memory: bool = True,
+) -> dict:
+    """Run the benchmark and return its report.
+
+    ``timeout`` is in seconds. The same ``seed`` always give the same scripts. With ``risk``,
+    members are scored before being challenged, every join happening during a surge.
+    With ``trace_memory``, every allocation is traced to report the peak memory, which slows
+    the run down.
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+
+    bot = FakeBot()
+    challenge_channel = bot.add_channel()
+    logs_channel = bot.add_channel()
+    with mock.patch("{module}.Config".format(module=cog_class.__module__), StubConfig):
+        cog = bot.cog = cog_class(bot)
+    cog.waiting = waiting = ScriptedWaiting(think_time)
+    waiting.cog = cog
+    cog.guild_settings[bot.guild.id] = {
+        "channel": challenge_channel.id,
+        "logschannel": logs_channel.id,
+        "enabled": True,
+        "autoroles": [bot.guild.autorole.id],
+        "temprole": bot.guild.temprole.id,
+        "type": captcha_type,
+        "timeout": timeout / 60,
+        "retry": 3,
+        "concurrency": concurrency,
+        "queue_order": "fifo",
+        "risk": risk,
+        "risk_low": 20,
+        "risk_high": 60,
+        "risk_action": "escalate",
+        "surge_joins": 10,
+    }
+
+    members = [
+        FakeMember(
+            bot.guild,
+            rng.choices(tuple(mix), weights=tuple(mix.values()))[0],
+            timedelta(days=rng.randint(0, 2000)),
+        )
+        for _ in range(joins)
+    ]
+    durations: List[float] = []
+
+    async def join(member: FakeMember) -> None:
+        start = time.perf_counter()
+        await cog.runner(member)
+        durations.append(time.perf_counter() - start)
+
+    lag: List[float] = []
+    lag_watcher = asyncio.create_task(_watch_loop_lag(lag))
+    cog.pool.start()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(join(member) for member in members))
+        elapsed = time.perf_counter() - start
+        _current, peak_memory = tracemalloc.get_traced_memory() if trace_memory else (0, 0)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        lag_watcher.cancel()
+        for task in waiting.tasks:
+            task.cancel()
+        for sink in cog.log_sinks.values():
+            await sink.flush()
+        actions = cog.get_action_queue(bot.guild).stats()
+        status = cog.get_status(bot.guild)
+        cog.cog_unload()
+
+    verdicts = {verdict: 0 for verdict in ("passed", "kicked", "left")}
+    for verdict in bot.guild.verdicts.values():
+        verdicts[verdict] += 1
+    return {
+        "joins": joins,
+        "seed": seed,
+        "elapsed": elapsed,
+        "throughput": joins / elapsed if elapsed else 0.0,
+        "p50": _percentile(durations, 50),
+        "p99": _percentile(durations, 99),
+        "max_loop_lag": max(lag, default=0.0),
+        "mean_loop_lag": sum(lag) / len(lag) if lag else 0.0,
+        "peak_memory": peak_memory,
+        "verdicts": verdicts,
+        "unresolved": joins - len(bot.guild.verdicts),
+        "messages_sent": challenge_channel.sent,
+        "log_messages_sent": logs_channel.sent,
+        "pool": cog.pool.stats(),
+        "actions": actions,
+        "status": status,
+    }
+
+
+def format_report(report: dict) -> str:
+    verdicts = report["verdicts"]
+    return (
+        "Members: {joins} ({scripts}) | Seed: {seed}\n"
+        "Elapsed: {elapsed:.2f}s | Throughput: {throughput:.1f} verdicts/s\n"
+        "Time to verdict: p50 {p50:.2f}s | p99 {p99:.2f}s\n"
+        "Loop lag: mean {mean_lag:.1f}ms | max {max_lag:.1f}ms\n"
+        "Peak memory: {memory} KiB\n"
+        "Passed: {passed} | Kicked: {kicked} | Left: {left} | Unresolved: {unresolved}\n"
+        "Challenge messages: {sent} | Log messages: {log_sent}\n"
+        "Pool hits: {hits} | Pool misses: {misses}\n"
+        "REST actions: {actions_done} | Rate limited: {rate_limited}"
+    ).format(
+        joins=report["joins"],
+        scripts=", ".join(SCRIPTS),
+        seed=report["seed"],
+        elapsed=report["elapsed"],
+        throughput=report["throughput"],
+        p50=report["p50"],
+        p99=report["p99"],
+        mean_lag=report["mean_loop_lag"] * 1000,
+        max_lag=report["max_loop_lag"] * 1000,
+        memory=report["peak_memory"] // 1024,
+        passed=verdicts["passed"],
+        kicked=verdicts["kicked"],
+        left=verdicts["left"],
+        unresolved=report["unresolved"],
+        sent=report["messages_sent"],
+        log_sent=report["log_messages_sent"],
+        hits=report["pool"]["hits"],
+        misses=report["pool"]["misses"],
+        actions_done=report["actions"]["done"],
+        rate_limited=report["actions"]["rate_limited"],
+    )
+
+
+def main(argv: List[str] = None) -> None:
+    from .base import Captcha
+    from .pool import CAPTCHA_TYPES
+
+    parser = argparse.ArgumentParser(
+        prog="python -m captcha.benchmark", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument("--joins", type=int, default=200, help="Members joining at once.")
+    parser.add_argument("--type", choices=CAPTCHA_TYPES, default="plain", dest="captcha_type")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Seconds before a kick.")
+    parser.add_argument("--think-time", type=float, default=0.05, help="Seconds to answer.")
+    parser.add_argument("--concurrency", type=int, default=25, help="Challenges at once.")
+    parser.add_argument("--risk", action="store_true", help="Score members before challenges.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the member scripts.")
+    parser.add_argument(
+        "--no-memory", action="store_false", dest="trace_memory", help="Don't trace memory."
+    )
+    args = parser.parse_args(argv)
+    report = asyncio.run(run_benchmark(Captcha, **vars(args)))
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
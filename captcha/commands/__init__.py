@@ -1,2 +1,3 @@
 from .global_settings import OwnerCommands
 from .settings import Settings
+from .status import Status
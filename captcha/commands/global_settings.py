@@ -2,9 +2,17 @@ from abc import ABCMeta
 from enum import Enum
 
 from redbot.core import commands
-from redbot.core.utils.chat_formatting import warning
+from redbot.core.utils.chat_formatting import (
+    box,
+    humanize_list,
+    humanize_number,
+    info,
+    inline,
+    warning,
+)
 
 from ..abc import MixinMeta
+from ..render import FONTS, RENDER_BACKENDS
 
 
 class OwnerCommands(MixinMeta, metaclass=ABCMeta):
@@ -49,6 +57,126 @@ class OwnerCommands(MixinMeta, metaclass=ABCMeta):
 
         await self._initialize(False)
 
+    @ownercmd.command(name="poolsize")
+    async def pool_size_setter(self, ctx: commands.Context, size: int):
+        """
+        Set how many pre-rendered captchas are kept for each captcha type.
+
+        Captchas are rendered in the background so members joining in mass don't have to wait
+        for their image to be drawn.
+        """
+        if size < 1:
+            await ctx.send("The pool size must be at least 1.")
+            return
+        if size <= self.pool.low_water:
+            await ctx.send("The pool size must be higher than the refill threshold.")
+            return
+        await self.data.pool_size.set(size)
+        self.pool.size = size
+        self.pool.refill()
+        await ctx.send(info("The pool will now keep {size} captchas per type.".format(size=size)))
+
+    @ownercmd.command(name="poolrefill")
+    async def pool_low_water_setter(self, ctx: commands.Context, threshold: int):
+        """
+        Set under how many available captchas the pool is refilled.
+        """
+        if threshold < 0:
+            await ctx.send("The refill threshold cannot be less than 0.")
+            return
+        if threshold >= self.pool.size:
+            await ctx.send("The refill threshold must be lower than the pool size.")
+            return
+        await self.data.pool_low_water.set(threshold)
+        self.pool.low_water = threshold
+        await ctx.send(
+            info(
+                "The pool will be refilled when less than {threshold} captchas are "
+                "available.".format(threshold=threshold)
+            )
+        )
+
+    @ownercmd.command(name="poolstats")
+    async def pool_stats(self, ctx: commands.Context):
+        """
+        Show the state of the pre-rendered captcha pool.
+        """
+        stats = self.pool.stats()
+        requests = stats["hits"] + stats["misses"]
+        message = (
+            "Pool size: {size} (refilled under {low_water})\n"
+            "Render backend: {backend}\n"
+            "Hits: {hits} | Misses: {misses} | Hit rate: {rate}\n"
+        ).format(
+            size=stats["size"],
+            low_water=stats["low_water"],
+            backend=stats["backend"],
+            hits=humanize_number(stats["hits"]),
+            misses=humanize_number(stats["misses"]),
+            rate="{:.1%}".format(stats["hits"] / requests) if requests else "N/A",
+        )
+        for captcha_type, available in stats["available"].items():
+            message += "{type}: {available} available\n".format(
+                type=captcha_type.capitalize(), available=available
+            )
+        await ctx.send(box(message))
+
+    @ownercmd.command(name="renderer", usage="<inline_thread_or_process> [workers=2]")
+    async def render_backend_setter(self, ctx: commands.Context, backend: str, workers: int = 2):
+        """
+        Set where captchas are drawn.
+
+        - inline: In the bot's main thread, it blocks the bot while drawing. Only for debugging.
+        - thread: In a pool of threads, the default.
+        - process: In a pool of processes, drawing can use every CPU core of your host.
+
+        `workers` is the number of threads or processes. Each process uses some more memory.
+        """
+        backend = backend.lower()
+        if backend not in RENDER_BACKENDS:
+            await ctx.send("The backend must be inline, thread or process.")
+            return
+        if workers < 1:
+            await ctx.send("At least one worker is needed.")
+            return
+        await self.data.render_backend.set(backend)
+        await self.data.render_workers.set(workers)
+        self.renderer.configure(backend, workers, self.renderer.font)
+        await ctx.send(
+            info(
+                "Captchas will now be drawn by the {backend} backend{workers}.".format(
+                    backend=backend,
+                    workers=""
+                    if backend == "inline"
+                    else " with {workers} worker{plur}".format(
+                        workers=workers, plur="s" if workers > 1 else ""
+                    ),
+                )
+            )
+        )
+
+    @ownercmd.command(name="renderfont", usage="[font]")
+    async def render_font_setter(self, ctx: commands.Context, font: str = None):
+        """
+        Set the font used in image captchas.
+
+        Use no font to mix every available font.
+        """
+        if font is not None and font not in FONTS:
+            await ctx.send(
+                "Available fonts: {fonts}".format(fonts=humanize_list([inline(f) for f in FONTS]))
+            )
+            return
+        await self.data.render_font.set(font)
+        self.renderer.configure(self.renderer.backend, self.renderer.workers, font)
+        await ctx.send(
+            info(
+                "Captchas will now use {font}.".format(
+                    font=inline(font) if font else "every available font"
+                )
+            )
+        )
+
 
 class LoggingLevels(Enum):
     Lvl5 = "CRITICAL"
@@ -12,6 +12,8 @@ from redbot.core.utils.predicates import ReactionPredicate
 
 # Local
 from ..abc import MixinMeta
+from ..admission import QUEUE_ORDERS
+from ..risk import RISK_ACTIONS
 from ..utils import (
     build_embed_with_missing_permissions,
     build_embed_with_missing_settings,
@@ -75,6 +77,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
         await self.data.guild(ctx.guild).channel.set(
             destination.id if is_text_channel else destination
         )
+        self.invalidate_guild_settings(ctx.guild)
         await ctx.send(
             form.info(
                 "Destination registered: {dest}.".format(
@@ -105,6 +108,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
         if not isinstance(destination, discord.TextChannel):
             if destination.lower() == "none":
                 await self.data.guild(ctx.guild).logschannel.clear()
+                self.invalidate_guild_settings(ctx.guild)
                 await ctx.send(form.info("Logging channel removed."))
             else:
                 await ctx.send(form.error("Invalid destination."))
@@ -123,6 +127,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
             return
 
         await self.data.guild(ctx.guild).logschannel.set(destination.id)
+        self.invalidate_guild_settings(ctx.guild)
         await ctx.send(
             form.info("Logging channel registered: {chan}.".format(chan=destination.mention))
         )
@@ -171,6 +176,9 @@ class Settings(MixinMeta, metaclass=ABCMeta):
             return
 
         await self.data.guild(ctx.guild).enabled.set(state)
+        self.invalidate_guild_settings(ctx.guild)
+        if state:
+            self.pool.want(config["type"])
         await ctx.send(form.info("Captcha state registered: {stat}".format(stat=state)))
 
     @config.command(name="type", usage="<type_of_captcha>")
@@ -200,6 +208,8 @@ class Settings(MixinMeta, metaclass=ABCMeta):
             return
 
         await self.data.guild(ctx.guild).type.set(captcha_type)
+        self.invalidate_guild_settings(ctx.guild)
+        self.pool.want(captcha_type)
         await ctx.send(form.info("Captcha type registered: {type}".format(type=captcha_type)))
 
     @config.command(name="timeout", usage="<time_in_minutes>")
@@ -216,6 +226,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
             await ctx.send("Time must be more than 0.")
 
         await self.data.guild(ctx.guild).timeout.set(time)
+        self.invalidate_guild_settings(ctx.guild)
         await ctx.send(
             form.info(
                 "Timeout registered: {time} minute{plur}.".format(
@@ -239,6 +250,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
         if isinstance(role, str):
             if role.lower() == "none":
                 await self.data.guild(ctx.guild).temprole.clear()
+                self.invalidate_guild_settings(ctx.guild)
                 await ctx.send("Cleared! Don't grin like that.")
             else:
                 await ctx.send(
@@ -259,6 +271,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
             return
 
         await self.data.guild(ctx.guild).temprole.set(role.id)
+        self.invalidate_guild_settings(ctx.guild)
         await ctx.send(form.info("Temporary role registered: {role}".format(role=role.name)))
 
     @config.command(name="allowedretries", usage="<number_of_retry>")
@@ -281,8 +294,136 @@ class Settings(MixinMeta, metaclass=ABCMeta):
             return
 
         await self.data.guild(ctx.guild).retry.set(number_of_retries)
+        self.invalidate_guild_settings(ctx.guild)
         await ctx.send(f"Alright, it's been set to {str(number_of_retries)}")
 
+    @config.command(name="concurrency", usage="<number_of_challenges>")
+    async def concurrency_setter(self, ctx: commands.Context, limit: int):
+        """
+        Set how many members can be challenged at the same time.
+
+        Other members joining wait in a queue with the temporary role until a challenge ends.
+        This keep the bot responsive during raids.
+        """
+        if limit < 1:
+            await ctx.send("At least one member must be able to be challenged.")
+            return
+
+        await self.data.guild(ctx.guild).concurrency.set(limit)
+        self.invalidate_guild_settings(ctx.guild)
+        if queue := self.admissions.get(ctx.guild.id):
+            queue.configure(limit, queue.order)
+        await ctx.send(form.info("Concurrent challenges registered: {limit}".format(limit=limit)))
+
+    @config.command(name="queueorder", usage="<fifo_or_age>")
+    async def queue_order_setter(self, ctx: commands.Context, order: str):
+        """
+        Set in which order waiting members are challenged.
+
+        - fifo: Members are challenged in the order they joined.
+        - age: Members with the oldest accounts are challenged first.
+        """
+        order = order.lower()
+        if order not in QUEUE_ORDERS:
+            await ctx.send_help()
+            await ctx.send(
+                form.error(
+                    form.bold(
+                        "{order} is not a valid queue order.".format(order=form.bordered(order))
+                    )
+                )
+            )
+            return
+
+        await self.data.guild(ctx.guild).queue_order.set(order)
+        self.invalidate_guild_settings(ctx.guild)
+        if queue := self.admissions.get(ctx.guild.id):
+            queue.configure(queue.limit, order)
+        await ctx.send(form.info("Queue order registered: {order}".format(order=order)))
+
+    @config.group(name="risk")
+    async def risk(self, ctx: commands.GuildContext):
+        """
+        Score joining members before challenging them.
+
+        The score goes from 0 to 100 and grows with young accounts, default avatars, names
+        similar to other members that joined recently and surges of joins.
+        """
+        pass
+
+    @risk.command(name="enable", usage="<true_or_false>")
+    async def risk_enabler(self, ctx: commands.Context, state: bool):
+        """
+        Enable or disable risk scoring.
+
+        Low risk members are given their roles without being challenged, high risk members
+        joining during a surge are escalated or kicked.
+        """
+        await self.data.guild(ctx.guild).risk.set(state)
+        self.invalidate_guild_settings(ctx.guild)
+        await ctx.send(form.info("Risk scoring state registered: {stat}".format(stat=state)))
+
+    @risk.command(name="thresholds", usage="<low> <high>")
+    async def risk_thresholds_setter(self, ctx: commands.Context, low: int, high: int):
+        """
+        Set the scores deciding what happens to joining members.
+
+        - Members under the low score are let in without challenge, unless there is a surge.
+        - Members from the high score are escalated or kicked during a surge.
+        Use 0 as low score to challenge every member.
+        """
+        if not 0 <= low <= high <= 100:
+            await ctx.send("Scores must be between 0 and 100, the low one first.")
+            return
+
+        await self.data.guild(ctx.guild).risk_low.set(low)
+        await self.data.guild(ctx.guild).risk_high.set(high)
+        self.invalidate_guild_settings(ctx.guild)
+        await ctx.send(
+            form.info("Risk thresholds registered: {low} - {high}".format(low=low, high=high))
+        )
+
+    @risk.command(name="action", usage="<escalate_or_kick>")
+    async def risk_action_setter(self, ctx: commands.Context, action: str):
+        """
+        Set what happens to high risk members joining during a surge.
+
+        - escalate: They're challenged with an image captcha, the hardest one.
+        - kick: They're kicked without being challenged.
+        """
+        action = action.lower()
+        if action not in RISK_ACTIONS:
+            await ctx.send_help()
+            await ctx.send(
+                form.error(
+                    form.bold(
+                        "{action} is not a valid action.".format(action=form.bordered(action))
+                    )
+                )
+            )
+            return
+
+        await self.data.guild(ctx.guild).risk_action.set(action)
+        self.invalidate_guild_settings(ctx.guild)
+        if action == "escalate":
+            self.pool.want("image")
+        await ctx.send(form.info("Risk action registered: {action}".format(action=action)))
+
+    @risk.command(name="surge", usage="<joins_per_minute>")
+    async def surge_setter(self, ctx: commands.Context, joins: int):
+        """
+        Set how many joins in a minute are considered as a surge.
+        """
+        if joins < 2:
+            await ctx.send("A surge needs at least 2 joins.")
+            return
+
+        await self.data.guild(ctx.guild).surge_joins.set(joins)
+        self.invalidate_guild_settings(ctx.guild)
+        await ctx.send(
+            form.info("Surge threshold registered: {joins} joins a minute.".format(joins=joins))
+        )
+
     # Taken from my logic at
     # https://github.com/SharkyTheKing/Sharky/blob/master/verify/verification.py, thank buddy
     # What the f*ck do you mean I'm lazy? Dude I made 3/4 of the cog and logic in less a week, I
@@ -333,6 +474,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
                     added.append(role.name)
                 else:
                     already_added.append(role.name)
+        self.invalidate_guild_settings(ctx.guild)
 
         if added:
             message += "\nAdded role(s): {roles}".format(roles=form.humanize_list(added))
@@ -376,6 +518,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
                     removed.append(role.name)
                 else:
                     not_found.append(role.name)
+        self.invalidate_guild_settings(ctx.guild)
 
         if not_found:
             message += "\nRole(s) not found in autorole list: {roles}".format(
@@ -412,6 +555,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
         if maybe_not_found:
             clean_list = list(set(all_roles) - set(maybe_not_found))
             await self.data.guild(ctx.guild).autoroles.set(clean_list)
+            self.invalidate_guild_settings(ctx.guild)
             message += "\nSome roles has been removed since I was unable to find them."
         if message:
             for line in form.pagify(message):
@@ -430,6 +574,7 @@ class Settings(MixinMeta, metaclass=ABCMeta):
         await ctx.bot.wait_for("reaction_add", check=pred)
         if pred.result:
             await self.data.guild(ctx.guild).clear()
+            self.invalidate_guild_settings(ctx.guild)
             await ctx.send("Done!")
             return
         await ctx.send("So? What next? :)")
@@ -0,0 +1,78 @@
+from abc import ABCMeta
+
+from redbot.core import commands
+from redbot.core.utils.chat_formatting import box, humanize_number, humanize_timedelta
+
+from ..abc import MixinMeta
+
+
+class Status(MixinMeta, metaclass=ABCMeta):
+    """
+    Commands used for monitoring Captcha.
+    """
+
+    @commands.guild_only()
+    @commands.admin()
+    @commands.group(name="captcha")
+    async def captchacmd(self, ctx: commands.GuildContext):
+        """Monitor Captcha in your server."""
+        pass
+
+    @captchacmd.command(name="status")
+    async def status(self, ctx: commands.Context):
+        """
+        Show the running challenges and if Captcha is keeping up.
+
+        Counters are reset when the cog is reloaded.
+        """
+        status = self.get_status(ctx.guild)
+        message = (
+            "Active challenges: {active} | Waiting in queue: {queued}\n"
+            "Mean wait in queue: {admission_wait:.1f}s\n"
+            "Started: {started} | Passed: {passed} | Failed: {failed} | "
+            "Timed out: {timed_out} | Left: {left}\n"
+            "Risk scoring: {trusted} trusted | {escalated} escalated | {risk_kicked} kicked\n"
+            "Pass rate: {pass_rate:.1%} | Fail rate: {fail_rate:.1%} | "
+            "Timeout rate: {timeout_rate:.1%}\n"
+            "Mean time to answer: {answer_time:.1f}s | Mean render time: {render_time:.0f}ms\n"
+            "REST actions pending: {actions_pending} (rate limited {rate_limited} times)\n"
+            "Log lines pending: {log_lines_pending}"
+        ).format(
+            active=humanize_number(status["active"]),
+            queued=humanize_number(status["queued"]),
+            admission_wait=status["mean_admission_wait"],
+            started=humanize_number(status["started"]),
+            passed=humanize_number(status["passed"]),
+            failed=humanize_number(status["failed"]),
+            timed_out=humanize_number(status["timed_out"]),
+            left=humanize_number(status["left"]),
+            trusted=humanize_number(status["trusted"]),
+            escalated=humanize_number(status["escalated"]),
+            risk_kicked=humanize_number(status["risk_kicked"]),
+            pass_rate=status["pass_rate"],
+            fail_rate=status["fail_rate"],
+            timeout_rate=status["timeout_rate"],
+            answer_time=status["mean_answer_time"],
+            render_time=status["mean_render_time"] * 1000,
+            actions_pending=humanize_number(status["actions_pending"]),
+            rate_limited=status["actions_rate_limited"],
+            log_lines_pending=status["log_lines_pending"],
+        )
+
+        deadlines = []
+        for challenge in self.running.values():
+            if challenge.guild.id != ctx.guild.id:
+                continue
+            remaining = self.deadlines.remaining((ctx.guild.id, challenge.member.id))
+            if remaining is not None:
+                deadlines.append((remaining, challenge))
+        if deadlines:
+            message += "\n\nNext deadlines:"
+            for remaining, challenge in sorted(deadlines, key=lambda d: d[0])[:10]:
+                message += "\n{member} ({tries}/{limit}): {remaining}".format(
+                    member=challenge.member,
+                    tries=challenge.trynum,
+                    limit=challenge.limit,
+                    remaining=humanize_timedelta(seconds=remaining) or "Now",
+                )
+        await ctx.send(box(message))
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+log = logging.getLogger("red.predeactor.captcha")
+
+
+class DeadlineWheel:
+    """A hashed timing wheel tracking the deadline of every challenge.
+
+    Deadlines are timestamps, rounded up to the next tick of ``resolution`` seconds. Scheduling
+    and cancelling are O(1), and a single ticker task expires the deadlines of each tick in
+    one batch, handing them to ``on_expire``. Deadlines further than ``size`` ticks wait in
+    their slot for as many rounds as needed.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[List[Any]], None],
+        *,
+        resolution: float = 1.0,
+        size: int = 512,
+    ) -> None:
+        self.on_expire: Callable[[List[Any]], None] = on_expire
+        self.resolution: float = resolution
+        self.size: int = size
+
+        # Each slot map a key to the number of rounds left before it expires.
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(size)]
+        # key -> (deadline, slot, item)
+        self._entries: Dict[Hashable, Tuple[float, int, Any]] = {}
+        self._tick: int = self._current_tick()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _current_tick(self) -> int:
+        return int(time.time() // self.resolution)
+
+    def schedule(self, key: Hashable, deadline: float, item: Any) -> None:
+        """Expire ``item`` at ``deadline``, replacing any deadline of ``key``."""
+        self.cancel(key)
+        if not self._entries:
+            self._tick = self._current_tick()
+        tick = max(math.ceil(deadline / self.resolution), self._tick + 1)
+        slot = tick % self.size
+        self._slots[slot][key] = (tick - self._tick - 1) // self.size
+        self._entries[key] = (deadline, slot, item)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._ticker())
+
+    def cancel(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        del self._slots[entry[1]][key]
+        return True
+
+    def remaining(self, key: Hashable) -> Optional[float]:
+        """Seconds left before the deadline of ``key``, None if it has no deadline."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return max(0.0, entry[0] - time.time())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _ticker(self) -> None:
+        while self._entries:
+            await asyncio.sleep(self.resolution - time.time() % self.resolution)
+            expired = []
+            now = self._current_tick()
+            while self._tick < now:
+                self._tick += 1
+                slot = self._slots[self._tick % self.size]
+                for key, rounds in tuple(slot.items()):
+                    if rounds:
+                        slot[key] = rounds - 1
+                        continue
+                    del slot[key]
+                    expired.append(self._entries.pop(key)[2])
+            if expired:
+                try:
+                    self.on_expire(expired)
+                except Exception as e:
+                    log.error(
+                        "Unable to expire {count} deadlines.".format(count=len(expired)),
+                        exc_info=e,
+                    )
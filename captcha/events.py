@@ -1,11 +1,13 @@
 # Discord/Red related
+import asyncio
 import logging
 
 # Local
 from abc import ABCMeta
 from traceback import format_exception
+from typing import Optional
 
-from discord import Member
+from discord import Member, Message, Reaction, User
 from redbot.core import commands
 from redbot.core.utils.chat_formatting import bold
 
@@ -15,13 +17,29 @@ log = logging.getLogger("red.predeactor.captcha")
 
 
 class Listeners(MixinMeta, metaclass=ABCMeta):
-    async def runner(self, member: Member):
+    async def runner(self, member: Member, resume: Optional[dict] = None):
         allowed = await self.basic_check(member)
         if allowed:
             challenge = await self.create_challenge_for(member)
+            challenge.task = asyncio.current_task()
+            if resume:
+                challenge.restore(resume)
+            self.journal.record(challenge)
+            queue = self.get_admission_queue(member.guild, challenge.config)
             # noinspection PyBroadException
             try:
-                await self.realize_challenge(challenge)
+                if not resume:
+                    if await self.screen_member(challenge):
+                        return
+                    # Members waiting in the queue must already be locked out by the temprole.
+                    await self.give_temprole(challenge)
+                if await queue.acquire(member) is None:
+                    self.get_metrics(member.guild).left += 1
+                    return
+                try:
+                    await self.realize_challenge(challenge)
+                finally:
+                    queue.release()
             except Exception as e:
                 log.critical(
                     f"An unexpected error happened!\n"
@@ -32,16 +50,18 @@ class Listeners(MixinMeta, metaclass=ABCMeta):
                 await self.delete_challenge_for(member)
 
     async def cleaner(self, member: Member):
+        if queue := self.admissions.get(member.guild.id):
+            queue.discard(member.id)
         try:
             challenge = self.obtain_challenge(member)
         except KeyError:
             return
+        challenge.resolve(None)
         try:
             await challenge.cleanup_messages()
             await self.send_or_update_log_message(
                 challenge.guild,
                 bold("User has left the server."),
-                challenge.messages["logs"],
                 member=challenge.member,
             )
         except Exception as e:
@@ -60,3 +80,25 @@ class Listeners(MixinMeta, metaclass=ABCMeta):
     @commands.Cog.listener()
     async def on_member_remove(self, member: Member):
         await self.cleaner(member)
+
+    # The listeners below run for every message and reaction the bot see, whatever the number
+    # of running challenges, a single dict lookup decide if we have to care.
+
+    @commands.Cog.listener()
+    async def on_message(self, message: Message):
+        if not self.waiting:
+            return
+        challenge = self.waiting.get((message.channel.id, message.author.id))
+        if challenge is not None:
+            challenge.resolve(message)
+
+    @commands.Cog.listener()
+    async def on_reaction_add(self, reaction: Reaction, user: User):
+        if not self.waiting:
+            return
+        challenge = self.waiting.get((reaction.message.channel.id, user.id))
+        if challenge is None or str(reaction.emoji) != "🔁":
+            return
+        bot_challenge = challenge.messages.get("bot_challenge")
+        if bot_challenge is not None and bot_challenge.id == reaction.message.id:
+            challenge.resolve(reaction)
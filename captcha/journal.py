@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+log = logging.getLogger("red.predeactor.captcha")
+
+# (guild ID, member ID)
+Key = Tuple[int, int]
+
+# Seconds between two writes of the journal, changes made meanwhile are written together.
+FLUSH_INTERVAL = 0.5
+
+
+def _dump(entry: dict) -> str:
+    return json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+class ChallengeJournal:
+    """An append-only journal of the running challenges, kept on disk.
+
+    Every change of a challenge is appended as one JSON line, and removing a challenge appends
+    a tombstone. The journal is compacted when opened, and whenever tombstones and overwritten
+    lines outnumber the live challenges.
+    Changes are buffered in memory, a background task writes them every ``FLUSH_INTERVAL``
+    seconds in an executor, so the event loop never waits for the disk.
+    Until ``open`` is called, the journal is only kept in memory.
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[Path] = None
+        self.entries: Dict[Key, dict] = {}
+        self._file = None
+        self._dead: int = 0
+        self._pending: List[str] = []
+        self._compact_needed: bool = False
+        self._wake: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed: bool = False
+        # Held by the executor while it uses the file, and by close.
+        self._io_lock: threading.Lock = threading.Lock()
+
+    @property
+    def opened(self) -> bool:
+        return self._file is not None
+
+    async def open(self, path: Path) -> Dict[Key, dict]:
+        """Load the journal from the disk and start writing to it.
+
+        Return the challenges that were running.
+        """
+        self.path = path
+        loop = asyncio.get_running_loop()
+        self.entries = await loop.run_in_executor(None, self._load, path)
+        await loop.run_in_executor(None, self._compact, [_dump(e) for e in self.entries.values()])
+        self._task = asyncio.create_task(self._flusher())
+        return dict(self.entries)
+
+    def close(self) -> None:
+        """Stop the background task and write the changes not written yet."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        with self._io_lock:
+            self._closed = True
+            if self._file is None:
+                return
+            if self._pending:
+                # A few lines at most, written at unload.
+                self._file.write("".join(self._pending))
+                self._pending = []
+            self._file.close()
+            self._file = None
+
+    def record(self, challenge) -> None:
+        """Save the current state of a challenge."""
+        message = challenge.messages.get("bot_challenge")
+        entry = {
+            "g": challenge.guild.id,
+            "m": challenge.member.id,
+            "c": challenge.channel.id if challenge.channel else None,
+            "b": message.id if message else None,
+            "h": challenge.code_hash,
+            "t": challenge.trynum,
+            "d": challenge.deadline,
+        }
+        key = (entry["g"], entry["m"])
+        if key in self.entries:
+            self._dead += 1
+        self.entries[key] = entry
+        self._write(entry)
+
+    def discard(self, guild_id: int, member_id: int) -> None:
+        """Forget a challenge that ended."""
+        if self.entries.pop((guild_id, member_id), None) is None:
+            return
+        self._dead += 2
+        self._write({"g": guild_id, "m": member_id, "x": 1})
+
+    def _write(self, entry: dict) -> None:
+        if self._task is None:
+            return
+        self._pending.append(_dump(entry))
+        if self._dead > max(100, len(self.entries)):
+            self._compact_needed = True
+        self._wake.set()
+
+    async def _flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(FLUSH_INTERVAL)
+            self._wake.clear()
+            if self._compact_needed:
+                # The snapshot already contains the pending changes.
+                self._compact_needed = False
+                self._dead = 0
+                self._pending = []
+                lines = [_dump(e) for e in self.entries.values()]
+                await loop.run_in_executor(None, self._compact, lines)
+            elif self._pending:
+                lines, self._pending = self._pending, []
+                await loop.run_in_executor(None, self._append, lines)
+
+    # The methods below run in an executor.
+
+    @staticmethod
+    def _load(path: Path) -> Dict[Key, dict]:
+        entries = {}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Most likely the last line, written while the bot was killed.
+                        log.warning("Ignoring a corrupted line in the challenges journal.")
+                        continue
+                    key = (entry["g"], entry["m"])
+                    if entry.get("x"):
+                        entries.pop(key, None)
+                    else:
+                        entries[key] = entry
+        return entries
+
+    def _append(self, lines: List[str]) -> None:
+        with self._io_lock:
+            if self._file is None:
+                return
+            self._file.write("".join(lines))
+            self._file.flush()
+
+    def _compact(self, lines: List[str]) -> None:
+        """Rewrite the journal with only the running challenges."""
+        with self._io_lock:
+            if self._closed:
+                return
+            if self._file is not None:
+                self._file.close()
+            temporary = self.path.with_suffix(".tmp")
+            with temporary.open("w", encoding="utf-8") as file:
+                file.write("".join(lines))
+            os.replace(temporary, self.path)
+            self._file = self.path.open("a", encoding="utf-8")
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+
+import discord
+
+log = logging.getLogger("red.predeactor.captcha")
+
+MESSAGE_LIMIT = 2000
+
+
+class LogSink:
+    """Buffer the log lines of a guild and write them in batches.
+
+    Lines pushed during ``window`` seconds are coalesced into a single edit of the last log
+    message, rolling over to new messages before the characters limit is reached. When a
+    burst would need more than ``max_messages`` messages, it is sent as a file instead.
+    """
+
+    def __init__(
+        self, channel: discord.TextChannel, *, window: float = 2.0, max_messages: int = 3
+    ) -> None:
+        self.channel: discord.TextChannel = channel
+        self.window: float = window
+        self.max_messages: int = max_messages
+
+        self.message: Optional[discord.Message] = None  # The message we're filling.
+        self._lines: List[str] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._lines)
+
+    def set_channel(self, channel: discord.TextChannel) -> None:
+        if self.channel.id != channel.id:
+            self.message = None
+        self.channel = channel
+
+    def push(self, line: str) -> None:
+        if len(line) > MESSAGE_LIMIT:
+            line = line[: MESSAGE_LIMIT - 3] + "..."
+        self._lines.append(line)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            lines, self._lines = self._lines, []
+            if not lines:
+                return
+            try:
+                await self._write(lines)
+            except discord.HTTPException as e:
+                log.warning(
+                    "Unable to write {count} log lines in {channel}.".format(
+                        count=len(lines), channel=self.channel.id
+                    ),
+                    exc_info=e,
+                )
+
+    async def _write(self, lines: List[str]) -> None:
+        allowed_mentions = discord.AllowedMentions(users=False)
+        current = self.message.content if self.message else ""
+        pages = self._paginate(current, lines)
+
+        if len(pages) > self.max_messages:
+            content = "\n".join(lines)
+            self.message = None
+            await self.channel.send(
+                "{count} events logged.".format(count=len(lines)),
+                file=discord.File(
+                    BytesIO(content.encode("utf-8")),
+                    filename="captcha-logs-{time}.txt".format(
+                        time=datetime.now().strftime("%Y%m%d-%H%M%S")
+                    ),
+                ),
+            )
+            return
+
+        first, *others = pages
+        if self.message is None:
+            self.message = await self.channel.send(first, allowed_mentions=allowed_mentions)
+        elif first != current:
+            try:
+                await self.message.edit(content=first, allowed_mentions=allowed_mentions)
+            except discord.NotFound:
+                self.message = await self.channel.send(
+                    first[len(current) :].lstrip("\n"), allowed_mentions=allowed_mentions
+                )
+        for page in others:
+            self.message = await self.channel.send(page, allowed_mentions=allowed_mentions)
+
+    @staticmethod
+    def _paginate(current: str, lines: List[str]) -> List[str]:
+        """Append lines to the current content, rolling over when a page is full."""
+        pages = []
+        page = current
+        for line in lines:
+            if page and len(page) + 1 + len(line) > MESSAGE_LIMIT:
+                pages.append(page)
+                page = line
+            else:
+                page = page + "\n" + line if page else line
+        pages.append(page)
+        return pages
@@ -0,0 +1,60 @@
+class GuildMetrics:
+    """Counters of a guild's challenges, cheap enough to be updated on every event."""
+
+    __slots__ = (
+        "started",
+        "passed",
+        "failed",
+        "timed_out",
+        "left",
+        "trusted",
+        "escalated",
+        "risk_kicked",
+        "answers",
+        "answer_time",
+    )
+
+    def __init__(self) -> None:
+        self.started: int = 0
+        self.passed: int = 0
+        self.failed: int = 0  # Kicked after too many retries.
+        self.timed_out: int = 0
+        self.left: int = 0
+        # Risk scoring, members let in without challenge, given a harder captcha or kicked.
+        self.trusted: int = 0
+        self.escalated: int = 0
+        self.risk_kicked: int = 0
+        self.answers: int = 0
+        self.answer_time: float = 0.0
+
+    @property
+    def finished(self) -> int:
+        return (
+            self.passed
+            + self.failed
+            + self.timed_out
+            + self.left
+            + self.trusted
+            + self.risk_kicked
+        )
+
+    def record_answer(self, seconds: float) -> None:
+        self.answers += 1
+        self.answer_time += seconds
+
+    def to_dict(self) -> dict:
+        finished = self.finished
+        return {
+            "started": self.started,
+            "passed": self.passed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "left": self.left,
+            "trusted": self.trusted,
+            "escalated": self.escalated,
+            "risk_kicked": self.risk_kicked,
+            "pass_rate": self.passed / finished if finished else 0.0,
+            "fail_rate": self.failed / finished if finished else 0.0,
+            "timeout_rate": self.timed_out / finished if finished else 0.0,
+            "mean_answer_time": self.answer_time / self.answers if self.answers else 0.0,
+        }
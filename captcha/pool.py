@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple, Union
+
+from discapty.discapty import random_code
+
+from .render import CaptchaRenderer
+
+log = logging.getLogger("red.predeactor.captcha")
+
+CAPTCHA_TYPES = ("wheezy", "image", "plain")
+
+# A rendered captcha, the code and what must be shown to the member: PNG bytes for image
+# types, the obfuscated string for the plain type.
+Rendered = Tuple[str, Union[bytes, str]]
+
+
+class CaptchaPool:
+    """A pool of pre-rendered captchas, one queue per captcha type.
+
+    A background worker keeps every wanted type topped up to ``size`` whenever a queue goes
+    under ``low_water``. Captchas are drawn by the ``renderer``.
+    """
+
+    def __init__(self, renderer: CaptchaRenderer, size: int = 50, low_water: int = 10) -> None:
+        self.renderer: CaptchaRenderer = renderer
+        self.size: int = size
+        self.low_water: int = low_water
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.rendered: int = 0
+        self.render_time: float = 0.0
+
+        self._pools: Dict[str, Deque[Rendered]] = {kind: deque() for kind in CAPTCHA_TYPES}
+        self._wanted: Set[str] = set()
+        self._refill: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+            self.refill()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def refill(self) -> None:
+        """Wake up the worker so every wanted type is topped up."""
+        self._refill.set()
+
+    def want(self, captcha_type: str) -> None:
+        """Ask the pool to keep this captcha type warm."""
+        if captcha_type not in self._wanted:
+            self._wanted.add(captcha_type)
+            self._refill.set()
+
+    def available(self, captcha_type: str) -> int:
+        return len(self._pools[captcha_type])
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size,
+            "low_water": self.low_water,
+            "backend": self.renderer.backend,
+            "mean_render_time": self.render_time / self.rendered if self.rendered else 0.0,
+            "available": {kind: len(pool) for kind, pool in self._pools.items()},
+        }
+
+    async def get(self, captcha_type: str) -> Rendered:
+        """Obtain a rendered captcha, rendering one on a miss."""
+        self.want(captcha_type)
+        pool = self._pools[captcha_type]
+        if pool:
+            self.hits += 1
+            rendered = pool.popleft()
+            if len(pool) <= self.low_water:
+                self._refill.set()
+            return rendered
+        self.misses += 1
+        self._refill.set()
+        return await self._render(captcha_type)
+
+    async def _render(self, captcha_type: str) -> Rendered:
+        code = random_code()
+        start = time.perf_counter()
+        rendered = await self.renderer.render(captcha_type, code)
+        self.rendered += 1
+        self.render_time += time.perf_counter() - start
+        return code, rendered
+
+    async def _worker(self) -> None:
+        while True:
+            await self._refill.wait()
+            self._refill.clear()
+            for captcha_type in tuple(self._wanted):
+                pool = self._pools[captcha_type]
+                while len(pool) < self.size:
+                    try:
+                        pool.append(await self._render(captcha_type))
+                    except Exception as e:
+                        log.error("Unable to pre-render a captcha.", exc_info=e)
+                        break
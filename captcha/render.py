@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import sys
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from discapty.generator import DEFAULT_FONTS, ESCAPE_CHAR, ImageCaptcha
+from PIL.ImageFont import truetype
+from wheezy.captcha import image as wheezy_captcha
+
+log = logging.getLogger("red.predeactor.captcha")
+
+RENDER_BACKENDS = ("inline", "thread", "process")
+FONTS_PATH = Path(__file__).parent / "data"
+FONTS = tuple(sorted(path.stem for path in FONTS_PATH.glob("*.ttf")))
+WIDTH, HEIGHT = 350, 100  # Same size as discapty's captchas.
+
+# (captcha type, font name or None for every font) -> generator, built once per process.
+_generators: Dict[Tuple[str, Optional[str]], Callable[[str], Any]] = {}
+_generators_lock = threading.Lock()
+
+
+def _drive(coro):
+    """Run a coroutine that never suspends, without an event loop.
+
+    discapty's generators are declared async but only do synchronous PIL work, this lets us
+    run them from an executor.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as result:
+        return result.value
+    coro.close()
+    raise RuntimeError("The captcha generator suspended, it cannot be rendered synchronously.")
+
+
+def _build_wheezy(fonts: list) -> Callable[[str], Any]:
+    # Same drawings as discapty's WheezyCaptcha, which load the fonts again on each render.
+    return wheezy_captcha.captcha(
+        drawings=[
+            wheezy_captcha.background(),
+            wheezy_captcha.text(
+                fonts=fonts,
+                drawings=[
+                    wheezy_captcha.warp(),
+                    wheezy_captcha.rotate(),
+                    wheezy_captcha.offset(),
+                ],
+            ),
+            wheezy_captcha.curve(),
+            wheezy_captcha.noise(),
+            wheezy_captcha.smooth(),
+        ],
+        width=WIDTH,
+        height=HEIGHT,
+    )
+
+
+def load_generators(fonts_path: str = str(FONTS_PATH)) -> None:
+    """Load the fonts and build the generators of the current process.
+
+    This is the initializer of the render workers, fonts are read from disk once per worker.
+    """
+    with _generators_lock:
+        if _generators:
+            return
+        paths = {}
+        for path in sorted(Path(fonts_path).glob("*.ttf")):
+            try:
+                truetype(str(path))
+            except OSError:
+                log.warning("Unable to load the font {font}, skipping it.".format(font=path.name))
+            else:
+                paths[path.stem] = str(path)
+        choices = {None: list(paths.values()) or DEFAULT_FONTS}
+        choices.update((name, [path]) for name, path in paths.items())
+        for font, fonts in choices.items():
+            image = ImageCaptcha(width=WIDTH, height=HEIGHT, fonts=fonts)
+            image.truefonts  # Load the fonts now rather than on the first render.
+            _generators["image", font] = lambda code, image=image: _drive(image.generate(code))
+            _generators["wheezy", font] = _build_wheezy(fonts)
+
+
+def render_captcha(captcha_type: str, code: str, font: Optional[str] = None) -> Union[bytes, str]:
+    """Render a captcha synchronously, PNG bytes for image types, a string for the plain type.
+
+    Only the arguments and the result cross the process boundary when rendering in a worker.
+    """
+    if captcha_type == "plain":
+        return ESCAPE_CHAR.join(code)
+    if not _generators:
+        load_generators()
+    generator = _generators.get((captcha_type, font)) or _generators[captcha_type, None]
+    image = generator(code)
+    out = BytesIO()
+    image.save(out, format="png")
+    return out.getvalue()
+
+
+class CaptchaRenderer:
+    """Render captchas with the chosen backend.
+
+    - inline: On the event loop, only meant for debugging.
+    - thread: In a pool of ``workers`` threads, rendering still holds the GIL most of the time.
+    - process: In a pool of ``workers`` processes, rendering scales across cores.
+    """
+
+    def __init__(self, backend: str = "thread", workers: int = 2, font: str = None) -> None:
+        self.backend: str = backend
+        self.workers: int = workers
+        self.font: Optional[str] = font
+
+        self._executor: Optional[Executor] = None
+
+    def configure(self, backend: str, workers: int, font: Optional[str]) -> None:
+        if (backend, workers) != (self.backend, self.workers):
+            self.stop()
+        self.backend = backend
+        self.workers = workers
+        self.font = font
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            # Called from cog_unload, don't block the event loop until running renders end.
+            if sys.version_info >= (3, 9):
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor if self.backend == "process" else ThreadPoolExecutor
+            )
+            self._executor = executor_class(
+                self.workers, initializer=load_generators, initargs=(str(FONTS_PATH),)
+            )
+        return self._executor
+
+    async def render(self, captcha_type: str, code: str) -> Union[bytes, str]:
+        if captcha_type == "plain" or self.backend == "inline":
+            return render_captcha(captcha_type, code, self.font)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(), render_captcha, captcha_type, code, self.font
+            )
+        except BrokenExecutor:
+            if self.backend != "process":
+                raise
+            log.error("The render processes died, falling back to the thread backend.")
+            self.configure("thread", self.workers, self.font)
+            return await self.render(captcha_type, code)
@@ -0,0 +1,83 @@
+import re
+import time
+import unicodedata
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, Tuple
+
+import discord
+
+RISK_ACTIONS = ("escalate", "kick")
+
+_REPEATED = re.compile(r"(.)\1+")
+
+
+def name_skeleton(name: str) -> str:
+    """Reduce a name to what raid tools rarely change: its letters, without accents or repeats.
+
+    "Johnny_1234", "jöhny 77" and "JOHNY" all give "johny".
+    """
+    letters = "".join(
+        char for char in unicodedata.normalize("NFKD", name.lower()) if char.isalpha()
+    )
+    return _REPEATED.sub(r"\1", letters)[:16]
+
+
+class RiskScorer:
+    """Score how likely a joining member is part of a raid, from 0 to 100.
+
+    Joins of the last ``window`` seconds are kept in a deque with the skeleton of their name,
+    each join is appended once and expired once, so scoring is O(1) amortized.
+    """
+
+    def __init__(self, window: float = 60.0, max_tracked: int = 10000) -> None:
+        self.window: float = window
+        self.max_tracked: int = max_tracked
+
+        self._joins: Deque[Tuple[float, str]] = deque()
+        self._names: Counter = Counter()
+
+    @property
+    def recent_joins(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._joins)
+
+    def _expire(self, now: float) -> None:
+        limit = now - self.window
+        while self._joins and (self._joins[0][0] < limit or len(self._joins) > self.max_tracked):
+            _, skeleton = self._joins.popleft()
+            self._names[skeleton] -= 1
+            if not self._names[skeleton]:
+                del self._names[skeleton]
+
+    def score(self, member: discord.Member, surge_joins: int) -> Tuple[int, bool]:
+        """Record the join of a member and score it.
+
+        Return the score and if the guild is going through a surge of joins, meaning that at
+        least ``surge_joins`` members joined during the window.
+        """
+        now = time.monotonic()
+        self._expire(now)
+        skeleton = name_skeleton(member.name)
+        similar = self._names[skeleton] if skeleton else 0
+        self._joins.append((now, skeleton))
+        self._names[skeleton] += 1
+        surge = len(self._joins) >= surge_joins
+
+        score = 0
+        age = datetime.utcnow() - member.created_at
+        if age.days < 1:
+            score += 40
+        elif age.days < 7:
+            score += 25
+        elif age.days < 30:
+            score += 10
+        if member.avatar is None:
+            score += 15
+        if surge:
+            score += 20
+        if similar >= 3:
+            score += 25
+        elif similar:
+            score += 10
+        return score, surge
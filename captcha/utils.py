@@ -1,4 +1,5 @@
-from typing import List
+from io import BytesIO
+from typing import List, Mapping, Optional, Tuple, Union
 
 import discord
 from redbot.core.utils import chat_formatting as form
@@ -25,6 +26,39 @@ def build_kick_embed(guild: discord.Guild, reason: str):
     return embed
 
 
+def build_captcha_embed(
+    rendered: Union[bytes, str],
+    *,
+    title: str,
+    description: str,
+    author: Mapping[str, str] = None,
+    footer: Mapping[str, str] = None,
+) -> Tuple[discord.Embed, Optional[discord.File]]:
+    """Build the challenge embed from a pre-rendered captcha.
+
+    This mirror what ``discapty.Captcha.generate_embed`` does, without rendering anything.
+    """
+    embed = discord.Embed(
+        title=title, description=description, colour=discord.Colour.default().value
+    )
+    if footer:
+        embed.set_footer(text=footer.get("text", discord.Embed.Empty))
+    if author:
+        embed.set_author(
+            name=author.get("name", discord.Embed.Empty),
+            icon_url=author.get("url", discord.Embed.Empty),
+        )
+    if isinstance(rendered, str):
+        embed.description = (
+            "Please return me the following code:\n```{code}```\nDo not copy and paste.".format(
+                code=rendered
+            )
+        )
+        return embed, None
+    embed.set_image(url="attachment://captcha.png")
+    return embed, discord.File(BytesIO(rendered), filename="captcha.png")
+
+
 async def build_embed_with_missing_permissions(permissions: List[str]):
     embed = discord.Embed(
         title="Missing required permissions.",
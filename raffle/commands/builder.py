@@ -74,51 +74,55 @@ class BuilderCommands(RaffleMixin, metaclass=MetaClass):
             exc = cross(_("An exception occured whilst parsing your data."))
             return await ctx.send(exc + format_traceback(e))
 
-        async with self.config.guild(ctx.guild).raffles() as raffle:
+        raffle = await self.cache.all(ctx.guild)
 
-            rafflename = valid.get("name").lower()
+        rafflename = valid.get("name").lower()
 
-            if rafflename in [x.lower() for x in raffle.keys()]:
-                return await ctx.send(_("A raffle with this name already exists."))
+        if rafflename in [x.lower() for x in raffle.keys()]:
+            return await ctx.send(_("A raffle with this name already exists."))
 
-            datetimeinfo = _(
-                "{day} of {month}, {year} ({time})".format(
-                    day=number_suffix(getstrftime("d")),
-                    month=getstrftime("B"),
-                    year=getstrftime("Y"),
-                    time=getstrftime("X"),
-                )
+        datetimeinfo = _(
+            "{day} of {month}, {year} ({time})".format(
+                day=number_suffix(getstrftime("d")),
+                month=getstrftime("B"),
+                year=getstrftime("Y"),
+                time=getstrftime("X"),
             )
+        )
 
-            data = {
-                "entries": [],
-                "owner": ctx.author.id,
-                "created_at": datetimeinfo,
-            }
-
-            conditions = {
-                "end_message": valid.get("end_message", None),
-                "join_message": valid.get("join_message", None),
-                "account_age": valid.get("account_age", None),
-                "server_join_age": valid.get("server_join_age", None),
-                "roles_needed_to_enter": valid.get("roles_needed_to_enter", None),
-                "badges_needed_to_enter": valid.get("badges_needed_to_enter", None),
-                "prevented_users": valid.get("prevented_users", None),
-                "allowed_users": valid.get("allowed_users", None),
-                "description": valid.get("description", None),
-                "maximum_entries": valid.get("maximum_entries", None),
-                "on_end_action": valid.get("on_end_action", None),
-                "suspense_timer": valid.get("suspense_timer", None),
-            }
-
-            for k, v in conditions.items():
-                if v:
-                    data[k] = v
-
-            raffle[rafflename] = data
-            await ctx.send(tick(_("Raffle created with the name `{}`.".format(rafflename))))
-
-        await self.clean_guild_raffles(ctx)
+        data = {
+            "entries": [],
+            "owner": ctx.author.id,
+            "created_at": datetimeinfo,
+            # Where the raffle is announced when it reaches its end_at time.
+            "channel": ctx.channel.id,
+        }
+
+        conditions = {
+            "end_message": valid.get("end_message", None),
+            "join_message": valid.get("join_message", None),
+            "account_age": valid.get("account_age", None),
+            "server_join_age": valid.get("server_join_age", None),
+            "roles_needed_to_enter": valid.get("roles_needed_to_enter", None),
+            "badges_needed_to_enter": valid.get("badges_needed_to_enter", None),
+            "prevented_users": valid.get("prevented_users", None),
+            "allowed_users": valid.get("allowed_users", None),
+            "description": valid.get("description", None),
+            "maximum_entries": valid.get("maximum_entries", None),
+            "on_end_action": valid.get("on_end_action", None),
+            "suspense_timer": valid.get("suspense_timer", None),
+            "role_weights": valid.get("role_weights", None),
+            "secure_draw": valid.get("secure_draw", None),
+            "end_at": valid.get("end_at", None),
+        }
+
+        for k, v in conditions.items():
+            if v:
+                data[k] = v
+
+        await self.cache.set(ctx.guild, rafflename, data)
+        self.scheduler.schedule(ctx.guild.id, rafflename, data)
+        await ctx.send(tick(_("Raffle created with the name `{}`.".format(rafflename))))
 
     @create.command()
     async def simple(
@@ -131,29 +135,30 @@ class BuilderCommands(RaffleMixin, metaclass=MetaClass):
             - `[description]` - The description for the raffle.
         """
         raffle_name = raffle_name.lower()
-        async with self.config.guild(ctx.guild).raffles() as raffle:
-
-            if raffle_name in [x.lower() for x in raffle.keys()]:
-                return await ctx.send(_("A raffle with this name already exists."))
-
-            datetimeinfo = _(
-                "{day} of {month}, {year} ({time})".format(
-                    day=number_suffix(getstrftime("d")),
-                    month=getstrftime("B"),
-                    year=getstrftime("Y"),
-                    time=getstrftime("X"),
-                )
+        raffle = await self.cache.all(ctx.guild)
+
+        if raffle_name in [x.lower() for x in raffle.keys()]:
+            return await ctx.send(_("A raffle with this name already exists."))
+
+        datetimeinfo = _(
+            "{day} of {month}, {year} ({time})".format(
+                day=number_suffix(getstrftime("d")),
+                month=getstrftime("B"),
+                year=getstrftime("Y"),
+                time=getstrftime("X"),
             )
+        )
 
-            data = {
-                "entries": [],
-                "owner": ctx.author.id,
-                "created_at": datetimeinfo,
-            }
+        data = {
+            "entries": [],
+            "owner": ctx.author.id,
+            "created_at": datetimeinfo,
+            # Where the raffle is announced when it reaches its end_at time.
+            "channel": ctx.channel.id,
+        }
 
-            if description:
-                data["description"] = description
+        if description:
+            data["description"] = description
 
-            raffle[raffle_name] = data
+        await self.cache.set(ctx.guild, raffle_name, data)
         await ctx.send(tick(_("Raffle created with the name `{}`.".format(raffle_name))))
-        await self.clean_guild_raffles(ctx)
@@ -1,5 +1,4 @@
 import asyncio
-import contextlib
 
 import discord
 from redbot.core import commands
@@ -10,6 +9,7 @@ from redbot.core.utils.predicates import MessagePredicate, ReactionPredicate
 from ...mixins.abc import RaffleMixin
 from ...mixins.metaclass import MetaClass
 from ...utils.converters import RaffleFactoryConverter
+from ...utils.entries import EntrySet
 
 _ = Translator("Raffle", __file__)
 
@@ -39,23 +39,21 @@ class Allowed(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<member>` - The member to add to the allowed list.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            allowed = raffle_data.get("allowed_users", [])
-
-            if member.id in allowed:
-                return await ctx.send(_("This user is already allowed in this raffle."))
-
-            if not allowed:
-                raffle_data["allowed_users"] = [member.id]
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif member.id in raffle_data.get("allowed_users", []):
+                message = _("This user is already allowed in this raffle.")
             else:
-                allowed.append(member.id)
-
-            await ctx.send(_("{} added to the allowed list for this raffle.".format(member.name)))
+                allowed = raffle_data.get("allowed_users", [])
+                if not allowed:
+                    raffle_data["allowed_users"] = EntrySet([member.id])
+                else:
+                    allowed.append(member.id)
+                message = _("{} added to the allowed list for this raffle.".format(member.name))
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @allowed.command(name="remove", aliases=["del"])
     async def allowed_remove(self, ctx, raffle: RaffleFactoryConverter, member: discord.Member):
@@ -65,36 +63,32 @@ class Allowed(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<member>` - The member to remove from the allowed list.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            allowed = raffle_data.get("allowed_users", [])
-
-            if member.id not in allowed:
-                return await ctx.send(_("This user was not already allowed in this raffle."))
-
-            allowed.remove(member.id)
-            if not allowed:
-                del raffle_data["allowed_users"]
-            await ctx.send(
-                _("{} removed from the allowed list for this raffle.".format(member.name))
-            )
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif member.id not in raffle_data.get("allowed_users", []):
+                message = _("This user was not already allowed in this raffle.")
+            else:
+                allowed = raffle_data["allowed_users"]
+                allowed.remove(member.id)
+                if not allowed:
+                    del raffle_data["allowed_users"]
+                message = _(
+                    "{} removed from the allowed list for this raffle.".format(member.name)
+                )
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @allowed.command(name="clear")
     async def allowed_clear(self, ctx, raffle: RaffleFactoryConverter):
         """Clear the allowed list for a raffle."""
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            allowed = raffle_data.get("allowed_users", None)
-
-            if allowed is None:
-                return await ctx.send(_("There are no allowed users."))
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        if raffle_data is None:
+            return await ctx.send(_("This raffle has ended."))
+        if raffle_data.get("allowed_users", None) is None:
+            return await ctx.send(_("There are no allowed users."))
 
+        # The raffle isn't locked while waiting for an answer.
         message = _("Are you sure you want to clear the allowed list for this raffle?")
         can_react = ctx.channel.permissions_for(ctx.me).add_reactions
         if not can_react:
@@ -114,17 +108,18 @@ class Allowed(RaffleMixin, metaclass=MetaClass):
             await ctx.send(_("You took too long to respond."))
             return
 
-        if predicate.result:
-            with contextlib.suppress(KeyError):
-                # Still wanna remove empty list here
-                del raffle_data["allowed_users"]
-            msg = _("Allowed list cleared for this raffle.")
-            try:
-                await message.edit(content=msg)
-            except discord.NotFound:
-                await ctx.send(msg)
+        if not predicate.result:
+            return await ctx.send(_("No changes have been made."))
 
-        else:
-            await ctx.send(_("No changes have been made."))
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                msg = _("This raffle has ended.")
+            else:
+                # Still wanna remove empty list here
+                raffle_data.pop("allowed_users", None)
+                msg = _("Allowed list cleared for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        try:
+            await message.edit(content=msg)
+        except discord.NotFound:
+            await ctx.send(msg)
@@ -36,40 +36,38 @@ class Badges(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<badges>` - The badge(s) to add to the required badges list.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            badges_list = raffle_data.get("badges_needed_to_enter", [])
-
-            for badge in badges:
-                if badge not in VALID_USER_BADGES:
-                    return await ctx.send(
-                        _('"{}" was not a recognized Discord badge.'.format(badge))
-                    )
-                if badge in badges_list:
-                    return await ctx.send(
-                        _(
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            else:
+                message = None
+                badges_list = raffle_data.get("badges_needed_to_enter", [])
+
+                for badge in badges:
+                    if badge not in VALID_USER_BADGES:
+                        message = _('"{}" was not a recognized Discord badge.'.format(badge))
+                        break
+                    if badge in badges_list:
+                        message = _(
                             'The "{}" badge is already required in this raffle.'.format(
                                 format_underscored_text(badge)
                             )
                         )
+                        break
+
+                if message is None:
+                    if not badges_list:
+                        raffle_data["badges_needed_to_enter"] = list(badges)
+                    else:
+                        badges_list.extend(badges)
+                    message = _(
+                        "Added the following badges as requirements in this raffle: {}.".format(
+                            ", ".join(inline(format_underscored_text(b)) for b in badges)
+                        )
                     )
 
-                if not badges_list:
-                    raffle_data["badges_needed_to_enter"] = list(badges)
-                else:
-                    badges_list.append(badge)
-
-            await ctx.send(
-                _(
-                    "Added the following badges as requirements in this raffle: {}.".format(
-                        ", ".join(inline(format_underscored_text(b)) for b in badges)
-                    )
-                )
-            )
-
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @badges.command(name="remove", aliases=["del"])
     async def badges_remove(self, ctx, raffle: RaffleFactoryConverter, *badges: str):
@@ -79,34 +77,35 @@ class Badges(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<member>` - The badge to remove from the required badges list.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            badges_list = raffle_data.get("badges_needed_to_enter", [])
-
-            for badge in badges:
-                if badge not in VALID_USER_BADGES:
-                    return await ctx.send(
-                        _('"{}" was not a recognized Discord badge.'.format(badge))
-                    )
-                if badge not in badges_list:
-                    return await ctx.send(
-                        _('The "{}" badge was not already required in this raffle.'.format(badge))
-                    )
-
-            badges_list.remove(badge)
-            if not badges_list:
-                del raffle_data["badges_list"]
-            await ctx.send(
-                _(
-                    "Added the following badges as requirements in this raffle: {}.".format(
-                        ", ".join(inline(format_underscored_text(b)) for b in badges)
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            else:
+                message = None
+                badges_list = raffle_data.get("badges_needed_to_enter", [])
+
+                for badge in badges:
+                    if badge not in VALID_USER_BADGES:
+                        message = _('"{}" was not a recognized Discord badge.'.format(badge))
+                        break
+                    if badge not in badges_list:
+                        message = _(
+                            'The "{}" badge was not already required in this raffle.'.format(badge)
+                        )
+                        break
+
+                if message is None:
+                    for badge in badges:
+                        badges_list.remove(badge)
+                    if not badges_list:
+                        del raffle_data["badges_needed_to_enter"]
+                    message = _(
+                        "Removed the following badges from the requirements: {}.".format(
+                            ", ".join(inline(format_underscored_text(b)) for b in badges)
+                        )
                     )
-                )
-            )
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @badges.command(name="clear")
     async def badges_clear(self, ctx, raffle: RaffleFactoryConverter):
@@ -115,14 +114,13 @@ class Badges(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            badges_list = raffle_data.get("badges_needed_to_enter", None)
-
-            if badges_list is None:
-                return await ctx.send(_("There are no required badges."))
-
-            del raffle_data["badges_needed_to_enter"]
-            message = _("Required bages list cleared for this raffle.")
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif raffle_data.get("badges_needed_to_enter", None) is None:
+                message = _("There are no required badges.")
+            else:
+                del raffle_data["badges_needed_to_enter"]
+                message = _("Required bages list cleared for this raffle.")
+
+        await ctx.send(message)
@@ -16,6 +16,7 @@ from ...utils.enums import RaffleComponents
 from ...utils.exceptions import InvalidArgument, RaffleError
 from ...utils.formatting import cross, tick
 from ...utils.helpers import (
+    INTERNAL_KEYS,
     cleanup_code,
     format_traceback,
     raffle_safe_member_scanner,
@@ -49,29 +50,29 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<new_account_age>` - The new account age requirement.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            if isinstance(new_account_age, bool):
-                if not new_account_age:
-                    with contextlib.suppress(KeyError):
-                        del raffle_data["account_age"]
-                    return await ctx.send(_("Account age requirement removed from this raffle."))
-                else:
-                    return await ctx.send(
-                        _('Please provide a number, or "false" to disable this condition.')
-                    )
-
+        if isinstance(new_account_age, bool):
+            if new_account_age:
+                return await ctx.send(
+                    _('Please provide a number, or "false" to disable this condition.')
+                )
+        else:
             try:
                 RaffleManager.parse_accage(new_account_age)
             except InvalidArgument as e:
                 return await ctx.send(format_traceback(e))
 
-            raffle_data["account_age"] = new_account_age
-            await ctx.send(_("Account age requirement updated for this raffle."))
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif new_account_age is False:
+                raffle_data.pop("account_age", None)
+                message = _("Account age requirement removed from this raffle.")
+            else:
+                raffle_data["account_age"] = new_account_age
+                message = _("Account age requirement updated for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def convertsimple(self, ctx, raffle: RaffleFactoryConverter):
@@ -82,46 +83,43 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
         """
         components = [e.name for e in RaffleComponents][2:]
 
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
+        # The raffle isn't locked while waiting for an answer.
+        message = _(
+            ":warning: Are you sure you want to convert this raffle to a simple raffle?\n"
+            "It will remove all the conditions!"
+        )
 
-            message = _(
-                ":warning: Are you sure you want to convert this raffle to a simple raffle?\n"
-                "It will remove all the conditions!"
-            )
+        can_react = ctx.channel.permissions_for(ctx.me).add_reactions
+        if not can_react:
+            message += " (y/n)"
+        message = await ctx.send(message)
 
-            can_react = ctx.channel.permissions_for(ctx.me).add_reactions
-            if not can_react:
-                message += " (y/n)"
-            message = await ctx.send(message)
+        if can_react:
+            start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
+            predicate = ReactionPredicate.yes_or_no(message, ctx.author)
+            event_type = "reaction_add"
+        else:
+            predicate = MessagePredicate.yes_or_no(ctx)
+            event_type = "message"
 
-            if can_react:
-                start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
-                predicate = ReactionPredicate.yes_or_no(message, ctx.author)
-                event_type = "reaction_add"
-            else:
-                predicate = MessagePredicate.yes_or_no(ctx)
-                event_type = "message"
+        try:
+            await self.bot.wait_for(event_type, check=predicate, timeout=30)
+        except asyncio.TimeoutError:
+            return await ctx.send(_("You took too long to respond."))
 
-            try:
-                await self.bot.wait_for(event_type, check=predicate, timeout=30)
-            except asyncio.TimeoutError:
-                await ctx.send(_("You took too long to respond."))
+        if not predicate.result:
+            return await ctx.send(_("No changes have been made."))
 
-            if predicate.result:
-                delkeys = []
-                for k in raffle_data.keys():
-                    if k in components:
-                        delkeys.append(k)
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            else:
+                delkeys = [k for k in raffle_data.keys() if k in components]
                 for k in delkeys:
                     del raffle_data[k]
-                await ctx.send(_("Raffle converted to simple raffle."))
-
-            else:
-                await ctx.send(_("No changes have been made."))
+                message = _("Raffle converted to simple raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def serverjoinage(
@@ -135,30 +133,29 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<new_server_join_age>` - The new join age requirement.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            if not new_server_join_age:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["server_join_age"]
-                return await ctx.send(_("Server join age requirement removed from this raffle."))
+        if new_server_join_age is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable this condition.')
+            )
 
-            elif new_server_join_age is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable this condition.')
-                )
+        if new_server_join_age:
+            try:
+                RaffleManager.parse_serverjoinage(ctx, new_server_join_age)
+            except InvalidArgument as e:
+                return await ctx.send(format_traceback(e))
 
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif not new_server_join_age:
+                raffle_data.pop("server_join_age", None)
+                message = _("Server join age requirement removed from this raffle.")
             else:
-                try:
-                    RaffleManager.parse_serverjoinage(ctx, new_server_join_age)
-                except InvalidArgument as e:
-                    return await ctx.send(format_traceback(e))
-
                 raffle_data["server_join_age"] = new_server_join_age
-                await ctx.send(_("Server join age requirement updated for this raffle."))
+                message = _("Server join age requirement updated for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def description(
@@ -172,25 +169,23 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<description>` - The new description.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            if not description:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["description"]
-                return await ctx.send(_("Description removed from this raffle."))
-
-            elif description is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable the description.')
-                )
+        if description is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable the description.')
+            )
 
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif not description:
+                raffle_data.pop("description", None)
+                message = _("Description removed from this raffle.")
             else:
                 raffle_data["description"] = description
-                await ctx.send(_("Description updated for this raffle."))
+                message = _("Description updated for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def stimer(self, ctx, raffle: RaffleFactoryConverter, suspense_timer: Union[int, bool]):
@@ -203,27 +198,26 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<description>` - The new suspense timer.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            if not suspense_timer:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["suspense_timer"]
-                return await ctx.send(_("Suspense timer reset to the default: 2 seconds."))
+        if suspense_timer is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable the description.')
+            )
 
-            elif suspense_timer is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable the description.')
-                )
+        if suspense_timer and not suspense_timer in [*range(0, 11)]:
+            return await ctx.send(_("New suspense timer must be a number between 0 and 10."))
 
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif not suspense_timer:
+                raffle_data.pop("suspense_timer", None)
+                message = _("Suspense timer reset to the default: 2 seconds.")
             else:
-                if not suspense_timer in [*range(0, 11)]:
-                    await ctx.send("New suspense timer must be a number between 0 and 10.")
                 raffle_data["suspense_timer"] = suspense_timer
-                await ctx.send(_("Suspense timer updated for this raffle."))
+                message = _("Suspense timer updated for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def endaction(
@@ -237,36 +231,35 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<on_end_action>` - The new action. Must be one of `end`, `remove_winner`, 'remove_and_prevent_winner', or `keep_winner`.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            if not on_end_action:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["on_end_action"]
-                return await ctx.send(_("On end action reset to the default: `keep_winner`."))
+        if on_end_action is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable the description.')
+            )
 
-            elif on_end_action is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable the description.')
+        if on_end_action and not on_end_action in (
+            "end",
+            "remove_winner",
+            "remove_and_prevent_winner",
+            "keep_winner",
+        ):
+            return await ctx.send(
+                _(
+                    "Please provide one of `end`, `remove_winner`, `remove_and_prevent_winner`, or `keep_winner`."
                 )
+            )
 
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif not on_end_action:
+                raffle_data.pop("on_end_action", None)
+                message = _("On end action reset to the default: `keep_winner`.")
             else:
-                if not on_end_action in (
-                    "end",
-                    "remove_winner",
-                    "remove_and_prevent_winner",
-                    "keep_winner",
-                ):
-                    return await ctx.send(
-                        _(
-                            "Please provide one of `end`, `remove_winner`, `remove_and_prevent_winner`, or `keep_winner`."
-                        )
-                    )
                 raffle_data["on_end_action"] = on_end_action
-                await ctx.send(_("On end action updated for this raffle."))
+                message = _("On end action updated for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def maxentries(
@@ -280,25 +273,23 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<maximum_entries>` - The new maximum number of entries.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            if not maximum_entries:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["maximum_entries"]
-                return await ctx.send(_("Maximum entries condition removed from this raffle."))
-
-            elif maximum_entries is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable this condition.')
-                )
+        if maximum_entries is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable this condition.')
+            )
 
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif not maximum_entries:
+                raffle_data.pop("maximum_entries", None)
+                message = _("Maximum entries condition removed from this raffle.")
             else:
                 raffle_data["maximum_entries"] = maximum_entries
-                await ctx.send(_("Max entries requirement updated for this raffle."))
+                message = _("Max entries requirement updated for this raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @edit.command()
     async def endmessage(
@@ -316,77 +307,72 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<end_message>` - The new ending message.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
+        if end_message is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable this condition.')
+            )
 
-            if not end_message:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["end_message"]
-                return await ctx.send(
-                    _("End message feature removed from this raffle. It will now use the default.")
-                )
+        if not end_message:
+            reply = _("End message feature removed from this raffle. It will now use the default.")
+        else:
+            try:
+                raffle_safe_member_scanner(end_message, "end_message")
+            except InvalidArgument as e:
+                return await ctx.send(format_traceback(e))
 
-            elif end_message is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable this condition.')
-                )
+            # The messages are collected before the raffle is locked.
+            message = _(
+                "Would you like to add additional end messages to be selected from at random?"
+            )
 
+            can_react = ctx.channel.permissions_for(ctx.me).add_reactions
+            if not can_react:
+                message += " (y/n)"
+            message = await ctx.send(message)
+            if can_react:
+                start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
+                predicate = ReactionPredicate.yes_or_no(message, ctx.author)
+                event_type = "reaction_add"
             else:
-                try:
-                    raffle_safe_member_scanner(end_message, "end_message")
-                except InvalidArgument as e:
-                    return await ctx.send(format_traceback(e))
-
-                message = _(
-                    "Would you like to add additional end messages to be selected from at random?"
-                )
+                predicate = MessagePredicate.yes_or_no(ctx)
+                event_type = "message"
 
-                can_react = ctx.channel.permissions_for(ctx.me).add_reactions
-                if not can_react:
-                    message += " (y/n)"
-                message = await ctx.send(message)
-                if can_react:
-                    start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
-                    predicate = ReactionPredicate.yes_or_no(message, ctx.author)
-                    event_type = "reaction_add"
-                else:
-                    predicate = MessagePredicate.yes_or_no(ctx)
-                    event_type = "message"
-
-                try:
-                    await self.bot.wait_for(event_type, check=predicate, timeout=30)
-                except asyncio.TimeoutError:
-                    await ctx.send(
-                        _(
-                            'You took too long to respond. Saving end message as "{}".'.format(
-                                end_message
-                            )
+            try:
+                await self.bot.wait_for(event_type, check=predicate, timeout=30)
+            except asyncio.TimeoutError:
+                await ctx.send(
+                    _(
+                        'You took too long to respond. Saving end message as "{}".'.format(
+                            end_message
                         )
                     )
+                )
 
-                if predicate.result:
-                    interaction = await start_interactive_message_session(
-                        ctx, self.bot, "end_message", message
+            if predicate.result:
+                interaction = await start_interactive_message_session(
+                    ctx, self.bot, "end_message", message
+                )
+                if interaction is False:
+                    data = end_message
+                    reply = _(
+                        "End message set to what you provided previously: {}".format(end_message)
                     )
-                    if interaction is False:
-                        data = end_message
-                        await ctx.send(
-                            _(
-                                "End message set to what you provided previously: {}".format(
-                                    end_message
-                                )
-                            )
-                        )
-                    else:
-                        data = [end_message] + interaction
-                        await ctx.send(_("End messages updated for this raffle."))
                 else:
-                    data = end_message
-                    await ctx.send(_("End message updated for this raffle."))
+                    data = [end_message] + interaction
+                    reply = _("End messages updated for this raffle.")
+            else:
+                data = end_message
+                reply = _("End message updated for this raffle.")
+
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                reply = _("This raffle has ended.")
+            elif not end_message:
+                raffle_data.pop("end_message", None)
+            else:
                 raffle_data["end_message"] = data
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(reply)
 
     @edit.command()
     async def joinmessage(
@@ -404,79 +390,74 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<join_message>` - The new joining message.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
+        if join_message is True:
+            return await ctx.send(
+                _('Please provide a number, or "false" to disable this condition.')
+            )
 
-            if not join_message:
-                with contextlib.suppress(KeyError):
-                    del raffle_data["join_message"]
-                return await ctx.send(
-                    _(
-                        "Join message feature removed from this raffle. It will now use the default."
-                    )
-                )
+        if not join_message:
+            reply = _(
+                "Join message feature removed from this raffle. It will now use the default."
+            )
+        else:
+            try:
+                raffle_safe_member_scanner(join_message, "join_message")
+            except InvalidArgument as e:
+                return await ctx.send(format_traceback(e))
 
-            elif join_message is True:
-                return await ctx.send(
-                    _('Please provide a number, or "false" to disable this condition.')
-                )
+            # The messages are collected before the raffle is locked.
+            message = _(
+                "Would you like to add additional end messages to be selected from at random?"
+            )
 
+            can_react = ctx.channel.permissions_for(ctx.me).add_reactions
+            if not can_react:
+                message += " (y/n)"
+            message = await ctx.send(message)
+            if can_react:
+                start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
+                predicate = ReactionPredicate.yes_or_no(message, ctx.author)
+                event_type = "reaction_add"
             else:
-                try:
-                    raffle_safe_member_scanner(join_message, "join_message")
-                except InvalidArgument as e:
-                    return await ctx.send(format_traceback(e))
-
-                message = _(
-                    "Would you like to add additional end messages to be selected from at random?"
-                )
+                predicate = MessagePredicate.yes_or_no(ctx)
+                event_type = "message"
 
-                can_react = ctx.channel.permissions_for(ctx.me).add_reactions
-                if not can_react:
-                    message += " (y/n)"
-                message = await ctx.send(message)
-                if can_react:
-                    start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
-                    predicate = ReactionPredicate.yes_or_no(message, ctx.author)
-                    event_type = "reaction_add"
-                else:
-                    predicate = MessagePredicate.yes_or_no(ctx)
-                    event_type = "message"
-
-                try:
-                    await self.bot.wait_for(event_type, check=predicate, timeout=30)
-                except asyncio.TimeoutError:
-                    await ctx.send(
-                        _(
-                            'You took too long to respond. Saving join message as "{}".'.format(
-                                join_message
-                            )
+            try:
+                await self.bot.wait_for(event_type, check=predicate, timeout=30)
+            except asyncio.TimeoutError:
+                await ctx.send(
+                    _(
+                        'You took too long to respond. Saving join message as "{}".'.format(
+                            join_message
                         )
                     )
+                )
 
-                if predicate.result:
-                    interaction = await start_interactive_message_session(
-                        ctx, self.bot, "join_message", message
+            if predicate.result:
+                interaction = await start_interactive_message_session(
+                    ctx, self.bot, "join_message", message
+                )
+                if interaction is False:
+                    data = join_message
+                    reply = _(
+                        "Join message set to what you provided previously: {}".format(join_message)
                     )
-                    if interaction is False:
-                        data = join_message
-                        await ctx.send(
-                            _(
-                                "Join message set to what you provided previously: {}".format(
-                                    join_message
-                                )
-                            )
-                        )
-                    else:
-                        data = [join_message] + interaction
-                        await ctx.send(_("Join messages updated for this raffle."))
                 else:
-                    data = join_message
-                    await ctx.send(_("Join message updated for this raffle."))
+                    data = [join_message] + interaction
+                    reply = _("Join messages updated for this raffle.")
+            else:
+                data = join_message
+                reply = _("Join message updated for this raffle.")
+
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                reply = _("This raffle has ended.")
+            elif not join_message:
+                raffle_data.pop("join_message", None)
+            else:
                 raffle_data["join_message"] = data
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(reply)
 
     @edit.command()
     async def fromyaml(self, ctx, raffle: RaffleFactoryConverter):
@@ -485,9 +466,7 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to edit.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
+        raffle_data = await self.cache.get(ctx.guild, raffle)
 
         existing_data = {
             "end_message": raffle_data.get("end_message", None),
@@ -502,6 +481,9 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             "maximum_entries": raffle_data.get("maximum_entries", None),
             "on_end_action": raffle_data.get("on_end_action", None),
             "suspense_timer": raffle_data.get("suspense_timer", None),
+            "role_weights": raffle_data.get("role_weights", None),
+            "secure_draw": raffle_data.get("secure_draw", None),
+            "end_at": raffle_data.get("end_at", None),
         }
 
         message = (
@@ -522,7 +504,7 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
         noedits = lambda x: _("{x} # Cannot be edited".format(x=x))
         relevant_data = [("name", noedits(quotes(raffle)))]
         for k, v in raffle_data.items():
-            if k in ("owner", "entries", "created_at"):
+            if k in INTERNAL_KEYS:
                 # These are not user defined keys
                 continue
             if isinstance(v, str):
@@ -564,14 +546,6 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             exc = cross(_("An exception occured whilst parsing your data."))
             return await ctx.send(exc + format_traceback(e))
 
-        data = {
-            "owner": raffle_data.get("owner"),
-            "entries": raffle_data.get("entries"),
-        }
-
-        if raffle_data.get("created_at", None):
-            data["created_at"] = raffle_data["created_at"]
-
         conditions = {
             "end_message": valid.get("end_message", None),
             "join_message": valid.get("join_message", None),
@@ -585,14 +559,25 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             "maximum_entries": valid.get("maximum_entries", None),
             "on_end_action": valid.get("on_end_action", None),
             "suspense_timer": valid.get("suspense_timer", None),
+            "role_weights": valid.get("role_weights", None),
+            "secure_draw": valid.get("secure_draw", None),
+            "end_at": valid.get("end_at", None),
         }
 
-        for k, v in conditions.items():
-            if v:
-                data[k] = v
+        async with self.cache.lock(ctx.guild, raffle):
+            # The raffle may have ended, or been joined, while the YAML was written.
+            raffle_data = await self.cache.get(ctx.guild, raffle)
+            if raffle_data is not None:
+                data = {k: v for k, v in raffle_data.items() if k in INTERNAL_KEYS}
+                for k, v in conditions.items():
+                    if v:
+                        data[k] = v
 
-        async with self.config.guild(ctx.guild).raffles() as r:
-            r[raffle] = data
+                await self.cache.set(ctx.guild, raffle, data)
+                self.scheduler.schedule(ctx.guild.id, raffle, data)
+
+        if raffle_data is None:
+            return await ctx.send(_("This raffle has ended."))
 
         additions = []
         deletions = []
@@ -625,5 +610,3 @@ class EditorCommands(RaffleMixin, metaclass=MetaClass):
             update = tick(_("No changes were made."))
 
         await ctx.send(update)
-
-        await self.clean_guild_raffles(ctx)
@@ -9,6 +9,7 @@ from redbot.core.utils.predicates import MessagePredicate, ReactionPredicate
 from ...mixins.abc import RaffleMixin
 from ...mixins.metaclass import MetaClass
 from ...utils.converters import RaffleFactoryConverter
+from ...utils.entries import EntrySet
 
 _ = Translator("Raffle", __file__)
 
@@ -38,25 +39,21 @@ class Prevented(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<member>` - The member to add to the prevented list.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            prevented = raffle_data.get("prevented_users", [])
-
-            if member.id in prevented:
-                return await ctx.send(_("This user is already prevented in this raffle."))
-
-            if not prevented:
-                raffle_data["prevented_users"] = [member.id]
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif member.id in raffle_data.get("prevented_users", []):
+                message = _("This user is already prevented in this raffle.")
             else:
-                prevented.append(member.id)
-
-            await ctx.send(
-                _("{} added to the prevented list for this raffle.".format(member.name))
-            )
+                prevented = raffle_data.get("prevented_users", [])
+                if not prevented:
+                    raffle_data["prevented_users"] = EntrySet([member.id])
+                else:
+                    prevented.append(member.id)
+                message = _("{} added to the prevented list for this raffle.".format(member.name))
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @prevented.command(name="remove", aliases=["del"])
     async def prevented_remove(self, ctx, raffle: RaffleFactoryConverter, member: discord.Member):
@@ -66,23 +63,21 @@ class Prevented(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<member>` - The member to remove from the prevented list.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            prevented = raffle_data.get("prevented_users", [])
-
-            if member.id not in prevented:
-                return await ctx.send(_("This user was not already prevented in this raffle."))
-
-            prevented.remove(member.id)
-            if not prevented:
-                del raffle_data["prevented_users"]
-            await ctx.send(
-                _("{} remove from the prevented list for this raffle.".format(member.name))
-            )
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif member.id not in raffle_data.get("prevented_users", []):
+                message = _("This user was not already prevented in this raffle.")
+            else:
+                prevented = raffle_data["prevented_users"]
+                prevented.remove(member.id)
+                if not prevented:
+                    del raffle_data["prevented_users"]
+                message = _(
+                    "{} remove from the prevented list for this raffle.".format(member.name)
+                )
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @prevented.command(name="clear")
     async def prevented_clear(self, ctx, raffle: RaffleFactoryConverter):
@@ -91,41 +86,43 @@ class Prevented(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            prevented = raffle_data.get("prevented_users", None)
-
-            if prevented is None:
-                return await ctx.send(_("There are no prevented users."))
-
-            message = _("Are you sure you want to clear the prevented users list for this raffle?")
-            can_react = ctx.channel.permissions_for(ctx.me).add_reactions
-            if not can_react:
-                message += " (yes/no)"
-            message = await ctx.send(message)
-            if can_react:
-                start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
-                predicate = ReactionPredicate.yes_or_no(message, ctx.author)
-                event_type = "reaction_add"
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        if raffle_data is None:
+            return await ctx.send(_("This raffle has ended."))
+        if raffle_data.get("prevented_users", None) is None:
+            return await ctx.send(_("There are no prevented users."))
+
+        # The raffle isn't locked while waiting for an answer.
+        message = _("Are you sure you want to clear the prevented users list for this raffle?")
+        can_react = ctx.channel.permissions_for(ctx.me).add_reactions
+        if not can_react:
+            message += " (yes/no)"
+        message = await ctx.send(message)
+        if can_react:
+            start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
+            predicate = ReactionPredicate.yes_or_no(message, ctx.author)
+            event_type = "reaction_add"
+        else:
+            predicate = MessagePredicate.yes_or_no(ctx)
+            event_type = "message"
+
+        try:
+            await self.bot.wait_for(event_type, check=predicate, timeout=30)
+        except asyncio.TimeoutError:
+            await ctx.send(_("You took too long to respond."))
+            return
+
+        if not predicate.result:
+            return await ctx.send(_("No changes have been made."))
+
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                msg = _("This raffle has ended.")
             else:
-                predicate = MessagePredicate.yes_or_no(ctx)
-                event_type = "message"
-
-            try:
-                await self.bot.wait_for(event_type, check=predicate, timeout=30)
-            except asyncio.TimeoutError:
-                await ctx.send(_("You took too long to respond."))
-                return
-
-            if predicate.result:
-                del raffle_data["prevented_users"]
+                raffle_data.pop("prevented_users", None)
                 msg = _("Prevented users list cleared for this raffle.")
-                try:
-                    await message.edit(content=msg)
-                except discord.NotFound:
-                    await ctx.send(msg)
 
-            else:
-                await ctx.send(_("No changes have been made."))
+        try:
+            await message.edit(content=msg)
+        except discord.NotFound:
+            await ctx.send(msg)
@@ -1,5 +1,4 @@
 import asyncio
-import contextlib
 
 import discord
 from redbot.core import commands
@@ -39,25 +38,23 @@ class RoleRequirements(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<role>` - The role to add to the list of role requirements.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            roles = raffle_data.get("roles_needed_to_enter", [])
-
-            if role.id in roles:
-                return await ctx.send(_("This role is already a requirement in this raffle."))
-
-            if not roles:
-                raffle_data["roles_needed_to_enter"] = [role.id]
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif role.id in raffle_data.get("roles_needed_to_enter", []):
+                message = _("This role is already a requirement in this raffle.")
             else:
-                roles.append(role.id)
+                roles = raffle_data.get("roles_needed_to_enter", [])
+                if not roles:
+                    raffle_data["roles_needed_to_enter"] = [role.id]
+                else:
+                    roles.append(role.id)
+                message = _(
+                    "{} added to the role requirement list for this raffle.".format(role.name)
+                )
 
-            await ctx.send(
-                _("{} added to the role requirement list for this raffle.".format(role.name))
-            )
-
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @rolesreq.command(name="remove", aliases=["del"])
     async def rolereq_remove(self, ctx, raffle: RaffleFactoryConverter, role: discord.Role):
@@ -67,21 +64,18 @@ class RoleRequirements(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<role>` - The role to remove from the list of role requirements.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            roles = raffle_data.get("roles_needed_to_enter", [])
-
-            if role.id not in roles:
-                return await ctx.send(_("This role is not already a requirement in this raffle."))
-
-            roles.remove(role.id)
-            await ctx.send(
-                _("{} remove from the role requirement list for this raffle.".format(role.name))
-            )
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif role.id not in raffle_data.get("roles_needed_to_enter", []):
+                message = _("This role is not already a requirement in this raffle.")
+            else:
+                raffle_data["roles_needed_to_enter"].remove(role.id)
+                message = _(
+                    "{} remove from the role requirement list for this raffle.".format(role.name)
+                )
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @rolesreq.command(name="clear")
     async def rolereq_clear(self, ctx, raffle: RaffleFactoryConverter):
@@ -91,47 +85,44 @@ class RoleRequirements(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            rolesreq = raffle_data.get("roles_needed_to_enter", [])
-
-            if rolesreq is None:
-                return await ctx.send(_("There are no required roles."))
-
-            message = _(
-                "Are you sure you want to clear the role requirement list for this raffle?"
-            )
-            can_react = ctx.channel.permissions_for(ctx.me).add_reactions
-            if not can_react:
-                message += " (yes/no)"
-            message = await ctx.send(message)
-            if can_react:
-                start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
-                predicate = ReactionPredicate.yes_or_no(message, ctx.author)
-                event_type = "reaction_add"
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        if raffle_data is None:
+            return await ctx.send(_("This raffle has ended."))
+        if raffle_data.get("roles_needed_to_enter", None) is None:
+            return await ctx.send(_("There are no required roles."))
+
+        # The raffle isn't locked while waiting for an answer.
+        message = _("Are you sure you want to clear the role requirement list for this raffle?")
+        can_react = ctx.channel.permissions_for(ctx.me).add_reactions
+        if not can_react:
+            message += " (yes/no)"
+        message = await ctx.send(message)
+        if can_react:
+            start_adding_reactions(message, ReactionPredicate.YES_OR_NO_EMOJIS)
+            predicate = ReactionPredicate.yes_or_no(message, ctx.author)
+            event_type = "reaction_add"
+        else:
+            predicate = MessagePredicate.yes_or_no(ctx)
+            event_type = "message"
+
+        try:
+            await self.bot.wait_for(event_type, check=predicate, timeout=30)
+        except asyncio.TimeoutError:
+            await ctx.send(_("You took too long to respond."))
+            return
+
+        if not predicate.result:
+            return await ctx.send(_("No changes have been made."))
+
+        async with self.cache.edit(ctx.guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                msg = _("This raffle has ended.")
             else:
-                predicate = MessagePredicate.yes_or_no(ctx)
-                event_type = "message"
-
-            try:
-                await self.bot.wait_for(event_type, check=predicate, timeout=30)
-            except asyncio.TimeoutError:
-                await ctx.send(_("You took too long to respond."))
-                return
-
-            if predicate.result:
-                with contextlib.suppress(KeyError):
-                    # Still wanna remove empty list here
-                    del raffle_data["roles_needed_to_enter"]
-                msg = "Role requirement list cleared for this raffle."
-                try:
-                    await message.edit(content=msg)
-                except discord.NotFound:
-                    await ctx.send(msg)
-
-            else:
-                await ctx.send(_("No changes have been made."))
-
-            await self.clean_guild_raffles(ctx)
+                # Still wanna remove empty list here
+                raffle_data.pop("roles_needed_to_enter", None)
+                msg = _("Role requirement list cleared for this raffle.")
+
+        try:
+            await message.edit(content=msg)
+        except discord.NotFound:
+            await ctx.send(msg)
@@ -1,19 +1,23 @@
 import asyncio
 import contextlib
 import random
+from typing import Dict, List, Optional, Tuple
 
 import discord
 from redbot.core import commands
 from redbot.core.commands import Context
 from redbot.core.i18n import Translator
-from redbot.core.utils.chat_formatting import humanize_list, pagify
+from redbot.core.utils.chat_formatting import pagify
 
+from ..log import log
 from ..mixins.abc import RaffleMixin
 from ..mixins.metaclass import MetaClass
-from ..utils.checks import account_age_checker, server_join_age_checker
+from ..utils.buffer import ENTRY_EMOJI
 from ..utils.converters import RaffleExists, RaffleFactoryConverter
-from ..utils.helpers import format_underscored_text, has_badge
+from ..utils.entries import EntrySet
+from ..utils.mentions import mention_pages, send_paced
 from ..utils.safety import RaffleSafeMember
+from ..utils.sampling import role_weights, sample_winners
 
 _ = Translator("Raffle", __file__)
 
@@ -26,56 +30,274 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
         pass
 
     @raffle.command()
-    async def draw(self, ctx: Context, raffle: RaffleFactoryConverter):
-        """Draw a raffle and select a winner.
+    async def draw(self, ctx: Context, raffle: RaffleFactoryConverter, count: int = 1):
+        """Draw a raffle and select one or more winners.
+
+        The same member cannot win twice in one draw.
 
         **Arguments:**
-            - `<raffle>` - The name of the raffle to draw a winner from.
+            - `<raffle>` - The name of the raffle to draw winners from.
+            - `[count]` - The number of winners to draw, defaults to 1.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
+        if count < 1:
+            return await ctx.send(_("At least one winner must be drawn."))
+
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        entry_count = len(raffle_data["entries"])
+
+        if not entry_count:
+            return await ctx.send(_("There are no participants yet for this raffle."))
+        if count > entry_count:
+            return await ctx.send(
+                _("There are only {} participants in this raffle.".format(entry_count))
+            )
+
+        # Let's add a bit of suspense, shall we? :P
+        if count == 1:
+            await ctx.send(_("Picking a winner from the pool..."))
+        else:
+            await ctx.send(_("Picking {} winners from the pool...".format(count)))
+        await ctx.trigger_typing()
+        await asyncio.sleep(raffle_data.get("suspense_timer", 2))
+
+        # Winners may be added to the prevented users, which are a join condition.
+        prevent_winners = raffle_data.get("on_end_action", None) == "remove_and_prevent_winner"
+
+        # Members may join or leave while we wait, winners are drawn once the raffle is locked.
+        async with self.cache.edit(ctx.guild, raffle, conditions=prevent_winners) as raffle_data:
+            # Replies are sent once the raffle is unlocked.
+            if raffle_data is None:
+                messages = [_("This raffle has ended.")]
+            elif count > len(raffle_data["entries"]):
+                messages = [
+                    _(
+                        "There are only {} participants in this raffle.".format(
+                            len(raffle_data["entries"])
+                        )
+                    )
+                ]
+            else:
+                raffle_entities = lambda x: raffle_data.get(x, None)
+
+                winners, messages = self.pick_winners(ctx.guild, raffle, raffle_data, count)
+
+                on_end_action = raffle_entities("on_end_action") or "keep_winner"
+                if on_end_action == "remove_winner":
+                    for winner in winners:
+                        raffle_entities("entries").discard(winner)
+                elif on_end_action == "keep_winner":
+                    pass
+                elif on_end_action == "remove_and_prevent_winner":
+                    for winner in winners:
+                        raffle_entities("entries").discard(winner)
+                    if raffle_entities("prevented_users"):
+                        for winner in winners:
+                            raffle_entities("prevented_users").add(winner)
+                    else:
+                        raffle_data["prevented_users"] = EntrySet(winners)
+                else:
+                    # end
+                    await self.cache.delete(ctx.guild, raffle)
 
-            raffle_data = r.get(raffle, None)
-            raffle_entities = lambda x: raffle_data.get(x, None)
+        for page in pagify("\n".join(messages)):
+            await ctx.send(page)
 
-            if not raffle_entities("entries"):
-                return await ctx.send(_("There are no participants yet for this raffle."))
+    def pick_winners(
+        self, guild: discord.Guild, raffle: str, raffle_data: dict, count: int
+    ) -> Tuple[List[int], List[str]]:
+        """Draw the winners of a raffle, and format their end messages.
 
-            winner = random.choice(raffle_entities("entries"))
+        The raffle must have at least ``count`` entries."""
+        raffle_entities = lambda x: raffle_data.get(x, None)
 
+        population = raffle_entities("entries").to_list()
+        rng = random.SystemRandom() if raffle_entities("secure_draw") else random
+        winners = sample_winners(
+            population,
+            count,
+            weights=role_weights(guild, population, raffle_entities("role_weights")),
+            rng=rng,
+        )
+
+        messages = []
+        for winner in winners:
             message = raffle_entities("end_message")
             if message:
                 if isinstance(message, list):
                     message = random.choice(message)
             else:
                 message = _(r"Congratulations {winner.mention}, you have won the {raffle} raffle!")
-
-            on_end_action = raffle_entities("on_end_action") or "keep_winner"
-            message = message.format(
-                winner=RaffleSafeMember(self.bot.get_user(winner), "winner"), raffle=raffle
+            messages.append(
+                message.format(
+                    winner=RaffleSafeMember(self.bot.get_user(winner), "winner"), raffle=raffle
+                )
             )
 
-            # Let's add a bit of suspense, shall we? :P
-            await ctx.send(_("Picking a winner from the pool..."))
-            await ctx.trigger_typing()
-            await asyncio.sleep(raffle_data.get("suspense_timer", 2))
-
-            await ctx.send(message)
-
-            if on_end_action == "remove_winner":
-                raffle_entities("entries").remove(winner)
-            elif on_end_action == "keep_winner":
-                pass
-            elif on_end_action == "remove_and_prevent_winner":
-                raffle_entities("entries").remove(winner)
-                if raffle_entities("prevented_users"):
-                    raffle_entities("prevented_users").append(winner)
-                else:
-                    raffle_data["prevented_users"] = [winner]
+        log.info(
+            "Drew %s winner(s) from %s entries of the %s raffle in guild %s: %s"
+            % (count, len(population), raffle, guild.id, winners)
+        )
+        return winners, messages
+
+    async def expire_raffle(self, guild_id: int, raffle: str, end_at: str) -> None:
+        """Draw a winner for a raffle which reached its end time, then end it."""
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+
+        async with self.cache.edit(guild, raffle) as raffle_data:
+            if raffle_data is None or raffle_data.get("end_at", None) != end_at:
+                # Ended or edited since it was scheduled.
+                return
+
+            if raffle_data["entries"]:
+                _winners, messages = self.pick_winners(guild, raffle, raffle_data, 1)
             else:
-                # end
-                r.pop(raffle)
+                messages = [_("The {} raffle has ended, nobody entered.".format(raffle))]
+            await self.cache.delete(guild, raffle)
+
+        destination = guild.get_channel(raffle_data.get("channel", None))
+        if destination is None or not destination.permissions_for(guild.me).send_messages:
+            destination = guild.get_member(raffle_data["owner"])
+            if destination is None:
+                return
+        with contextlib.suppress(discord.HTTPException):
+            for page in pagify("\n".join(messages)):
+                await destination.send(page)
 
-        await self.clean_guild_raffles(ctx)
+    @raffle.command()
+    @commands.bot_has_permissions(add_reactions=True, embed_links=True)
+    async def post(
+        self,
+        ctx: Context,
+        raffle: RaffleFactoryConverter,
+        channel: discord.TextChannel = None,
+    ):
+        """Post a raffle, members can then enter it by reacting to the post.
+
+        Reactions are added to the raffle in batches, and the post is edited
+        with the number of entries, instead of replying to every member.
+        Posting a raffle again replaces its previous post.
+
+        **Arguments:**
+            - `<raffle>` - The name of the raffle to post.
+            - `[channel]` - The channel to post the raffle in, defaults to the current channel.
+        """
+        channel = channel or ctx.channel
+        permissions = channel.permissions_for(ctx.guild.me)
+        if not (
+            permissions.send_messages and permissions.add_reactions and permissions.embed_links
+        ):
+            return await ctx.send(
+                _("I need to be able to send embeds and add reactions in that channel.")
+            )
+
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        embed = await self.raffle_post_embed(channel, raffle, raffle_data)
+        message = await channel.send(embed=embed)
+        await message.add_reaction(ENTRY_EMOJI)
+
+        async with self.cache.edit(ctx.guild, raffle) as raffle_data:
+            if raffle_data is not None:
+                old_post = raffle_data.get("post", None)
+                raffle_data["post"] = [channel.id, message.id]
+
+        if raffle_data is None:
+            return await ctx.send(_("This raffle has ended."))
+        if old_post:
+            self.entry_buffer.unwatch(old_post[1])
+        self.entry_buffer.watch(message.id, ctx.guild.id, raffle)
+        await ctx.send(
+            _("Raffle posted, members can enter it by reacting with {}.".format(ENTRY_EMOJI))
+        )
+
+    async def raffle_post_embed(
+        self, channel: discord.TextChannel, raffle: str, raffle_data: dict
+    ) -> discord.Embed:
+        embed = discord.Embed(
+            title=raffle,
+            description=raffle_data.get("description", None)
+            or _("React with {} to enter this raffle!".format(ENTRY_EMOJI)),
+            color=await self.bot.get_embed_colour(channel),
+        )
+        entry_count = len(raffle_data["entries"])
+        maximum_entries = raffle_data.get("maximum_entries", None)
+        if maximum_entries:
+            entries = _("{} of {} entries").format(entry_count, maximum_entries)
+        else:
+            entries = _("{} entries").format(entry_count)
+        embed.set_footer(text=_("React with {} to enter | {}").format(ENTRY_EMOJI, entries))
+        return embed
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if payload.guild_id is None or str(payload.emoji) != ENTRY_EMOJI:
+            return
+        if payload.member is None or payload.member.bot:
+            return
+        self.entry_buffer.push(
+            payload.guild_id, payload.message_id, payload.user_id, payload.member
+        )
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        if payload.guild_id is None or str(payload.emoji) != ENTRY_EMOJI:
+            return
+        if payload.user_id == self.bot.user.id:
+            return
+        self.entry_buffer.push(payload.guild_id, payload.message_id, payload.user_id, None)
+
+    async def flush_entries(
+        self, guild_id: int, raffle: str, changes: Dict[int, Optional[discord.Member]]
+    ) -> None:
+        """Apply a batch of reactions to a raffle, then edit its post once.
+
+        Members who reacted are added if they meet the conditions of the
+        raffle, members who removed their reaction are removed from it."""
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+
+        added = removed = 0
+        async with self.cache.edit(guild, raffle) as raffle_data:
+            if raffle_data is None:
+                for message_id, key in list(self.entry_buffer.posts.items()):
+                    if key == (guild_id, raffle):
+                        self.entry_buffer.unwatch(message_id)
+                return
+
+            conditions = await self.cache.conditions(guild, raffle)
+            entries = raffle_data["entries"]
+            maximum_entries = raffle_data.get("maximum_entries", None)
+            for user_id, member in changes.items():
+                if member is None:
+                    if user_id in entries:
+                        entries.discard(user_id)
+                        removed += 1
+                    continue
+                if user_id in entries:
+                    continue
+                if maximum_entries and len(entries) >= maximum_entries:
+                    continue
+                if conditions.check(member):
+                    continue
+                entries.add(user_id)
+                added += 1
+
+            post = raffle_data.get("post", None)
+
+        log.debug(
+            "Added %s and removed %s reaction entries of the %s raffle in guild %s"
+            % (added, removed, raffle, guild_id)
+        )
+        if not post or not (added or removed):
+            return
+        channel = guild.get_channel(post[0])
+        if channel is None:
+            return
+        embed = await self.raffle_post_embed(channel, raffle, raffle_data)
+        with contextlib.suppress(discord.HTTPException):
+            await channel.get_partial_message(post[1]).edit(embed=embed)
 
     @raffle.command()
     async def kick(self, ctx: Context, raffle: RaffleFactoryConverter, member: discord.Member):
@@ -85,18 +307,17 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
             - `<raffle>` - The name of the raffle.
             - `<member>` - The member to kick from the raffle.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-            raffle_entities = lambda x: raffle_data.get(x)
-
-            if member.id not in raffle_entities("entries"):
-                return await ctx.send(_("This user has not entered this raffle."))
-
-            raffle_entities("entries").remove(member.id)
-            await ctx.send(_("User removed from the raffle."))
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif member.id not in raffle_data["entries"]:
+                message = _("This user has not entered this raffle.")
+            else:
+                raffle_data["entries"].remove(member.id)
+                message = _("User removed from the raffle.")
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @raffle.command()
     async def join(self, ctx: Context, raffle: RaffleExists):
@@ -105,81 +326,44 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to join.
         """
-        r = await self.config.guild(ctx.guild).raffles()
-        raffle_data = r.get(raffle, None)
+        raffle_data = await self.cache.get(ctx.guild, raffle)
 
         raffle_entities = lambda x: raffle_data.get(x, None)
 
         if ctx.author.id in raffle_entities("entries"):
             return await ctx.send(_("You are already in this raffle."))
 
-        if raffle_entities("prevented_users") and ctx.author.id in raffle_entities(
-            "prevented_users"
-        ):
-            return await ctx.send(_("You are not allowed to join this particular raffle."))
-
-        if raffle_entities("allowed_users") and ctx.author.id not in raffle_entities(
-            "allowed_users"
-        ):
-            return await ctx.send(_("You are not allowed to join this particular raffle"))
-
-        if ctx.author.id == raffle_entities("owner"):
-            return await ctx.send(_("You cannot join your own raffle."))
-
         if raffle_entities("maximum_entries") and len(
             raffle_entities("entries")
-        ) > raffle_entities("maximum_entries"):
+        ) >= raffle_entities("maximum_entries"):
             return await ctx.send(
                 _("Sorry, the maximum number of users have entered this raffle.")
             )
 
-        if raffle_entities("roles_needed_to_enter"):
-            for r in raffle_entities("roles_needed_to_enter"):
-                if not r in [x.id for x in ctx.author.roles]:
-                    return await ctx.send(
-                        _(
-                            "You are missing a required role: {}".format(
-                                ctx.guild.get_role(r).mention
-                            )
-                        )
-                    )
-
-        if raffle_entities("account_age") and not account_age_checker(
-            raffle_entities("account_age")
-        ):
-            return await ctx.send(
-                _(
-                    "Your account must be at least {} days old to join.".format(
-                        raffle_entities("account_age")
-                    )
-                )
-            )
-
-        if raffle_entities("server_join_age") and not server_join_age_checker(
-            ctx, raffle_entities("server_join_age")
-        ):
-            return await ctx.send(
-                _(
-                    "You must have been in this guild for at least {} days to join.".format(
-                        raffle_entities("server_join_age")
-                    )
-                )
-            )
+        conditions = await self.cache.conditions(ctx.guild, raffle)
+        failures = conditions.check(ctx.author)
+        if failures:
+            return await ctx.send("\n".join(f.message for f in failures))
 
-        if raffle_entities("badges_needed_to_enter"):
-            for badge in raffle_entities("badges_needed_to_enter"):
-                if not has_badge(badge, ctx.author):
-                    return await ctx.send(
-                        _(
-                            'You must have the "{}" Discord badge to join.'.format(
-                                format_underscored_text(badge)
-                            )
-                        )
-                    )
+        failure = None
+        async with self.cache.edit(ctx.guild, raffle) as raffle_data:
+            # Other members may have joined, or the raffle may have ended, while we were checking.
+            if raffle_data is None:
+                failure = _("This raffle has ended.")
+            else:
+                entries = raffle_data["entries"]
+                maximum_entries = raffle_data.get("maximum_entries", None)
+                if ctx.author.id in entries:
+                    failure = _("You are already in this raffle.")
+                elif maximum_entries and len(entries) >= maximum_entries:
+                    failure = _("Sorry, the maximum number of users have entered this raffle.")
+                else:
+                    entries.add(ctx.author.id)
+                    entry_count = len(entries)
 
-        async with self.config.guild(ctx.guild).raffles() as r:
-            raffle_entities = lambda x: r[raffle].get(x, None)
-            raffle_entities("entries").append(ctx.author.id)
+        # Replies are sent once the raffle is unlocked.
+        if failure:
+            return await ctx.send(failure)
 
         welcome_msg = _("{} you have been added to the raffle.".format(ctx.author.mention))
 
@@ -190,12 +374,11 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
             join_message = join.format(
                 user=RaffleSafeMember(ctx.author, "user"),
                 raffle=raffle,
-                entry_count=len(raffle_entities("entries")),
+                entry_count=entry_count,
             )
             welcome_msg += "\n---\n{}".format(join_message)
 
         await ctx.send(welcome_msg)
-        await self.clean_guild_raffles(ctx)
 
     @raffle.command()
     async def leave(self, ctx: Context, raffle: RaffleExists):
@@ -204,20 +387,19 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to leave.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-            raffle_entries = raffle_data.get("entries")
-
-            if not ctx.author.id in raffle_entries:
-                return await ctx.send(_("You are not entered into this raffle."))
-
-            raffle_entries.remove(ctx.author.id)
-            await ctx.send(
-                _("{0.mention} you have been removed from the raffle.".format(ctx.author))
-            )
+        # Replies are sent once the raffle is unlocked.
+        async with self.cache.edit(ctx.guild, raffle) as raffle_data:
+            if raffle_data is None:
+                message = _("This raffle has ended.")
+            elif ctx.author.id not in raffle_data["entries"]:
+                message = _("You are not entered into this raffle.")
+            else:
+                raffle_data["entries"].remove(ctx.author.id)
+                message = _(
+                    "{0.mention} you have been removed from the raffle.".format(ctx.author)
+                )
 
-        await self.clean_guild_raffles(ctx)
+        await ctx.send(message)
 
     @raffle.command()
     async def mention(self, ctx: Context, raffle: RaffleFactoryConverter):
@@ -226,21 +408,16 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to mention all the members in.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
-
-            raffle_entities = lambda x: raffle_data.get(x)
+        raffle_data = await self.cache.get(ctx.guild, raffle)
 
-            if not raffle_entities("entries"):
-                return await ctx.send(_("There are no entries yet for this raffle."))
+        if not raffle_data["entries"]:
+            return await ctx.send(_("There are no entries yet for this raffle."))
 
-            for page in pagify(
-                humanize_list([self.bot.get_user(u).mention for u in raffle_entities("entries")])
-            ):
-                await ctx.send(page)
-
-        await self.clean_guild_raffles(ctx)
+        # Members may join or leave while the pages are sent, don't iterate the raffle itself.
+        user_ids = raffle_data["entries"].to_list()
+        sent = await send_paced(ctx, mention_pages(user_ids, self.bot.get_user))
+        if not sent:
+            await ctx.send(_("None of the users entered into this raffle could be found."))
 
     @raffle.command()
     async def end(self, ctx: Context, raffle: RaffleFactoryConverter):
@@ -249,14 +426,10 @@ class EventCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to end.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            msg = await ctx.send(_("Ending the `{raffle}` raffle...".format(raffle=raffle)))
+        msg = await ctx.send(_("Ending the `{raffle}` raffle...".format(raffle=raffle)))
 
-            r.pop(raffle)
+        await self.cache.delete(ctx.guild, raffle)
 
         await asyncio.sleep(1)
         with contextlib.suppress(discord.NotFound):
             await msg.edit(content=_("Raffle ended."))
-
-        await self.clean_guild_raffles(ctx)
@@ -7,14 +7,19 @@ from redbot.core.utils.chat_formatting import box, pagify
 from ..mixins.abc import RaffleMixin
 from ..mixins.metaclass import MetaClass
 from ..utils.converters import RaffleExists
+from ..utils.entries import EntrySet
 from ..utils.enums import RaffleComponents
 from ..utils.formatting import CURRENT_PAGE, LEFT_ARROW, RIGHT_ARROW, curl
-from ..utils.helpers import compose_menu, format_underscored_text, listumerate, yield_sectors
+from ..utils.helpers import INTERNAL_KEYS, compose_menu, format_underscored_text
+from ..utils.menus import EntryPageSource, RafflePageSource, TextPageSource, lazy_menu
 from ..utils.parser import RaffleManager
 from ..utils.version_handler import VersionHandler
 
 _ = Translator("Raffle", __file__)
 
+# Lists of users longer than this are shown as a count in the raffle info.
+INFO_USER_LIMIT = 20
+
 
 class InformationalCommands(RaffleMixin, metaclass=MetaClass):
     """Informational commands."""
@@ -30,18 +35,19 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to get information for.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        conditions = await self.cache.conditions(ctx.guild, raffle)
 
         quotes = lambda x: f'"{x}"'
         relevant_data = []
         for k, v in sorted(raffle_data.items(), key=lambda x: len(x[0])):
-            if k in ("owner", "entries", "created_at", "name", "description"):
+            if k in (*INTERNAL_KEYS, "name", "description"):
                 # These are not user defined keys
                 continue
             if isinstance(v, str):
                 v = quotes(v)
+            elif isinstance(v, EntrySet) and len(v) > INFO_USER_LIMIT:
+                v = _("{} users").format(len(v))
             relevant_data.append((k, v))
 
         pre_determined = {
@@ -50,6 +56,7 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
             "owner": str(ctx.guild.get_member(raffle_data["owner"])),
             "created_at": raffle_data.get("created_at", None),
             "entries": len(raffle_data["entries"]) or "No entries yet.",
+            "eligible members": conditions.count_eligible(ctx.guild.members),
         }
 
         message = ""
@@ -60,12 +67,11 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
         if relevant_data:
             message += "\n\n"
 
-        for page in pagify(
-            _(message + "\n".join(f"{x[0]}: {x[1]}" for x in relevant_data)), page_length=1975
-        ):
-            await ctx.send(box(page, lang="yaml"))
-
-        await self.clean_guild_raffles(ctx)
+        lines = _(message + "\n".join(f"{x[0]}: {x[1]}" for x in relevant_data)).splitlines()
+        source = TextPageSource(lines, lang="yaml")
+        if len(source) == 1:
+            return await ctx.send(source.format_page(0))
+        await lazy_menu(ctx, source)
 
     @raffle.command()
     async def asyaml(self, ctx: Context, raffle: RaffleExists):
@@ -74,14 +80,12 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle to get the YAML for.
         """
-        async with self.config.guild(ctx.guild).raffles() as r:
-
-            raffle_data = r.get(raffle, None)
+        raffle_data = await self.cache.get(ctx.guild, raffle)
 
         quotes = lambda x: f'"{x}"'
         relevant_data = [("name", quotes(raffle))]
         for k, v in raffle_data.items():
-            if k in ("owner", "entries", "created_at"):
+            if k in INTERNAL_KEYS:
                 # These are not user defined keys
                 continue
             if isinstance(v, str):
@@ -93,12 +97,10 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
             message + box("\n".join(f"{x[0]}: {x[1]}" for x in relevant_data), lang="yaml")
         )
 
-        await self.clean_guild_raffles(ctx)
-
     @raffle.command(name="list")
     async def _list(self, ctx: Context):
         """List the currently ongoing raffles."""
-        r = await self.config.guild(ctx.guild).raffles()
+        r = await self.cache.all(ctx.guild)
 
         if not r:
             return await ctx.send(_("There are no ongoing raffles."))
@@ -110,18 +112,7 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
                 description = ""
             lines.append("**{}** {}".format(k, RaffleManager.shorten_description(description)))
 
-        embeds = []
-        data = list(pagify("\n".join(lines), page_length=1024))
-
-        for index, page in enumerate(data, 1):
-            embed = discord.Embed(
-                title=_("Current raffles"), description=page, color=await ctx.embed_colour()
-            )
-            embed.set_footer(text="Page {}/{}".format(index, len(data)))
-            embeds.append(embed)
-
-        await compose_menu(ctx, embeds)
-        await self.clean_guild_raffles(ctx)
+        await lazy_menu(ctx, RafflePageSource(lines, await ctx.embed_colour()))
 
     @raffle.command()
     async def raw(self, ctx: Context, raffle: RaffleExists):
@@ -130,50 +121,35 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
         **Arguments:**
             - `<raffle>` - The name of the raffle.
         """
-        r = await self.config.guild(ctx.guild).raffles()
-        for page in pagify(str({raffle: r[raffle]}), page_length=1985):
+        raffle_data = await self.cache.get(ctx.guild, raffle)
+        for page in pagify(str({raffle: raffle_data}), page_length=1985):
             await ctx.send(box(page, lang="json"))
 
-        await self.clean_guild_raffles(ctx)
-
     @raffle.command()
     async def members(self, ctx: Context, raffle: RaffleExists):
         """Get all the members of a raffle.
 
+        You can jump to a page, or to the page of a member, with the reactions.
+
         **Arguments:**
             - `<raffle>` - The name of the raffle to get the members from.
         """
-        r = await self.config.guild(ctx.guild).raffles()
-
-        raffle_data = r.get(raffle, None)
+        raffle_data = await self.cache.get(ctx.guild, raffle)
 
         entries = raffle_data.get("entries")
 
         if not entries:
             return await ctx.send(_("There are no entries yet for this raffle."))
 
-        embed_pages = []
-
-        if len(entries) == 1:
-            entry_grammar = _("entry")
-        else:
-            entry_grammar = _("entries")
-        for chunk in list(yield_sectors(listumerate(entries, 1), 10)):
-            message = ""
-            for c, v in chunk:
-                message += f"#{c} {ctx.guild.get_member(v) or 'Unknown User'}\n"
-            embed = discord.Embed(
-                description=box(message, lang="md"), color=await ctx.embed_colour()
-            )
-            embed.set_author(
-                name=f"{raffle} | {len(entries)} {entry_grammar}",
-                icon_url=self.bot.user.avatar_url,
-            )
-            embed.set_footer(text="Sorted in order of join time.")
-            embed_pages.append(embed)
-
-        await compose_menu(ctx, embed_pages)
-        await self.clean_guild_raffles(ctx)
+        # Only the user IDs are copied, the pages are rendered as they are viewed.
+        source = EntryPageSource(
+            ctx.guild,
+            raffle,
+            entries.to_list(),
+            await ctx.embed_colour(),
+            self.bot.user.avatar_url,
+        )
+        await lazy_menu(ctx, source)
 
     @raffle.command()
     async def conditions(self, ctx: Context):
@@ -255,7 +231,6 @@ class InformationalCommands(RaffleMixin, metaclass=MetaClass):
             )
             pages.append(embed)
         await compose_menu(ctx, pages)
-        await self.clean_guild_raffles(ctx)
 
     @raffle.command()
     async def version(self, ctx: Context):
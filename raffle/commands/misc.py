@@ -1,10 +1,14 @@
 import asyncio
 import contextlib
+import gzip
+import tempfile
+from typing import Callable, Iterable, Optional
 
 import discord
 from redbot.core import commands
 from redbot.core.commands import Context
 from redbot.core.i18n import Translator
+from redbot.core.utils.chat_formatting import humanize_list, pagify
 from redbot.core.utils.menus import start_adding_reactions
 from redbot.core.utils.predicates import MessagePredicate, ReactionPredicate
 
@@ -15,6 +19,7 @@ from ..utils.exceptions import RaffleError
 from ..utils.formatting import cross, tick
 from ..utils.helpers import cleanup_code, format_traceback, validator
 from ..utils.parser import RaffleManager
+from ..utils.transfer import GuildContext, read_raffles, write_header, write_raffle
 
 _ = Translator("Raffle", __file__)
 
@@ -59,12 +64,10 @@ class MiscCommands(RaffleMixin, metaclass=MetaClass):
 
         await ctx.send(tick(_("This YAML is good to go! No errors were found.")))
 
-        await self.clean_guild_raffles(ctx)
-
     @raffle.group(invoke_without_command=True)
     async def refresh(self, ctx: Context, raffle: RaffleFactoryConverter):
         """Refresh raffle(s)."""
-        cleaner = await self.clean_singular_raffle(ctx, raffle)
+        cleaner = await self.clean_singular_raffle(ctx.guild, raffle)
         if cleaner:
             return await ctx.send(_("Raffle updated."))
         else:
@@ -75,7 +78,7 @@ class MiscCommands(RaffleMixin, metaclass=MetaClass):
     async def refresh_guild(self, ctx: Context):
         """Refresh this guild's raffles."""
         await ctx.trigger_typing()
-        cleaner = await self.clean_guild_raffles(ctx)
+        cleaner = await self.clean_guild_raffles(ctx.guild)
         if cleaner:
             return await ctx.send(_("Raffles updated."))
         else:
@@ -93,7 +96,7 @@ class MiscCommands(RaffleMixin, metaclass=MetaClass):
     @commands.guildowner()
     async def teardown(self, ctx: Context):
         """End ALL ongoing raffles."""
-        raffles = await self.config.guild(ctx.guild).raffles()
+        raffles = await self.cache.all(ctx.guild)
 
         if not raffles:
             await ctx.send(_("There are no ongoing raffles in this guild."))
@@ -122,11 +125,138 @@ class MiscCommands(RaffleMixin, metaclass=MetaClass):
             await message.delete()
 
         if predicate.result:
-            async with self.config.guild(ctx.guild).raffles() as r:
-                r.clear()
+            await self.cache.clear(ctx.guild)
             await ctx.send(_("Raffles cleared."))
 
         else:
             await ctx.send(_("No changes have been made."))
 
-        await self.clean_guild_raffles(ctx)
+    @raffle.group(name="export", invoke_without_command=True)
+    @commands.guildowner()
+    async def export(self, ctx: Context):
+        """Export this guild's raffles and their entries to a file.
+
+        The file can be imported with `[p]raffle import`."""
+        await self.send_export(ctx, [ctx.guild])
+
+    @commands.is_owner()
+    @export.command(name="global")
+    async def export_global(self, ctx: Context):
+        """Export the raffles of every guild to a file."""
+        await self.send_export(ctx, self.bot.guilds)
+
+    @raffle.group(name="import", invoke_without_command=True)
+    @commands.guildowner()
+    async def import_(self, ctx: Context):
+        """Import raffles into this guild, from a file made by `[p]raffle export`.
+
+        Attach the file to the message. Raffles which have the name of an
+        existing raffle are skipped, and raffles whose owner is not in this
+        guild are given to you."""
+        await self.receive_import(ctx, lambda guild_id: ctx, lambda guild_id: ctx.guild)
+
+    @commands.is_owner()
+    @import_.command(name="global")
+    async def import_global(self, ctx: Context):
+        """Import the raffles of every guild, from a file made by `[p]raffle export global`.
+
+        Raffles of guilds the bot is not in are skipped. Raffles whose owner
+        left their guild are only given to you in this guild, they are not
+        imported elsewhere."""
+
+        def context_for(guild_id: int) -> Optional[GuildContext]:
+            guild = self.bot.get_guild(guild_id)
+            return GuildContext(self.bot, guild) if guild else None
+
+        await self.receive_import(ctx, context_for, self.bot.get_guild)
+
+    async def send_export(self, ctx: Context, guilds: Iterable[discord.Guild]):
+        count = 0
+        async with ctx.typing():
+            # The export is streamed to disk, rather than built in memory.
+            with tempfile.TemporaryFile() as fp:
+                with gzip.open(fp, "wt", encoding="utf-8") as stream:
+                    write_header(stream)
+                    for guild in guilds:
+                        raffles = await self.cache.all(guild)
+                        for name, raffle_data in raffles.items():
+                            write_raffle(stream, guild.id, name, raffle_data)
+                            count += 1
+                        # Let other tasks run between guilds.
+                        await asyncio.sleep(0)
+
+                if not count:
+                    return await ctx.send(_("There are no raffles to export."))
+                if fp.tell() > ctx.guild.filesize_limit:
+                    return await ctx.send(_("The export is too large to be uploaded here."))
+
+                fp.seek(0)
+                await ctx.send(
+                    _("Exported {} raffle(s).".format(count)),
+                    file=discord.File(fp, filename="raffles.ndjson.gz"),
+                )
+
+    async def receive_import(
+        self,
+        ctx: Context,
+        context_for: Callable[[int], Optional[GuildContext]],
+        target: Callable[[int], Optional[discord.Guild]],
+    ):
+        if not ctx.message.attachments:
+            return await ctx.send(
+                _(
+                    "Please attach a file made by `{}raffle export` to your message.".format(
+                        ctx.clean_prefix
+                    )
+                )
+            )
+
+        imported = 0
+        skipped = []
+        errors = []
+        async with ctx.typing():
+            with tempfile.TemporaryFile() as fp:
+                await ctx.message.attachments[0].save(fp)
+                fp.seek(0)
+                try:
+                    with gzip.open(fp, "rt", encoding="utf-8") as stream:
+                        for guild_id, name, raffle_data, error in read_raffles(
+                            stream, context_for
+                        ):
+                            if error is not None:
+                                errors.append("{}: {}".format(name, error))
+                                continue
+                            guild = target(guild_id)
+                            if name in await self.cache.all(guild):
+                                skipped.append(name)
+                                continue
+                            if not guild.get_member(raffle_data["owner"]):
+                                if guild.id != ctx.guild.id:
+                                    # Don't hand raffles of another server to the importer.
+                                    errors.append(
+                                        "{}: {}".format(
+                                            name, _("The owner of this raffle left its server.")
+                                        )
+                                    )
+                                    continue
+                                raffle_data["owner"] = ctx.author.id
+                            await self.cache.set(guild, name, raffle_data)
+                            self.scheduler.schedule(guild.id, name, raffle_data)
+                            imported += 1
+                except (OSError, EOFError, UnicodeDecodeError):
+                    return await ctx.send(cross(_("This file is not a compressed raffle export.")))
+                except RaffleError as e:
+                    exc = cross(_("An exception occured whilst reading the file."))
+                    return await ctx.send(exc + format_traceback(e))
+
+        message = _("Imported {} raffle(s).".format(imported))
+        if skipped:
+            message += "\n" + _(
+                "Skipped, a raffle with this name already exists: {}".format(
+                    humanize_list(skipped)
+                )
+            )
+        if errors:
+            message += "\n" + _("Not imported:") + "\n" + "\n".join(errors)
+        for page in pagify(message):
+            await ctx.send(page)
@@ -3,6 +3,10 @@ from abc import ABC
 from redbot.core import Config
 from redbot.core.bot import Red
 
+from ..utils.buffer import EntryBuffer
+from ..utils.cache import RaffleCache
+from ..utils.scheduler import RaffleScheduler
+
 
 class RaffleMixin(ABC):
     """Base class for well behaved type
@@ -11,3 +15,6 @@ class RaffleMixin(ABC):
     def __init__(self, *nargs):
         self.config: Config
         self.bot: Red
+        self.cache: RaffleCache
+        self.scheduler: RaffleScheduler
+        self.entry_buffer: EntryBuffer
@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import json
 import pathlib
@@ -9,7 +10,10 @@ from redbot.core.utils.chat_formatting import humanize_list
 
 from .commands import Commands
 from .mixins.metaclass import MetaClass
+from .utils.buffer import EntryBuffer
+from .utils.cache import RaffleCache
 from .utils.cleanup import CleanupHelpers
+from .utils.scheduler import RaffleScheduler
 from .utils.version_handler import VersionHandler
 
 RaffleCog = getattr(commands, "Cog", object)
@@ -41,6 +45,13 @@ class Raffle(*mixinargs, metaclass=MetaClass):
         self.bot = bot
         self.config = Config.get_conf(self, 583475034985340, force_registration=True)
         self.config.register_guild(raffles={})
+        self.cache = RaffleCache(self.config)
+        self.sweep_task = asyncio.create_task(self.sweep_raffles())
+        self.scheduler = RaffleScheduler(self.expire_raffle)
+        self.scheduler.start()
+        self.entry_buffer = EntryBuffer(self.flush_entries)
+        self.entry_buffer.start()
+        self.schedule_task = asyncio.create_task(self.schedule_raffles())
         self.docs = "https://kreusadacogs.readthedocs.io/en/latest/cog_raffle.html"
         if 719988449867989142 in self.bot.owner_ids:
             with contextlib.suppress(Exception):
@@ -66,9 +77,31 @@ class Raffle(*mixinargs, metaclass=MetaClass):
         return
 
     def cog_unload(self):
+        self.sweep_task.cancel()
+        self.schedule_task.cancel()
+        self.scheduler.stop()
+        self.entry_buffer.stop()
+        asyncio.create_task(self.write_pending())
         with contextlib.suppress(Exception):
             self.bot.remove_dev_env_value("raffle")
 
+    async def write_pending(self):
+        """Add the buffered reaction entries, then write the edits whose save was delayed."""
+        await self.entry_buffer.drain()
+        await self.cache.flush()
+
+    async def schedule_raffles(self):
+        """Clean up the raffles, then schedule the raffles with an end time and watch
+        the raffle posts, once the member cache is ready."""
+        await self.bot.wait_until_red_ready()
+        await self.initialize()
+        for guild_id in self.cache.guild_ids():
+            for raffle, raffle_data in self.cache.cached(guild_id).items():
+                self.scheduler.schedule(guild_id, raffle, raffle_data)
+                post = raffle_data.get("post", None)
+                if post:
+                    self.entry_buffer.watch(post[1], guild_id, raffle)
+
     async def cog_check(self, ctx: commands.Context):
         return ctx.guild is not None
 
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import discord
+
+from ..log import log
+
+__all__ = ("ENTRY_EMOJI", "EntryBuffer")
+
+# The reaction members add to a raffle post to enter the raffle.
+ENTRY_EMOJI = "\N{PARTY POPPER}"
+
+# Member, or None when they removed their reaction.
+EntryChanges = Dict[int, Optional[discord.Member]]
+
+
+class EntryBuffer(object):
+    """Collects the entries made by reacting to raffle posts, and flushes them in batches.
+
+    Reactions are only buffered in memory. Every ``interval`` seconds, or
+    as soon as ``max_pending`` reactions are waiting, ``flush`` is called
+    once per raffle with the latest change of each member."""
+
+    def __init__(
+        self,
+        flush: Callable[[int, str, EntryChanges], Awaitable[None]],
+        interval: float = 2.0,
+        max_pending: int = 500,
+    ):
+        self.flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+
+        # message id -> (guild id, raffle name)
+        self.posts: Dict[int, Tuple[int, str]] = {}
+        self._pending: Dict[Tuple[int, str], EntryChanges] = {}
+        self._pending_count = 0
+        self._full = asyncio.Event()
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop flushing in the background, ``drain`` flushes what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def watch(self, message_id: int, guild_id: int, raffle: str) -> None:
+        self.posts[message_id] = (guild_id, raffle)
+
+    def unwatch(self, message_id: int) -> None:
+        self.posts.pop(message_id, None)
+
+    def push(
+        self, guild_id: int, message_id: int, user_id: int, member: Optional[discord.Member]
+    ) -> bool:
+        """Buffer a reaction, returns False if the message isn't a raffle post of the guild."""
+        key = self.posts.get(message_id, None)
+        if key is None or key[0] != guild_id:
+            return False
+        self._pending.setdefault(key, {})[user_id] = member
+        self._pending_count += 1
+        if self._pending_count >= self.max_pending:
+            self._full.set()
+        return True
+
+    async def drain(self) -> None:
+        """Flush every buffered reaction now."""
+        pending, self._pending = self._pending, {}
+        self._pending_count = 0
+        self._full.clear()
+        for (guild_id, raffle), changes in pending.items():
+            try:
+                await self.flush(guild_id, raffle, changes)
+            except Exception:
+                log.exception(
+                    "Failed to add %s entries to the %s raffle in guild %s"
+                    % (len(changes), raffle, guild_id)
+                )
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            await self.drain()
@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import functools
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+import discord
+from redbot.core import Config
+
+from .eligibility import RaffleConditions
+from .entries import ENTRY_KEYS, EntrySet, deflate_raffle
+
+__all__ = ("RaffleCache",)
+
+# Seconds edits of a guild's raffles are gathered for before being written.
+SAVE_DELAY = 5.0
+
+
+class RaffleCache(object):
+    """A write-through cache of the raffles of every guild.
+
+    The raffles of a guild are read from Config once, then served from memory.
+    Raffles which are changed are marked as dirty, and only those are written
+    back to Config, instead of the whole guild raffle dictionary. Edits, such
+    as joins, are written at most once every ``SAVE_DELAY`` seconds.
+
+    In memory, the user ID lists of the raffles are held as entry sets,
+    they are stored back as plain lists. The sets also keep an index of
+    the raffles each user was added to, or owns."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._guilds: Dict[int, Dict[str, dict]] = {}
+        self._dirty: Dict[int, Set[str]] = {}
+        # guild id -> user id -> names of the raffles that may reference the user.
+        # Users are not removed from the index when they leave a raffle, lookups
+        # must check the raffle itself.
+        self._users: Dict[int, Dict[int, Set[str]]] = {}
+        self._locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+        # Compiled when first needed, dropped when the raffle changes.
+        self._conditions: Dict[Tuple[int, str], RaffleConditions] = {}
+        # guild id -> task writing the dirty raffles of the guild after a delay.
+        self._saves: Dict[int, asyncio.Task] = {}
+
+    def load(self, guild_id: int, raffles: Dict[str, dict]) -> None:
+        """Replace the cached raffles of a guild with data read from Config."""
+        self._guilds[guild_id] = raffles
+        self._dirty.pop(guild_id, None)
+        self._drop_conditions(guild_id)
+        self.reindex(guild_id)
+
+    def forget(self, guild_id: int) -> None:
+        """Drop the cached raffles of a guild, they will be read again when needed."""
+        self._guilds.pop(guild_id, None)
+        self._dirty.pop(guild_id, None)
+        self._users.pop(guild_id, None)
+        self._drop_conditions(guild_id)
+
+    def guild_ids(self) -> Iterable[int]:
+        """The IDs of the guilds with cached raffles."""
+        return list(self._guilds)
+
+    def cached(self, guild_id: int) -> Optional[Dict[str, dict]]:
+        """Get the raffles of a guild if they are cached, without reading Config."""
+        return self._guilds.get(guild_id, None)
+
+    def reindex(self, guild_id: int) -> None:
+        """Rebuild the user index of a guild, dropping users who left their raffles."""
+        self._users[guild_id] = {}
+        for raffle, data in self._guilds.get(guild_id, {}).items():
+            self._track(guild_id, raffle, data, rebuild=True)
+
+    def pop_user(self, guild_id: int, user_id: int) -> Set[str]:
+        """Remove a user from the index, and get the names of the raffles which may
+        reference them."""
+        return self._users.get(guild_id, {}).pop(user_id, set())
+
+    def lock(self, guild: discord.Guild, raffle: str) -> asyncio.Lock:
+        """Get the lock held while a raffle is edited."""
+        try:
+            return self._locks[guild.id, raffle]
+        except KeyError:
+            return self._locks.setdefault((guild.id, raffle), asyncio.Lock())
+
+    async def conditions(self, guild: discord.Guild, raffle: str) -> Optional[RaffleConditions]:
+        """Get the compiled join conditions of a raffle."""
+        try:
+            return self._conditions[guild.id, raffle]
+        except KeyError:
+            data = await self.get(guild, raffle)
+            if data is None:
+                return None
+            return self._conditions.setdefault((guild.id, raffle), RaffleConditions(data))
+
+    def _drop_conditions(self, guild_id: int, raffle: Optional[str] = None) -> None:
+        if raffle is not None:
+            self._conditions.pop((guild_id, raffle), None)
+            return
+        for key in [k for k in self._conditions if k[0] == guild_id]:
+            del self._conditions[key]
+
+    def _drop_lock(self, guild_id: int, raffle: str) -> None:
+        lock = self._locks.get((guild_id, raffle), None)
+        if lock is not None and not lock.locked():
+            del self._locks[guild_id, raffle]
+
+    def _index_user(self, guild_id: int, raffle: str, user_id: int) -> None:
+        self._users.setdefault(guild_id, {}).setdefault(user_id, set()).add(raffle)
+
+    def _track(self, guild_id: int, raffle: str, data: dict, *, rebuild: bool = False) -> dict:
+        """Hold the user IDs of a raffle in entry sets which add their users to the index."""
+        if data.get("role_weights", None):
+            # JSON turns the role IDs into strings.
+            data["role_weights"] = {int(k): v for k, v in data["role_weights"].items()}
+        self._index_user(guild_id, raffle, data.get("owner"))
+        watcher = functools.partial(self._index_user, guild_id, raffle)
+        for key in ENTRY_KEYS:
+            value = data.get(key, None)
+            if value is None:
+                continue
+            if not isinstance(value, EntrySet) or value.watcher is None:
+                data[key] = EntrySet(value, watcher=watcher)
+            elif rebuild:
+                # Commands may hold the set, keep it.
+                value.watcher = watcher
+                for user_id in value:
+                    watcher(user_id)
+        return data
+
+    async def all(self, guild: discord.Guild) -> Dict[str, dict]:
+        """Get the raffles of a guild, keyed by name.
+
+        Use the other methods of the cache to make changes."""
+        try:
+            return self._guilds[guild.id]
+        except KeyError:
+            raffles = await self.config.guild(guild).raffles()
+            # Another task may have loaded the guild while we were reading.
+            if guild.id not in self._guilds:
+                self.load(guild.id, raffles)
+            return self._guilds[guild.id]
+
+    async def get(self, guild: discord.Guild, raffle: str) -> Optional[dict]:
+        return (await self.all(guild)).get(raffle, None)
+
+    async def set(self, guild: discord.Guild, raffle: str, data: dict) -> None:
+        """Create or replace a raffle."""
+        (await self.all(guild))[raffle] = self._track(guild.id, raffle, data)
+        self._drop_conditions(guild.id, raffle)
+        self.mark_dirty(guild, raffle)
+        await self.save(guild)
+
+    async def delete(self, guild: discord.Guild, raffle: str) -> None:
+        raffles = await self.all(guild)
+        if raffles.pop(raffle, None) is None:
+            return
+        self._dirty.get(guild.id, set()).discard(raffle)
+        self._drop_lock(guild.id, raffle)
+        self._drop_conditions(guild.id, raffle)
+        await self.config.guild(guild).raffles.clear_raw(raffle)
+
+    async def clear(self, guild: discord.Guild) -> None:
+        """Delete every raffle of a guild."""
+        self._guilds[guild.id] = {}
+        self._dirty.pop(guild.id, None)
+        self._users.pop(guild.id, None)
+        self._drop_conditions(guild.id)
+        for guild_id, raffle in list(self._locks):
+            if guild_id == guild.id:
+                self._drop_lock(guild_id, raffle)
+        await self.config.guild(guild).raffles.clear()
+
+    def conditions_changed(self, guild: discord.Guild, raffle: str) -> None:
+        """Compile the join conditions of a raffle again when next needed.
+
+        Changes to the entries don't need this, the compiled conditions
+        hold the entry sets of the raffle."""
+        self._drop_conditions(guild.id, raffle)
+
+    def mark_dirty(self, guild: discord.Guild, raffle: str) -> None:
+        """Mark a raffle as changed, it will be written by the next save."""
+        self._dirty.setdefault(guild.id, set()).add(raffle)
+
+    async def save(self, guild: discord.Guild) -> None:
+        """Write the dirty raffles of a guild to Config."""
+        dirty = self._dirty.pop(guild.id, None)
+        if not dirty:
+            return
+        raffles = self._guilds.get(guild.id, {})
+        group = self.config.guild(guild).raffles
+        for raffle in dirty:
+            if raffle in raffles:
+                await group.set_raw(raffle, value=deflate_raffle(raffles[raffle]))
+
+    def save_later(self, guild: discord.Guild) -> None:
+        """Write the dirty raffles of a guild in ``SAVE_DELAY`` seconds,
+        along with the raffles changed meanwhile."""
+        if guild.id not in self._saves:
+            self._saves[guild.id] = asyncio.create_task(self._save_later(guild))
+
+    async def _save_later(self, guild: discord.Guild) -> None:
+        await asyncio.sleep(SAVE_DELAY)
+        del self._saves[guild.id]
+        await self.save(guild)
+
+    async def flush(self) -> None:
+        """Write the delayed saves now."""
+        saves, self._saves = self._saves, {}
+        for task in saves.values():
+            task.cancel()
+        for guild_id in list(self._dirty):
+            # Config only needs the ID of the guild.
+            await self.save(discord.Object(guild_id))
+
+    @contextlib.asynccontextmanager
+    async def edit(
+        self, guild: discord.Guild, raffle: str, *, conditions: bool = False
+    ) -> AsyncIterator[Optional[dict]]:
+        """Edit a raffle in place, the raffle is saved shortly after the block exits.
+
+        Pass ``conditions=True`` when the join conditions of the raffle
+        are changed, rather than only its entries.
+
+        Edits of the same raffle are serialised by a lock, checks made inside
+        the block are still true when it exits. The raffle is written after
+        ``SAVE_DELAY`` seconds, once for all the edits made meanwhile.
+
+        This replaces ``async with config.guild(guild).raffles() as r``
+        for commands that only change one raffle."""
+        async with self.lock(guild, raffle):
+            data = await self.get(guild, raffle)
+            try:
+                yield data
+            finally:
+                changed = data is not None and (await self.all(guild)).get(raffle) is data
+                if changed:
+                    # Lists of users may have been replaced while editing.
+                    self._track(guild.id, raffle, data)
+                    if conditions:
+                        self.conditions_changed(guild, raffle)
+                    self.mark_dirty(guild, raffle)
+        if changed:
+            self.save_later(guild)
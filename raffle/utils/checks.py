@@ -1,11 +1,12 @@
-account_age_checker = lambda x: x < (now - discord_creation_date).days
-server_join_age_checker = lambda ctx, x: x < (now - ctx.guild.created_at).days
-
 import datetime
+import time
+from typing import Optional
 
-now = datetime.datetime.now()
 discord_creation_date = datetime.datetime(2015, 5, 13)
 
+# How long, in seconds, the clock may be behind. Day based conditions don't need more.
+CLOCK_RESOLUTION = 1.0
+
 VALID_USER_BADGES = [
     "bug_hunter",
     "bug_hunter_level_2",
@@ -19,3 +20,35 @@ VALID_USER_BADGES = [
     "system",
     "verified_bot_developer",
 ]
+
+
+class _Clock(object):
+    """The current UTC time, read again at most once per resolution,
+    so checking many members doesn't read the clock for each of them."""
+
+    __slots__ = ("_now", "_expires")
+
+    def __init__(self):
+        self._now: Optional[datetime.datetime] = None
+        self._expires = 0.0
+
+    def __call__(self) -> datetime.datetime:
+        monotonic = time.monotonic()
+        if self._now is None or monotonic >= self._expires:
+            # discord.py timestamps are naive UTC datetimes.
+            self._now = datetime.datetime.utcnow()
+            self._expires = monotonic + CLOCK_RESOLUTION
+        return self._now
+
+
+utcnow = _Clock()
+
+
+def account_age_checker(days: int) -> bool:
+    """Whether an account age requirement can be met by any account."""
+    return days < (utcnow() - discord_creation_date).days
+
+
+def server_join_age_checker(ctx, days: int) -> bool:
+    """Whether a server join age requirement can be met by any member."""
+    return days < (utcnow() - ctx.guild.created_at).days
@@ -1,128 +1,191 @@
-from redbot.core.commands import Context
+import asyncio
+import time
+from typing import Dict
+
+import discord
+from redbot.core import commands
 
 from ..log import log
 from ..mixins.abc import RaffleMixin
+from .entries import ENTRY_KEYS, deflate_raffle
 
+# Seconds between two sweeps of the cached raffles.
+SWEEP_INTERVAL = 60 * 60
+# How many guilds are cleaned up at once when the cog is loaded.
+RECONCILE_CONCURRENCY = 10
 
-class CleanupHelpers(RaffleMixin):
-    """Various utilities to prevent stale dictionary values"""
 
-    async def clean_raffles(self, ctx: Context) -> None:
-        async with self.config.guild(ctx.guild).raffles() as r:
+class CleanupHelpers(RaffleMixin):
+    """Various utilities to prevent stale dictionary values
 
-            updates = {}
+    Members leaving and roles being deleted are removed from the raffles
+    when the events are received, a periodic sweep catches anything missed."""
 
-            for k, v in list(r.items()):
+    @staticmethod
+    def _prune_raffle(guild: discord.Guild, raffle_data: dict) -> int:
+        """Remove the unknown users and roles of a raffle, whose owner is still here.
 
-                getter = v.get("owner")
-                if not ctx.guild.get_member(getter):
-                    del r[k]
-                    updates["owner"] = True
+        Returns how many were removed."""
+        pruned = 0
 
-                getter = v.get("entries")
-                for userid in getter:
-                    if not ctx.guild.get_member(userid):
+        for key in ENTRY_KEYS:
+            getter = raffle_data.get(key, None)
+            if getter:
+                for userid in list(getter):
+                    if not guild.get_member(userid):
                         getter.remove(userid)
-                        updates["entries"] = True
-
-                getter = v.get("prevented_users", None)
-                if getter:
-                    for userid in getter:
-                        if not ctx.guild.get_member(userid):
-                            getter.remove(userid)
-                            updates["prevented_users"] = True
-
-                getter = v.get("allowed_users", None)
-                if getter:
-                    for userid in getter:
-                        if not ctx.guild.get_member(userid):
-                            getter.remove(userid)
-                            updates["allowed_users"] = True
-
-                getter = v.get("roles_needed_to_enter", None)
-                if getter:
-                    for roleid in getter:
-                        if not ctx.guild.get_role(roleid):
-                            getter.remove(roleid)
-                            updates["roles_needed_to_enter"] = True
-
-        return any(updates.values())
+                        pruned += 1
+
+        getter = raffle_data.get("roles_needed_to_enter", None)
+        if getter:
+            for roleid in list(getter):
+                if not guild.get_role(roleid):
+                    getter.remove(roleid)
+                    pruned += 1
+
+        return pruned
+
+    async def clean_raffles(self, guild: discord.Guild) -> bool:
+        r = await self.cache.all(guild)
+
+        updated = False
+
+        for k, v in list(r.items()):
+            if not guild.get_member(v.get("owner")):
+                await self.cache.delete(guild, k)
+                updated = True
+                continue
+
+            if self._prune_raffle(guild, v):
+                updated = True
+                self.cache.conditions_changed(guild, k)
+                self.cache.mark_dirty(guild, k)
+
+        await self.cache.save(guild)
+
+        return updated
 
     @property
     def clean_guild_raffles(self):
         return self.clean_raffles
 
-    async def initialize(self):
-        all_guilds = await self.config.all_guilds()
-        changed_guilds = []
-        for g in all_guilds.keys():
-            gobj = self.bot.get_guild(g)
-            if not gobj:
-                continue
-            raffles = all_guilds[g]["raffles"]
-            for r in raffles.keys():
-                IDS = {}
-                if raffles[r] and "roles" in r:
-                    IDS[r] = "get_role"
-                elif raffles[r] and "users" in r:
-                    IDS[r] = "get_member"
-                else:
-                    continue
+    async def clean_singular_raffle(self, guild: discord.Guild, raffle: str) -> bool:
+        async with self.cache.edit(guild, raffle, conditions=True) as raffle_data:
+            if raffle_data is None:
+                # Ended since the command was invoked.
+                return False
 
-                if not gobj.get_member(raffles[r]["owner"]):
-                    del raffles[r]
-                    changed_guilds.append(g)
-
-                for k, v in IDS.items():
-                    for obj in raffles[k]:
-                        if not getattr(gobj, f"get_{v}")(obj):
-                            del raffles[k][obj]
-                            changed_guilds.append(g)
-            if changed_guilds:
-                await self.config.guild(gobj).raffles.set(raffles)
-        log.info("Raffles cleaned up across %s guilds" % len(all_guilds.keys()))
-        if changed_guilds:
-            log.info(
-                "%s guild raffle dictionaries were edited to remove deleted/unknown users and roles"
-                % len(changed_guilds)
-            )
+            if not guild.get_member(raffle_data.get("owner")):
+                await self.cache.delete(guild, raffle)
+                return True
 
-    async def clean_singular_raffle(self, ctx: Context, raffle: str) -> None:
-        async with self.config.guild(ctx.guild).raffles() as r:
+            return bool(self._prune_raffle(guild, raffle_data))
 
-            updates = {}
-            raffle_data = r[raffle]
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        guild = member.guild
+        for raffle in self.cache.pop_user(guild.id, member.id):
+            raffle_data = await self.cache.get(guild, raffle)
+            if raffle_data is None:
+                continue
 
-            getter = raffle_data.get("owner")
-            if not ctx.guild.get_member(getter):
-                del r[raffle][getter]
-                updates["owner"] = True
+            if raffle_data.get("owner") == member.id:
+                await self.cache.delete(guild, raffle)
+                continue
 
-            getter = raffle_data.get("entries")
-            for userid in getter:
-                if not ctx.guild.get_member(userid):
-                    getter.remove(userid)
-                    updates["entries"] = True
+            for key in ENTRY_KEYS:
+                getter = raffle_data.get(key, None)
+                if getter and member.id in getter:
+                    getter.discard(member.id)
+                    self.cache.mark_dirty(guild, raffle)
 
-            getter = raffle_data.get("prevented_users", None)
-            if getter:
-                for userid in getter:
-                    if not ctx.guild.get_member(userid):
-                        getter.remove(userid)
-                        updates["prevented_users"] = True
+        await self.cache.save(guild)
 
-            getter = raffle_data.get("allowed_users", None)
-            if getter:
-                for userid in getter:
-                    if not ctx.guild.get_member(userid):
-                        getter.remove(userid)
-                        updates["allowed_users"] = True
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        guild = role.guild
+        raffles = self.cache.cached(guild.id)
+        if not raffles:
+            return
 
+        for raffle, raffle_data in raffles.items():
             getter = raffle_data.get("roles_needed_to_enter", None)
-            if getter:
-                for roleid in getter:
-                    if not ctx.guild.get_role(roleid):
-                        getter.remove(roleid)
-                        updates["roles_needed_to_enter"] = True
+            if getter and role.id in getter:
+                getter.remove(role.id)
+                self.cache.conditions_changed(guild, raffle)
+                self.cache.mark_dirty(guild, raffle)
+
+        await self.cache.save(guild)
+
+    async def sweep_raffles(self):
+        await self.bot.wait_until_red_ready()
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            for guild_id in self.cache.guild_ids():
+                guild = self.bot.get_guild(guild_id)
+                if guild is None:
+                    continue
+                try:
+                    await self.clean_raffles(guild)
+                except Exception:
+                    log.exception("Failed to sweep the raffles of the guild %s" % guild_id)
+                self.cache.reindex(guild_id)
+                # Let other tasks run between guilds.
+                await asyncio.sleep(0)
+
+    async def _reconcile_guild(self, guild: discord.Guild, raffles: Dict[str, dict]) -> int:
+        """Prune the raffles of a guild read from Config, and load them into the cache.
+
+        The guild is written at once, only if something was pruned. Returns
+        how many raffles, users and roles were removed."""
+        # Raffles which are already cached may have changes which aren't in Config yet.
+        cached = self.cache.cached(guild.id)
+        if cached is not None:
+            raffles = cached
+
+        pruned = 0
+        for raffle, raffle_data in list(raffles.items()):
+            if not guild.get_member(raffle_data.get("owner", None)):
+                del raffles[raffle]
+                pruned += 1
+                continue
+            pruned += self._prune_raffle(guild, raffle_data)
+
+        if pruned:
+            await self.config.guild(guild).raffles.set(
+                {k: deflate_raffle(v) for k, v in raffles.items()}
+            )
+        if pruned or cached is None:
+            self.cache.load(guild.id, raffles)
+        return pruned
 
-        return any(updates.values())
+    async def initialize(self):
+        """Reconcile the stored raffles with the members and roles of their guilds.
+
+        Guilds are processed concurrently, up to ``RECONCILE_CONCURRENCY`` at once."""
+        start = time.perf_counter()
+        all_guilds = await self.config.all_guilds()
+        semaphore = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+
+        async def reconcile(guild_id: int, guild_data: dict) -> int:
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                return 0
+            async with semaphore:
+                try:
+                    return await self._reconcile_guild(guild, guild_data["raffles"])
+                except Exception:
+                    log.exception("Failed to clean up the raffles of the guild %s" % guild_id)
+                    return 0
+
+        results = await asyncio.gather(*(reconcile(k, v) for k, v in all_guilds.items()))
+        log.info(
+            "Raffles cleaned up across %s guilds in %.2fs, %s raffles, users and roles "
+            "were removed from %s guilds"
+            % (
+                len(all_guilds),
+                time.perf_counter() - start,
+                sum(results),
+                len([r for r in results if r]),
+            )
+        )
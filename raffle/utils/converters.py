@@ -12,13 +12,13 @@ class RaffleFactoryConverter(Converter):
     of the guild, or if the raffle doesn't exist."""
 
     async def convert(self, ctx: Context, argument: str):
-        async with ctx.cog.config.guild(ctx.guild).raffles() as raffles:
-            if not argument in raffles.keys():
-                raise BadArgument(
-                    "There is not an ongoing raffle with the name `{}`.".format(argument)
-                )
-            if ctx.author.id not in (raffles[argument]["owner"], ctx.guild.owner_id):
-                raise BadArgument("You are not the owner of this raffle.")
+        raffles = await ctx.cog.cache.all(ctx.guild)
+        if not argument in raffles.keys():
+            raise BadArgument(
+                "There is not an ongoing raffle with the name `{}`.".format(argument)
+            )
+        if ctx.author.id not in (raffles[argument]["owner"], ctx.guild.owner_id):
+            raise BadArgument("You are not the owner of this raffle.")
         return argument
 
 
@@ -27,11 +27,11 @@ class RaffleExists(Converter):
     if the raffle doesn't exist."""
 
     async def convert(self, ctx: Context, argument: str):
-        async with ctx.cog.config.guild(ctx.guild).raffles() as raffles:
-            if not argument in raffles.keys():
-                raise BadArgument(
-                    "There is not an ongoing raffle with the name `{}`.".format(argument)
-                )
+        raffles = await ctx.cog.cache.all(ctx.guild)
+        if not argument in raffles.keys():
+            raise BadArgument(
+                "There is not an ongoing raffle with the name `{}`.".format(argument)
+            )
         return argument
 
 
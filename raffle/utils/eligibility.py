@@ -0,0 +1,157 @@
+import datetime
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import discord
+from redbot.core.i18n import Translator
+
+from .checks import utcnow
+from .helpers import format_underscored_text
+
+_ = Translator("Raffle", __file__)
+
+__all__ = ("ConditionFailure", "RaffleConditions")
+
+
+class ConditionFailure(NamedTuple):
+    """A raffle condition which a member does not meet."""
+
+    condition: str
+    message: str
+
+
+class RaffleConditions(object):
+    """The join conditions of a raffle, compiled from its data.
+
+    Required roles are held as a set of IDs and required badges as a
+    bitmask of public user flags, so a member is checked in one pass.
+    Age conditions are compared with the member's own timestamps."""
+
+    __slots__ = (
+        "owner",
+        "prevented_users",
+        "allowed_users",
+        "roles",
+        "badges",
+        "account_age",
+        "server_join_age",
+    )
+
+    def __init__(self, raffle_data: dict):
+        self.owner = raffle_data.get("owner", None)
+        # The entry sets of the raffle, changes to them are seen here, even while empty.
+        self.prevented_users = raffle_data.get("prevented_users", None)
+        if self.prevented_users is None:
+            self.prevented_users = ()
+        self.allowed_users = raffle_data.get("allowed_users", None)
+        if self.allowed_users is None:
+            self.allowed_users = ()
+        self.roles = frozenset(raffle_data.get("roles_needed_to_enter", None) or ())
+        self.badges = 0
+        for badge in raffle_data.get("badges_needed_to_enter", None) or ():
+            self.badges |= discord.UserFlags[badge].value
+        self.account_age = raffle_data.get("account_age", None)
+        self.server_join_age = raffle_data.get("server_join_age", None)
+
+    def _cutoffs(self) -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+        """The latest account creation and server join dates that meet the age conditions."""
+        now = utcnow()
+        created_before = joined_before = None
+        if self.account_age:
+            created_before = now - datetime.timedelta(days=self.account_age)
+        if self.server_join_age:
+            joined_before = now - datetime.timedelta(days=self.server_join_age)
+        return created_before, joined_before
+
+    def check(self, member: discord.Member) -> List[ConditionFailure]:
+        """Get the conditions which a member does not meet, empty if they can join."""
+        failures = []
+        created_before, joined_before = self._cutoffs()
+
+        if member.id in self.prevented_users:
+            failures.append(
+                ConditionFailure(
+                    "prevented_users", _("You are not allowed to join this particular raffle.")
+                )
+            )
+
+        if self.allowed_users and member.id not in self.allowed_users:
+            failures.append(
+                ConditionFailure(
+                    "allowed_users", _("You are not allowed to join this particular raffle.")
+                )
+            )
+
+        if member.id == self.owner:
+            failures.append(ConditionFailure("owner", _("You cannot join your own raffle.")))
+
+        if self.roles:
+            missing = self.roles.difference(r.id for r in member.roles)
+            for role_id in missing:
+                failures.append(
+                    ConditionFailure(
+                        "roles_needed_to_enter",
+                        _("You are missing a required role: <@&{}>".format(role_id)),
+                    )
+                )
+
+        if created_before is not None and member.created_at > created_before:
+            failures.append(
+                ConditionFailure(
+                    "account_age",
+                    _("Your account must be at least {} days old to join.").format(
+                        self.account_age
+                    ),
+                )
+            )
+
+        # Discord doesn't always send the join date, consider they just joined.
+        if joined_before is not None and (
+            member.joined_at is None or member.joined_at > joined_before
+        ):
+            failures.append(
+                ConditionFailure(
+                    "server_join_age",
+                    _("You must have been in this guild for at least {} days to join.").format(
+                        self.server_join_age
+                    ),
+                )
+            )
+
+        missing = self.badges & ~member.public_flags.value
+        if missing:
+            for flag in discord.UserFlags:
+                if missing & flag.value:
+                    failures.append(
+                        ConditionFailure(
+                            "badges_needed_to_enter",
+                            _('You must have the "{}" Discord badge to join.').format(
+                                format_underscored_text(flag.name)
+                            ),
+                        )
+                    )
+
+        return failures
+
+    def count_eligible(self, members: Iterable[discord.Member]) -> int:
+        """Count the members who meet the conditions of the raffle, bots excluded.
+
+        The clock is read once, rather than for each member."""
+        created_before, joined_before = self._cutoffs()
+        count = 0
+        for member in members:
+            if member.bot or member.id == self.owner or member.id in self.prevented_users:
+                continue
+            if self.allowed_users and member.id not in self.allowed_users:
+                continue
+            if created_before is not None and member.created_at > created_before:
+                continue
+            if joined_before is not None and (
+                member.joined_at is None or member.joined_at > joined_before
+            ):
+                continue
+            if self.roles and not self.roles.issubset(r.id for r in member.roles):
+                continue
+            if self.badges & ~member.public_flags.value:
+                continue
+            count += 1
+        return count
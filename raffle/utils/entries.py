@@ -0,0 +1,93 @@
+import random
+from collections.abc import MutableSet
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+__all__ = ("EntrySet", "ENTRY_KEYS", "deflate_raffle")
+
+
+# The raffle keys holding user IDs, stored as lists in Config.
+ENTRY_KEYS = ("entries", "prevented_users", "allowed_users")
+
+
+class EntrySet(MutableSet):
+    """An insertion ordered set of user IDs.
+
+    Membership, insertion, removal and random choice take constant time,
+    whereas a list has to be scanned. Users are iterated in the order they
+    were added.
+
+    ``watcher`` is called with every user ID the set receives."""
+
+    __slots__ = ("_ids", "_slots", "watcher")
+
+    def __init__(self, ids: Iterable[int] = (), watcher: Optional[Callable[[int], None]] = None):
+        # user ID -> position in _slots. The dict keeps the insertion order, whereas
+        # _slots is reordered by removals, it is only used to choose users at random.
+        self._ids: Dict[int, int] = {}
+        self._slots: List[int] = []
+        for user_id in ids:
+            if user_id not in self._ids:
+                self._ids[user_id] = len(self._slots)
+                self._slots.append(user_id)
+        self.watcher = watcher
+        if watcher is not None:
+            for user_id in self._ids:
+                watcher(user_id)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._ids
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, tuple)):
+            # Entries used to be lists, and still are once read from YAML.
+            other = set(other)
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        # Displayed like the list stored in Config.
+        return repr(self.to_list())
+
+    def add(self, user_id: int) -> None:
+        if user_id not in self._ids:
+            self._ids[user_id] = len(self._slots)
+            self._slots.append(user_id)
+        if self.watcher is not None:
+            self.watcher(user_id)
+
+    # Entries used to be lists.
+    append = add
+
+    def discard(self, user_id: int) -> None:
+        index = self._ids.pop(user_id, None)
+        if index is None:
+            return
+        # Move the last slot into the freed one.
+        last = self._slots.pop()
+        if index < len(self._slots):
+            self._slots[index] = last
+            self._ids[last] = index
+
+    def remove(self, user_id: int) -> None:
+        if user_id not in self._ids:
+            raise ValueError(f"{user_id} is not in the entries")
+        self.discard(user_id)
+
+    def choice(self, rng: random.Random = random) -> int:
+        """Pick a user uniformly at random."""
+        if not self._slots:
+            raise IndexError("Cannot choose from empty entries")
+        return self._slots[rng.randrange(len(self._slots))]
+
+    def to_list(self) -> List[int]:
+        return list(self._ids)
+
+
+def deflate_raffle(data: dict) -> dict:
+    """Get a copy of a raffle with its entry sets turned back into lists, to store in Config."""
+    return {k: v.to_list() if isinstance(v, EntrySet) else v for k, v in data.items()}
@@ -115,6 +115,19 @@ class ComponentDescriptions(enum.Enum):
         "The amount of seconds that the bot types for before the winner is shown. "
         "Must be a number between 1 and 10."
     )
+    ROLE_WEIGHTS = _(
+        "A mapping of Discord role IDs to weights. Members with these roles get "
+        "more chances to be drawn, the highest weight of their roles is used. "
+        "Other members have a weight of 1."
+    )
+    END_AT = _(
+        "The date and time, in UTC, at which a winner is drawn and the raffle ends. "
+        'It must be in quotation marks, such as "2021-12-24 18:00".'
+    )
+    SECURE_DRAW = _(
+        "Whether winners are drawn using the operating system's secure random "
+        "generator, rather than Python's default one."
+    )
 
 
 class ComponentExamples(enum.Enum):
@@ -133,6 +146,9 @@ class ComponentExamples(enum.Enum):
     MAXIMUM_ENTRIES = 10
     ON_END_ACTION = "remove_and_prevent_winner"
     SUSPENSE_TIMER = 3
+    ROLE_WEIGHTS = {749272596050214973: 3, 778743725790068766: 2}
+    SECURE_DRAW = True
+    END_AT = "2021-12-24 18:00"
 
 
 SUPPORTED_TYPES = "supported_types"
@@ -185,6 +201,15 @@ class RaffleComponents(enum.Enum):
         EXAMPLE: ComponentExamples.DESCRIPTION.value,
     }
 
+    end_at: ComponentsDictionary = {
+        SUPPORTED_TYPES: [str],
+        POTENTIAL_EXCEPTIONS: [RaffleSyntaxError, InvalidArgument],
+        VARIABLES: None,
+        REQUIRED_CONDITION: False,
+        DESCRIPTION: ComponentDescriptions.END_AT.value,
+        EXAMPLE: ComponentExamples.END_AT.value,
+    }
+
     end_message: ComponentsDictionary = {
         SUPPORTED_TYPES: [str],
         POTENTIAL_EXCEPTIONS: [RaffleSyntaxError, InvalidArgument],
@@ -257,6 +282,24 @@ class RaffleComponents(enum.Enum):
         EXAMPLE: ComponentExamples.SUSPENSE_TIMER.value,
     }
 
+    role_weights: ComponentsDictionary = {
+        SUPPORTED_TYPES: [dict],
+        POTENTIAL_EXCEPTIONS: [RaffleSyntaxError, UnknownEntityError, InvalidArgument],
+        VARIABLES: None,
+        REQUIRED_CONDITION: False,
+        DESCRIPTION: ComponentDescriptions.ROLE_WEIGHTS.value,
+        EXAMPLE: ComponentExamples.ROLE_WEIGHTS.value,
+    }
+
+    secure_draw: ComponentsDictionary = {
+        SUPPORTED_TYPES: [bool],
+        POTENTIAL_EXCEPTIONS: [RaffleSyntaxError],
+        VARIABLES: None,
+        REQUIRED_CONDITION: False,
+        DESCRIPTION: ComponentDescriptions.SECURE_DRAW.value,
+        EXAMPLE: ComponentExamples.SECURE_DRAW.value,
+    }
+
     roles_needed_to_enter: ComponentsDictionary = {
         SUPPORTED_TYPES: [list],
         POTENTIAL_EXCEPTIONS: [RaffleSyntaxError, UnknownEntityError],
@@ -1,4 +1,5 @@
 import asyncio
+import datetime
 from typing import List, Literal, Union
 
 import discord
@@ -10,7 +11,6 @@ from redbot.core.utils.chat_formatting import box
 from redbot.core.utils.menus import DEFAULT_CONTROLS, close_menu, menu
 from yaml.parser import MarkedYAMLError
 
-from .checks import now
 from .enums import RaffleEndMessageComponents, RaffleJoinMessageComponents
 from .exceptions import InvalidArgument, RaffleError
 from .formatting import cross, curl, formatenum
@@ -21,6 +21,9 @@ _ = Translator("Raffle", __file__)
 
 listumerate = lambda *args: list(enumerate(*args))
 
+# Raffle keys set by the cog, rather than conditions set by the owner.
+INTERNAL_KEYS = ("owner", "entries", "created_at", "channel", "post")
+
 
 def format_traceback(exc) -> str:
     boxit = lambda x, y: box(f"{x}: {y}", lang="yaml")
@@ -45,7 +48,7 @@ def validator(data) -> Union[bool, dict]:
 
 
 def getstrftime(perc: str) -> Union[str, int]:
-    return now.strftime(f"%{perc}")
+    return datetime.datetime.now().strftime(f"%{perc}")
 
 
 def number_suffix(number: int) -> str:
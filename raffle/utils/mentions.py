@@ -0,0 +1,55 @@
+import asyncio
+import collections
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+import discord
+
+__all__ = ("mention_pages", "send_paced")
+
+# Discord lets a bot send 5 messages per 5 seconds in a channel.
+BURST_SIZE = 5
+BURST_PERIOD = 5.0
+
+
+def mention_pages(
+    user_ids: Iterable[int],
+    resolve: Callable[[int], Optional[discord.abc.User]],
+    page_length: int = 2000,
+) -> Iterator[str]:
+    """Yield pages of mentions, resolving the users as the pages are built.
+
+    Users which ``resolve`` returns None for are skipped."""
+    page = []
+    length = 0
+    for user_id in user_ids:
+        user = resolve(user_id)
+        if user is None:
+            continue
+        mention = user.mention
+        # Mentions are separated by ", ".
+        if page and length + len(mention) + 2 > page_length:
+            yield ", ".join(page)
+            page, length = [], 0
+        length += len(mention) + (2 if page else 0)
+        page.append(mention)
+    if page:
+        yield ", ".join(page)
+
+
+async def send_paced(destination: discord.abc.Messageable, pages: Iterable[str]) -> int:
+    """Send pages to a channel without going over its rate limit, returns how many were sent.
+
+    Rather than sending until discord.py gets rate limited, each burst of
+    messages waits until the previous one is out of the rate limit window."""
+    sent = collections.deque(maxlen=BURST_SIZE)
+    count = 0
+    for page in pages:
+        if len(sent) == BURST_SIZE:
+            delay = BURST_PERIOD - (time.monotonic() - sent[0])
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await destination.send(page)
+        sent.append(time.monotonic())
+        count += 1
+    return count
@@ -0,0 +1,241 @@
+import asyncio
+import contextlib
+import math
+import re
+from typing import List, Optional, Sequence, Union
+
+import discord
+from redbot.core.commands import Context
+from redbot.core.i18n import Translator
+from redbot.core.utils.chat_formatting import box
+from redbot.core.utils.menus import start_adding_reactions
+from redbot.core.utils.predicates import MessagePredicate, ReactionPredicate
+
+from .formatting import LEFT_ARROW, RIGHT_ARROW
+
+_ = Translator("Raffle", __file__)
+
+__all__ = (
+    "EntryPageSource",
+    "ListPageSource",
+    "RafflePageSource",
+    "TextPageSource",
+    "lazy_menu",
+)
+
+FIRST_PAGE = "\N{BLACK LEFT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}\N{VARIATION SELECTOR-16}"
+LAST_PAGE = "\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}\N{VARIATION SELECTOR-16}"
+JUMP = "\N{INPUT SYMBOL FOR NUMBERS}"
+SEARCH = "\N{LEFT-POINTING MAGNIFYING GLASS}"
+CLOSE = "\N{CROSS MARK}"
+
+CONTROLS = (FIRST_PAGE, LEFT_ARROW, CLOSE, RIGHT_ARROW, LAST_PAGE, JUMP, SEARCH)
+
+Page = Union[str, discord.Embed]
+
+
+class ListPageSource(object):
+    """The pages of a menu over a sequence, only the page being viewed is rendered.
+
+    Subclasses implement ``format_page``, and ``match`` to support searching."""
+
+    def __init__(self, items: Sequence, per_page: int):
+        self.items = items
+        self.per_page = per_page
+
+    def __len__(self) -> int:
+        return max(1, math.ceil(len(self.items) / self.per_page))
+
+    def page_items(self, page: int) -> Sequence:
+        start = page * self.per_page
+        return self.items[start : start + self.per_page]
+
+    def format_page(self, page: int) -> Page:
+        raise NotImplementedError
+
+    def match(self, item, query: str) -> bool:
+        return False
+
+    def search(self, query: str) -> Optional[int]:
+        """Get the first page with an item matching the query, if any."""
+        for index, item in enumerate(self.items):
+            if self.match(item, query):
+                return index // self.per_page
+        return None
+
+
+class EntryPageSource(ListPageSource):
+    """The entries of a raffle, ten per page, searchable by member."""
+
+    def __init__(
+        self,
+        guild: discord.Guild,
+        raffle: str,
+        entries: List[int],
+        colour: discord.Colour,
+        icon_url: str,
+    ):
+        super().__init__(entries, 10)
+        self.guild = guild
+        self.raffle = raffle
+        self.colour = colour
+        self.icon_url = icon_url
+
+    def format_page(self, page: int) -> Page:
+        message = ""
+        for c, user_id in enumerate(self.page_items(page), page * self.per_page + 1):
+            message += f"#{c} {self.guild.get_member(user_id) or 'Unknown User'}\n"
+        if len(self.items) == 1:
+            entry_grammar = _("entry")
+        else:
+            entry_grammar = _("entries")
+        embed = discord.Embed(description=box(message, lang="md"), color=self.colour)
+        embed.set_author(
+            name=f"{self.raffle} | {len(self.items)} {entry_grammar}", icon_url=self.icon_url
+        )
+        embed.set_footer(
+            text=_("Sorted in order of join time. Page {}/{}").format(page + 1, len(self))
+        )
+        return embed
+
+    def search(self, query: str) -> Optional[int]:
+        """Get the page of a member, from their ID, mention or name."""
+        found = re.fullmatch(r"<@!?(\d+)>|(\d+)", query.strip())
+        if found:
+            user_id = int(found.group(1) or found.group(2))
+        else:
+            member = self.guild.get_member_named(query.strip())
+            if member is None:
+                return None
+            user_id = member.id
+        try:
+            return self.items.index(user_id) // self.per_page
+        except ValueError:
+            return None
+
+
+class RafflePageSource(ListPageSource):
+    """The raffles of a guild, searchable by name."""
+
+    def __init__(self, lines: List[str], colour: discord.Colour):
+        super().__init__(lines, 10)
+        self.colour = colour
+
+    def format_page(self, page: int) -> Page:
+        embed = discord.Embed(
+            title=_("Current raffles"),
+            description="\n".join(self.page_items(page)),
+            color=self.colour,
+        )
+        embed.set_footer(text="Page {}/{}".format(page + 1, len(self)))
+        return embed
+
+    def match(self, line: str, query: str) -> bool:
+        return query.lower() in line.lower()
+
+
+class TextPageSource(ListPageSource):
+    """Lines of text in code blocks, searchable by content."""
+
+    def __init__(self, lines: List[str], lang: str, per_page: int = 20):
+        super().__init__(lines, per_page)
+        self.lang = lang
+
+    def format_page(self, page: int) -> Page:
+        text = "\n".join(self.page_items(page))
+        if len(self) > 1:
+            text += "\n\n# Page {}/{}".format(page + 1, len(self))
+        return box(text[:1985], lang=self.lang)
+
+    def match(self, line: str, query: str) -> bool:
+        return query.lower() in line.lower()
+
+
+async def _show(ctx: Context, message: Optional[discord.Message], page: Page):
+    kwargs = {"embed": page} if isinstance(page, discord.Embed) else {"content": page}
+    if message is None:
+        return await ctx.send(**kwargs)
+    await message.edit(**kwargs)
+    return message
+
+
+async def _ask(ctx: Context, question: str, timeout: float) -> Optional[str]:
+    """Ask the author a question, the messages are deleted once they replied."""
+    prompt = await ctx.send(question)
+    try:
+        reply = await ctx.bot.wait_for(
+            "message", check=MessagePredicate.same_context(ctx), timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        reply = None
+    with contextlib.suppress(discord.HTTPException):
+        if reply is not None and ctx.channel.permissions_for(ctx.me).manage_messages:
+            await ctx.channel.delete_messages([prompt, reply])
+        else:
+            await prompt.delete()
+    return reply.content if reply is not None else None
+
+
+async def lazy_menu(ctx: Context, source: ListPageSource, timeout: float = 60.0):
+    """A reaction menu which renders the pages of a source as they are viewed.
+
+    Unlike ``redbot.core.utils.menus.menu``, the pages aren't built up front,
+    and the author can jump to a page or search for an item."""
+    page = 0
+    message = await _show(ctx, None, source.format_page(page))
+    controls = CONTROLS if len(source) > 1 else (CLOSE,)
+    start_adding_reactions(message, controls)
+
+    while True:
+        try:
+            reaction, _user = await ctx.bot.wait_for(
+                "reaction_add",
+                check=ReactionPredicate.with_emojis(controls, message, ctx.author),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            with contextlib.suppress(discord.HTTPException):
+                if ctx.channel.permissions_for(ctx.me).manage_messages:
+                    await message.clear_reactions()
+                else:
+                    for emoji in controls:
+                        await message.remove_reaction(emoji, ctx.me)
+            return
+
+        emoji = reaction.emoji
+        if ctx.channel.permissions_for(ctx.me).manage_messages:
+            with contextlib.suppress(discord.HTTPException):
+                await message.remove_reaction(emoji, ctx.author)
+
+        pages = len(source)
+        if emoji == CLOSE:
+            with contextlib.suppress(discord.HTTPException):
+                await message.delete()
+            return
+        elif emoji == FIRST_PAGE:
+            page = 0
+        elif emoji == LEFT_ARROW:
+            page = (page - 1) % pages
+        elif emoji == RIGHT_ARROW:
+            page = (page + 1) % pages
+        elif emoji == LAST_PAGE:
+            page = pages - 1
+        elif emoji == JUMP:
+            answer = await _ask(ctx, _("Which page? (1-{})").format(pages), timeout)
+            if answer is None or not answer.strip().isdigit():
+                continue
+            page = min(max(int(answer), 1), pages) - 1
+        elif emoji == SEARCH:
+            answer = await _ask(ctx, _("What are you looking for?"), timeout)
+            if answer is None:
+                continue
+            found = source.search(answer)
+            if found is None:
+                await ctx.send(_("Nothing was found."), delete_after=5)
+                continue
+            page = found
+
+        try:
+            message = await _show(ctx, message, source.format_page(page))
+        except discord.NotFound:
+            return
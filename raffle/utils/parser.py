@@ -2,7 +2,7 @@ import discord
 from redbot.core.commands import Context
 
 from ..log import log
-from .checks import VALID_USER_BADGES, account_age_checker, now, server_join_age_checker
+from .checks import VALID_USER_BADGES, account_age_checker, server_join_age_checker, utcnow
 from .enums import RaffleComponents
 from .exceptions import (
     InvalidArgument,
@@ -14,6 +14,7 @@ from .exceptions import (
 )
 from .helpers import raffle_safe_member_scanner
 from .safety import RaffleSafeMember
+from .scheduler import parse_end_at
 
 __all__ = ("RaffleManager",)
 
@@ -38,6 +39,9 @@ class RaffleManager(object):
         self.end_message = data.get("end_message", None)
         self.on_end_action = data.get("on_end_action", None)
         self.suspense_timer = data.get("suspense_timer", None)
+        self.role_weights = data.get("role_weights", None)
+        self.secure_draw = data.get("secure_draw", None)
+        self.end_at = data.get("end_at", None)
 
         # dep warnings come first
         if "join_age" in self.data.keys():
@@ -63,12 +67,22 @@ class RaffleManager(object):
 
     @classmethod
     def parse_serverjoinage(cls, ctx: Context, new_join_age: int):
-        guildage = (now - ctx.guild.created_at).days
+        guildage = (utcnow() - ctx.guild.created_at).days
         if not server_join_age_checker(ctx, new_join_age):
             raise InvalidArgument(
                 "Days must be less than this guild's creation date ({} days)".format(guildage)
             )
 
+    @classmethod
+    def parse_entries(cls, entries):
+        if not isinstance(entries, list):
+            raise RaffleSyntaxError("(entries) Entries must be a list of Discord user IDs")
+        for u in entries:
+            if not isinstance(u, int) or isinstance(u, bool):
+                raise RaffleSyntaxError(
+                    f'(entries) "{u}" must be a number (user ID) without quotation marks'
+                )
+
     def parser(self, ctx: Context):
         if self.account_age:
             if not isinstance(self.account_age, int):
@@ -213,3 +227,36 @@ class RaffleManager(object):
                 *range(0, 11)
             ]:
                 raise InvalidArgument("(suspense_timer) must be a number between 0 and 10")
+
+        if self.role_weights:
+            if not isinstance(self.role_weights, dict):
+                raise RaffleSyntaxError(
+                    "(role_weights) Role weights must be Discord role IDs mapped to numbers"
+                )
+            for r, w in self.role_weights.items():
+                if not isinstance(r, int):
+                    raise RaffleSyntaxError(
+                        f'(role_weights) "{r}" must be a number (role ID) without quotation marks'
+                    )
+                if not ctx.guild.get_role(r):
+                    raise UnknownEntityError(r, "role")
+                if not isinstance(w, int) or w < 1:
+                    raise InvalidArgument(f"(role_weights) The weight of {r} must be 1 or more")
+
+        if self.secure_draw is not None:
+            if not isinstance(self.secure_draw, bool):
+                raise RaffleSyntaxError("(secure_draw) must be true or false")
+
+        if self.end_at:
+            if not isinstance(self.end_at, str):
+                raise RaffleSyntaxError("(end_at) End time must be in quotation marks")
+            try:
+                end_at = parse_end_at(self.end_at)
+            except ValueError:
+                raise InvalidArgument(
+                    '(end_at) "{}" is not a date and time, such as "2021-12-24 18:00"'.format(
+                        self.end_at
+                    )
+                )
+            if end_at <= utcnow():
+                raise InvalidArgument("(end_at) End time must be in the future")
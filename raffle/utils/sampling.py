@@ -0,0 +1,102 @@
+import random
+from typing import Dict, List, Optional, Sequence
+
+import discord
+
+__all__ = ("AliasTable", "role_weights", "sample_winners")
+
+
+class AliasTable(object):
+    """Walker's alias method, pick an index with a probability
+    proportional to its weight in constant time.
+
+    Building the table takes linear time."""
+
+    def __init__(self, weights: Sequence[float]):
+        count = len(weights)
+        total = sum(weights)
+        if not count or total <= 0:
+            raise ValueError("At least one weight must be positive")
+
+        self.probabilities = [0.0] * count
+        self.aliases = [0] * count
+
+        scaled = [w * count / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+        # Whatever is left is only off by rounding errors.
+        for index in small + large:
+            self.probabilities[index] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.probabilities)
+
+    def pick(self, rng: random.Random = random) -> int:
+        index = rng.randrange(len(self.probabilities))
+        if rng.random() < self.probabilities[index]:
+            return index
+        return self.aliases[index]
+
+
+def sample_winners(
+    population: Sequence[int],
+    count: int,
+    weights: Optional[Sequence[float]] = None,
+    rng: random.Random = random,
+) -> List[int]:
+    """Pick ``count`` different winners from ``population``.
+
+    Without weights, every entry has the same chance to win. With weights,
+    the alias table is sampled and winners drawn twice are rejected. When
+    rejections pile up, the table is rebuilt from the remaining entries, so
+    drawing most of a heavily weighted population stays fast."""
+    if count > len(population):
+        raise ValueError("Cannot draw more winners than there are entries")
+
+    if weights is None:
+        return rng.sample(population, count)
+
+    indexes = [i for i, w in enumerate(weights) if w > 0]
+    if count > len(indexes):
+        raise ValueError("Cannot draw more winners than there are weighted entries")
+
+    winners = []
+    drawn = set()
+    table = AliasTable([weights[i] for i in indexes])
+    rejected = 0
+    while len(winners) < count:
+        index = indexes[table.pick(rng)]
+        if index in drawn:
+            rejected += 1
+            if rejected > len(table):
+                indexes = [i for i in indexes if i not in drawn]
+                table = AliasTable([weights[i] for i in indexes])
+                rejected = 0
+            continue
+        drawn.add(index)
+        winners.append(population[index])
+    return winners
+
+
+def role_weights(
+    guild: discord.Guild,
+    population: Sequence[int],
+    weights: Optional[Dict[int, int]],
+) -> Optional[List[int]]:
+    """Weigh each entry with the highest weight of their roles, 1 by default."""
+    if not weights:
+        return None
+    result = []
+    for user_id in population:
+        member = guild.get_member(user_id)
+        roles = member.roles if member else ()
+        result.append(max((weights.get(r.id, 1) for r in roles), default=1))
+    return result
@@ -0,0 +1,81 @@
+import asyncio
+import contextlib
+import datetime
+import heapq
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from ..log import log
+
+__all__ = ("RaffleScheduler", "parse_end_at")
+
+# The longest the scheduler sleeps at once, so it keeps up with changes of the system clock.
+MAX_SLEEP = 60 * 60
+
+
+def parse_end_at(value: str) -> datetime.datetime:
+    """Parse the ``end_at`` condition of a raffle into a naive UTC datetime.
+
+    Raises ValueError if it isn't an ISO 8601 date and time."""
+    end_at = datetime.datetime.fromisoformat(value)
+    if end_at.tzinfo is not None:
+        end_at = end_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return end_at
+
+
+class RaffleScheduler(object):
+    """Ends raffles when their ``end_at`` time comes, from a single task.
+
+    Raffles are kept in a heap ordered by end time. Scheduling a raffle
+    again, or editing its end time, leaves the old item in the heap, the
+    callback must check that the raffle still ends at the given time."""
+
+    def __init__(self, callback: Callable[[int, str, str], Awaitable[None]]):
+        self.callback = callback
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, guild_id: int, raffle: str, raffle_data: dict) -> None:
+        """Schedule the end of a raffle, if it has an ``end_at`` condition."""
+        end_at = raffle_data.get("end_at", None)
+        if not end_at:
+            return
+        try:
+            when = parse_end_at(end_at).replace(tzinfo=datetime.timezone.utc).timestamp()
+        except ValueError:
+            log.warning("The %s raffle in guild %s has an invalid end time" % (raffle, guild_id))
+            return
+        item = (when, guild_id, raffle, end_at)
+        heapq.heappush(self._heap, item)
+        if self._heap[0] is item:
+            # It ends before whatever the task is waiting for.
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+                continue
+
+            _, guild_id, raffle, end_at = heapq.heappop(self._heap)
+            try:
+                await self.callback(guild_id, raffle, end_at)
+            except Exception:
+                log.exception("Failed to end the %s raffle in guild %s" % (raffle, guild_id))
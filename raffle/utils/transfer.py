@@ -0,0 +1,144 @@
+import json
+from typing import IO, Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+import discord
+from redbot.core.bot import Red
+
+from .entries import ENTRY_KEYS, EntrySet
+from .exceptions import RaffleError, RaffleSyntaxError
+from .helpers import INTERNAL_KEYS
+from .parser import RaffleManager
+
+__all__ = ("EXPORT_VERSION", "GuildContext", "write_raffle", "read_raffles", "write_header")
+
+
+EXPORT_VERSION = 1
+# How many user IDs are written per line of entries.
+ENTRY_CHUNK_SIZE = 1000
+
+
+class GuildContext(NamedTuple):
+    """The parts of a command context that ``RaffleManager.parser`` uses,
+    to validate raffles for another guild than the one of the command."""
+
+    bot: Red
+    guild: discord.Guild
+
+
+def _dump(fp: IO[str], record: dict) -> None:
+    fp.write(json.dumps(record, separators=(",", ":")))
+    fp.write("\n")
+
+
+def write_header(fp: IO[str]) -> None:
+    _dump(fp, {"type": "header", "cog": "Raffle", "version": EXPORT_VERSION})
+
+
+def write_raffle(fp: IO[str], guild_id: int, name: str, raffle_data: dict) -> None:
+    """Write a raffle as newline delimited JSON.
+
+    Its settings are written on one line, then its entries in chunks,
+    so they are never held twice in memory."""
+    settings = {k: v for k, v in raffle_data.items() if k != "entries"}
+    for key in ENTRY_KEYS:
+        if isinstance(settings.get(key, None), EntrySet):
+            settings[key] = settings[key].to_list()
+    _dump(fp, {"type": "raffle", "guild": guild_id, "name": name, "data": settings})
+
+    chunk = []
+    for user_id in raffle_data.get("entries", ()):
+        chunk.append(user_id)
+        if len(chunk) == ENTRY_CHUNK_SIZE:
+            _dump(fp, {"type": "entries", "guild": guild_id, "name": name, "entries": chunk})
+            chunk = []
+    if chunk:
+        _dump(fp, {"type": "entries", "guild": guild_id, "name": name, "entries": chunk})
+
+
+def _validate(ctx, name: str, settings: dict) -> None:
+    owner = settings.get("owner", None)
+    if not isinstance(owner, int):
+        raise RaffleSyntaxError("(owner) The owner must be a Discord user ID")
+    weights = settings.get("role_weights", None)
+    if isinstance(weights, dict):
+        # JSON turns the role IDs into strings.
+        try:
+            settings["role_weights"] = {int(k): v for k, v in weights.items()}
+        except ValueError:
+            raise RaffleSyntaxError("(role_weights) Role weights must be keyed by role IDs")
+    conditions = {k: v for k, v in settings.items() if k not in INTERNAL_KEYS}
+    conditions["name"] = name
+    RaffleManager(conditions).parser(ctx)
+
+
+def read_raffles(
+    fp: IO[str], context_for: Callable[[int], Optional[GuildContext]]
+) -> Iterator[Tuple[int, str, Optional[dict], Optional[RaffleError]]]:
+    """Read the raffles written by ``write_raffle``, one line at a time.
+
+    Yields ``(guild id, name, raffle data, None)`` for each valid raffle,
+    or ``(guild id, name, None, error)`` when it can't be imported. Raffles
+    of guilds for which ``context_for`` returns None are skipped. Entries
+    are validated chunk by chunk, as they are read."""
+    current: Optional[Tuple[int, str]] = None
+    raffle_data: Optional[dict] = None
+    error: Optional[RaffleError] = None
+
+    def finish():
+        if current is not None:
+            return (*current, None if error else raffle_data, error)
+
+    for number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            kind = record["type"]
+        except (ValueError, TypeError, KeyError):
+            raise RaffleSyntaxError(f"Line {number} is not a raffle export record")
+
+        if kind == "header":
+            if record.get("cog") != "Raffle" or record.get("version") != EXPORT_VERSION:
+                raise RaffleSyntaxError("This file was not exported by this version of Raffle")
+            continue
+
+        key = (record.get("guild"), record.get("name"))
+        if kind == "raffle":
+            result = finish()
+            if result is not None:
+                yield result
+            current, raffle_data, error = None, None, None
+
+            ctx = context_for(key[0])
+            if ctx is None:
+                continue
+            current = key
+            settings: Dict = record.get("data", None)
+            try:
+                if not isinstance(settings, dict):
+                    raise RaffleSyntaxError(f"Line {number} has no raffle data")
+                _validate(ctx, key[1], settings)
+            except RaffleError as e:
+                error = e
+                continue
+            raffle_data = settings
+            raffle_data["entries"] = EntrySet()
+
+        elif kind == "entries":
+            if key != current or error is not None:
+                # Entries of a skipped or invalid raffle.
+                continue
+            try:
+                RaffleManager.parse_entries(record.get("entries", None))
+            except RaffleError as e:
+                error = e
+                continue
+            for user_id in record["entries"]:
+                raffle_data["entries"].add(user_id)
+
+        else:
+            raise RaffleSyntaxError(f'Line {number} has an unknown record type "{kind}"')
+
+    result = finish()
+    if result is not None:
+        yield result
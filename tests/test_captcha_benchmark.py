@@ -0,0 +1,14 @@
+import asyncio
+
+from captcha.base import Captcha
+from captcha.benchmark import run_benchmark
+
+
+def test_benchmark_verdicts_are_reproducible():
+    # With seed 1, 12 members pass, 2 reload then pass, 4 answer wrong and 2 never answer.
+    report = asyncio.run(
+        run_benchmark(Captcha, joins=20, timeout=0.5, think_time=0.01, seed=1, trace_memory=False)
+    )
+    assert report["verdicts"] == {"passed": 14, "kicked": 6, "left": 0}
+    assert report["unresolved"] == 0
+    assert report["actions"]["failed"] == 0
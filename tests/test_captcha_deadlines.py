@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from captcha.deadlines import DeadlineWheel
+
+
+def run_wheel(schedule, *, resolution=0.02, size=512, wait=0.3):
+    """Run a wheel, return the (time, items) batches it expired."""
+    batches = []
+
+    async def main():
+        wheel = DeadlineWheel(
+            lambda items: batches.append((time.time(), sorted(items))),
+            resolution=resolution,
+            size=size,
+        )
+        schedule(wheel, time.time())
+        await asyncio.sleep(wait)
+        wheel.stop()
+        return wheel
+
+    return asyncio.run(main()), batches
+
+
+def test_deadlines_expire_in_batches_after_their_deadline():
+    deadlines = {}
+
+    def schedule(wheel, now):
+        for key, delay in (("a", 0.05), ("b", 0.05), ("c", 0.15)):
+            deadlines[key] = now + delay
+            wheel.schedule(key, now + delay, key)
+
+    wheel, batches = run_wheel(schedule)
+    assert [items for _, items in batches] == [["a", "b"], ["c"]]
+    for expired_at, items in batches:
+        assert all(expired_at >= deadlines[key] for key in items)
+    assert len(wheel) == 0
+
+
+def test_cancel_and_reschedule():
+    def schedule(wheel, now):
+        wheel.schedule("a", now + 0.05, "a")
+        wheel.schedule("b", now + 0.05, "b")
+        wheel.schedule("b", now + 0.1, "b again")
+        assert wheel.cancel("a")
+        assert not wheel.cancel("missing")
+        assert "a" not in wheel and "b" in wheel
+        assert 0 < wheel.remaining("b") <= 0.1
+        assert wheel.remaining("a") is None
+
+    _wheel, batches = run_wheel(schedule)
+    assert [items for _, items in batches] == [["b again"]]
+
+
+def test_deadlines_further_than_the_wheel_wait_for_their_round():
+    deadlines = {}
+
+    def schedule(wheel, now):
+        # 4 slots of 20ms, the deadline is 2 rounds away.
+        deadlines["far"] = now + 0.2
+        wheel.schedule("far", now + 0.2, "far")
+        wheel.schedule("near", now + 0.03, "near")
+
+    _wheel, batches = run_wheel(schedule, size=4, wait=0.35)
+    assert [items for _, items in batches] == [["near"], ["far"]]
+    assert batches[1][0] >= deadlines["far"]
@@ -0,0 +1,165 @@
+import asyncio
+import copy
+from types import SimpleNamespace
+
+from raffle.utils import cache as cache_module
+from raffle.utils.cache import RaffleCache
+from raffle.utils.entries import EntrySet
+
+import pytest
+
+
+class FakeRaffles:
+    """The ``raffles`` value of a guild in Config."""
+
+    def __init__(self):
+        self.data = {}
+        self.writes = 0
+
+    async def __call__(self):
+        return copy.deepcopy(self.data)
+
+    async def set_raw(self, raffle, *, value):
+        self.writes += 1
+        self.data[raffle] = copy.deepcopy(value)
+
+    async def clear_raw(self, raffle):
+        self.data.pop(raffle, None)
+
+    async def set(self, value):
+        self.data = copy.deepcopy(value)
+
+    async def clear(self):
+        self.data = {}
+
+
+class FakeConfig:
+    def __init__(self):
+        self.guilds = {}
+
+    def guild(self, guild):
+        return SimpleNamespace(raffles=self.guilds.setdefault(guild.id, FakeRaffles()))
+
+
+GUILD = SimpleNamespace(id=1)
+
+
+@pytest.fixture(autouse=True)
+def short_save_delay(monkeypatch):
+    monkeypatch.setattr(cache_module, "SAVE_DELAY", 0.01)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_edit_is_saved_once_for_concurrent_edits():
+    async def main():
+        config = FakeConfig()
+        cache = RaffleCache(config)
+        await cache.set(GUILD, "raffle", {"owner": 1, "entries": []})
+        stored = config.guild(GUILD).raffles
+        writes = stored.writes
+
+        async def join(user_id):
+            async with cache.edit(GUILD, "raffle") as raffle_data:
+                raffle_data["entries"].add(user_id)
+
+        await asyncio.gather(*(join(user_id) for user_id in range(10, 20)))
+        # Not written yet, the save is delayed.
+        assert stored.data["raffle"]["entries"] == []
+        await asyncio.sleep(0.05)
+        assert stored.data["raffle"]["entries"] == list(range(10, 20))
+        assert stored.writes == writes + 1
+
+    run(main())
+
+
+def test_edit_serialises_checks_and_changes():
+    async def main():
+        cache = RaffleCache(FakeConfig())
+        await cache.set(GUILD, "raffle", {"owner": 1, "entries": [], "maximum_entries": 50})
+
+        async def join(user_id):
+            await asyncio.sleep(0)
+            async with cache.edit(GUILD, "raffle") as raffle_data:
+                entries = raffle_data["entries"]
+                if len(entries) >= raffle_data["maximum_entries"]:
+                    return
+                # Let the other joins run while the raffle is locked.
+                await asyncio.sleep(0)
+                entries.add(user_id)
+
+        await asyncio.gather(*(join(user_id) for user_id in range(200)))
+        assert len((await cache.get(GUILD, "raffle"))["entries"]) == 50
+
+    run(main())
+
+
+def test_edit_of_a_deleted_raffle_yields_none():
+    async def main():
+        config = FakeConfig()
+        cache = RaffleCache(config)
+        async with cache.edit(GUILD, "missing") as raffle_data:
+            assert raffle_data is None
+
+        await cache.set(GUILD, "raffle", {"owner": 1, "entries": [2]})
+        async with cache.edit(GUILD, "raffle") as raffle_data:
+            await cache.delete(GUILD, "raffle")
+            raffle_data["entries"].add(3)
+        await asyncio.sleep(0.05)
+        assert config.guild(GUILD).raffles.data == {}
+
+    run(main())
+
+
+def test_entry_edits_keep_the_compiled_conditions():
+    async def main():
+        cache = RaffleCache(FakeConfig())
+        await cache.set(GUILD, "raffle", {"owner": 1, "entries": [], "prevented_users": []})
+        conditions = await cache.conditions(GUILD, "raffle")
+
+        async with cache.edit(GUILD, "raffle") as raffle_data:
+            raffle_data["entries"].add(2)
+            raffle_data["prevented_users"].add(3)
+        assert await cache.conditions(GUILD, "raffle") is conditions
+        # The compiled conditions see the entry sets of the raffle.
+        assert 3 in conditions.prevented_users
+
+        async with cache.edit(GUILD, "raffle", conditions=True) as raffle_data:
+            raffle_data["account_age"] = 10
+        recompiled = await cache.conditions(GUILD, "raffle")
+        assert recompiled is not conditions
+        assert recompiled.account_age == 10
+
+    run(main())
+
+
+def test_flush_writes_the_delayed_saves(monkeypatch):
+    monkeypatch.setattr(cache_module, "SAVE_DELAY", 60)
+
+    async def main():
+        config = FakeConfig()
+        cache = RaffleCache(config)
+        await cache.set(GUILD, "raffle", {"owner": 1, "entries": []})
+        async with cache.edit(GUILD, "raffle") as raffle_data:
+            raffle_data["entries"].add(2)
+        await cache.flush()
+        assert config.guild(GUILD).raffles.data["raffle"]["entries"] == [2]
+
+    run(main())
+
+
+def test_raffles_are_read_from_config_once_and_indexed():
+    async def main():
+        config = FakeConfig()
+        config.guild(GUILD).raffles.data = {"raffle": {"owner": 1, "entries": [2, 3]}}
+        cache = RaffleCache(config)
+        raffle_data = await cache.get(GUILD, "raffle")
+        assert isinstance(raffle_data["entries"], EntrySet)
+        assert await cache.get(GUILD, "raffle") is raffle_data
+        assert cache.pop_user(GUILD.id, 2) == {"raffle"}
+        assert cache.pop_user(GUILD.id, 1) == {"raffle"}
+        assert cache.pop_user(GUILD.id, 4) == set()
+
+    run(main())
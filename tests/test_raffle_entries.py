@@ -0,0 +1,60 @@
+import collections
+import random
+
+from raffle.utils.entries import EntrySet, deflate_raffle
+
+import pytest
+
+
+def test_entries_keep_insertion_order_and_are_unique():
+    entries = EntrySet([3, 1, 3, 2])
+    entries.add(1)
+    entries.append(5)
+    assert entries.to_list() == [3, 1, 2, 5]
+    assert len(entries) == 4
+    assert 2 in entries and 4 not in entries
+    assert entries == [5, 2, 1, 3]
+    assert repr(entries) == "[3, 1, 2, 5]"
+
+
+def test_removal_keeps_the_order_of_the_others():
+    entries = EntrySet(range(6))
+    entries.discard(0)
+    entries.discard(3)
+    entries.discard(42)
+    entries.add(0)
+    assert entries.to_list() == [1, 2, 4, 5, 0]
+    with pytest.raises(ValueError):
+        entries.remove(3)
+    entries.remove(5)
+    assert entries.to_list() == [1, 2, 4, 0]
+
+
+def test_choice_is_uniform_after_removals():
+    entries = EntrySet(range(20))
+    for user_id in range(0, 20, 2):
+        entries.discard(user_id)
+    rng = random.Random(0)
+    counts = collections.Counter(entries.choice(rng) for _ in range(20000))
+    assert set(counts) == set(range(1, 20, 2))
+    assert min(counts.values()) > 1700 and max(counts.values()) < 2300
+
+
+def test_choice_of_empty_entries():
+    entries = EntrySet([1])
+    entries.remove(1)
+    with pytest.raises(IndexError):
+        entries.choice()
+
+
+def test_watcher_sees_every_user_added():
+    seen = []
+    entries = EntrySet([1, 2], watcher=seen.append)
+    entries.add(3)
+    entries.add(1)
+    assert seen == [1, 2, 3, 1]
+
+
+def test_deflate_raffle_stores_lists():
+    raffle = {"owner": 1, "entries": EntrySet([2, 3]), "prevented_users": EntrySet()}
+    assert deflate_raffle(raffle) == {"owner": 1, "entries": [2, 3], "prevented_users": []}
@@ -0,0 +1,76 @@
+import collections
+import random
+from types import SimpleNamespace
+
+from raffle.utils.sampling import AliasTable, role_weights, sample_winners
+
+import pytest
+
+
+def test_alias_table_follows_the_weights():
+    table = AliasTable([1, 0, 3, 6])
+    rng = random.Random(0)
+    counts = collections.Counter(table.pick(rng) for _ in range(40000))
+    assert 1 not in counts
+    for index, expected in ((0, 0.1), (2, 0.3), (3, 0.6)):
+        assert abs(counts[index] / 40000 - expected) < 0.015
+
+
+def test_alias_table_needs_a_positive_weight():
+    with pytest.raises(ValueError):
+        AliasTable([])
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_winners_are_distinct_entries():
+    population = list(range(100, 150))
+    rng = random.Random(0)
+    for weights in (None, [1 + i % 3 for i in range(50)]):
+        winners = sample_winners(population, 20, weights, rng)
+        assert len(winners) == 20
+        assert len(set(winners)) == 20
+        assert set(winners) <= set(population)
+
+
+def test_every_weighted_entry_can_be_drawn():
+    # One entry outweighs the others, drawing them all rebuilds the table.
+    population = list(range(30))
+    weights = [1000] + [1] * 29
+    winners = sample_winners(population, 30, weights, random.Random(0))
+    assert sorted(winners) == population
+
+
+def test_entries_without_weight_never_win():
+    population = list(range(10))
+    weights = [0, 1] * 5
+    rng = random.Random(0)
+    for _ in range(100):
+        assert all(w % 2 for w in sample_winners(population, 5, weights, rng))
+    with pytest.raises(ValueError):
+        sample_winners(population, 6, weights, rng)
+
+
+def test_heavier_entries_win_more_often():
+    rng = random.Random(0)
+    counts = collections.Counter(
+        sample_winners([1, 2, 3], 1, [1, 1, 8], rng)[0] for _ in range(10000)
+    )
+    assert counts[3] > 7500
+    assert counts[1] < 1500 and counts[2] < 1500
+
+
+def test_too_many_winners():
+    with pytest.raises(ValueError):
+        sample_winners([1, 2], 3)
+
+
+def test_role_weights_use_the_highest_role():
+    roles = {1: [SimpleNamespace(id=10), SimpleNamespace(id=20)], 2: [SimpleNamespace(id=30)]}
+    guild = SimpleNamespace(
+        get_member=lambda user_id: SimpleNamespace(roles=roles[user_id])
+        if user_id in roles
+        else None
+    )
+    assert role_weights(guild, [1, 2, 3], {10: 2, 20: 5}) == [5, 1, 1]
+    assert role_weights(guild, [1, 2, 3], {}) is None
@@ -0,0 +1,100 @@
+import io
+import json
+from types import SimpleNamespace
+
+from raffle.utils.entries import EntrySet
+from raffle.utils.exceptions import RaffleSyntaxError
+from raffle.utils.transfer import (
+    ENTRY_CHUNK_SIZE,
+    GuildContext,
+    read_raffles,
+    write_header,
+    write_raffle,
+)
+
+import pytest
+
+ROLE_ID = 500
+
+
+def make_context(guild_id):
+    guild = SimpleNamespace(
+        id=guild_id, get_role=lambda role_id: object() if role_id == ROLE_ID else None
+    )
+    bot = SimpleNamespace(get_user=lambda user_id: object())
+    return GuildContext(bot, guild)
+
+
+def export(raffles):
+    fp = io.StringIO()
+    write_header(fp)
+    for guild_id, name, raffle_data in raffles:
+        write_raffle(fp, guild_id, name, raffle_data)
+    fp.seek(0)
+    return fp
+
+
+def test_raffles_round_trip():
+    entries = EntrySet(range(1, ENTRY_CHUNK_SIZE * 2 + 5))
+    big = {
+        "owner": 1,
+        "created_at": 1600000000,
+        "description": "A big raffle",
+        "maximum_entries": 5000,
+        "prevented_users": EntrySet([7]),
+        "role_weights": {ROLE_ID: 3},
+        "entries": entries,
+    }
+    small = {"owner": 2, "entries": EntrySet([9])}
+    fp = export([(1, "big", big), (1, "small", small), (2, "other", small)])
+    assert len(fp.getvalue().splitlines()) == 1 + 4 + 2 + 2
+    fp.seek(0)
+
+    results = list(read_raffles(fp, make_context))
+    assert [(guild_id, name, error) for guild_id, name, _, error in results] == [
+        (1, "big", None),
+        (1, "small", None),
+        (2, "other", None),
+    ]
+    raffle_data = results[0][2]
+    assert isinstance(raffle_data["entries"], EntrySet)
+    assert raffle_data["entries"].to_list() == entries.to_list()
+    # Role IDs were turned back into ints.
+    assert raffle_data == {**big, "entries": raffle_data["entries"], "prevented_users": [7]}
+    assert results[1][2]["entries"] == [9]
+
+
+def test_raffles_of_unknown_guilds_are_skipped():
+    fp = export([(1, "one", {"owner": 1, "entries": [2]}), (2, "two", {"owner": 1})])
+    results = list(read_raffles(fp, lambda guild_id: make_context(2) if guild_id == 2 else None))
+    assert [(guild_id, name) for guild_id, name, _, _ in results] == [(2, "two")]
+    assert results[0][2]["entries"] == []
+
+
+def test_invalid_raffles_are_reported():
+    fp = export(
+        [
+            (1, "bad_role", {"owner": 1, "role_weights": {404: 2}, "entries": [1]}),
+            (1, "no_owner", {"entries": [1]}),
+            (1, "good", {"owner": 1, "entries": [1]}),
+        ]
+    )
+    lines = fp.getvalue().splitlines()
+    # Corrupt the entries of the good raffle.
+    record = json.loads(lines[-1])
+    record["entries"] = ["1"]
+    lines[-1] = json.dumps(record)
+
+    results = list(read_raffles(io.StringIO("\n".join(lines)), make_context))
+    assert [name for _, name, _, _ in results] == ["bad_role", "no_owner", "good"]
+    assert all(data is None and error is not None for _, _, data, error in results)
+    assert "owner" in str(results[1][3])
+
+
+def test_files_of_other_cogs_are_rejected():
+    with pytest.raises(RaffleSyntaxError):
+        list(read_raffles(io.StringIO('{"type": "header", "cog": "Other"}\n'), make_context))
+    with pytest.raises(RaffleSyntaxError):
+        list(read_raffles(io.StringIO("not json\n"), make_context))
+    with pytest.raises(RaffleSyntaxError):
+        list(read_raffles(io.StringIO('{"type": "unknown"}\n'), make_context))